@@ -0,0 +1,195 @@
+"""
+Acoustic Disfluency Detector
+Finds stuttering events in the decoded recording itself rather than in the
+transcript. Frame-level energy, pitch and log-mel spectra (vectorized NumPy)
+are used to mark:
+  - blocks: silent stretches inside a word, or a silent stop right before one
+  - prolongations: one sound held steady (stable spectrum, and stable pitch when voiced)
+  - part-word repetitions: short, spectrally matching bursts repeated back to back
+Detection runs in the shared audio analysis process pool; events are then attached to Azure's word timings with attach_to_words().
+"""
+
+import numpy as np
+
+from audio_features import (FRAME_LENGTH, HOP_LENGTH, N_MELS, SAMPLE_RATE, to_float, frames_and_power,
+                            frame_db, log_mel, get_pool)
+
+FRAME_SECONDS = HOP_LENGTH / SAMPLE_RATE
+ACF_FFT = 1024                  # zero-padded length for the autocorrelation (>= 2 * FRAME_LENGTH)
+MIN_PITCH_HZ = 75
+MAX_PITCH_HZ = 400
+VOICING_THRESHOLD = 0.45        # normalized autocorrelation peak of a voiced frame
+SILENCE_DB = 30                 # frames this far below the loudest frame are silent
+
+BLOCK_MIN_SECONDS = 0.25        # silent stop inside or right before a word
+BLOCK_MAX_SECONDS = 2.0         # longer silences are ordinary pauses
+ONSET_SECONDS = 0.1             # slack when lining events up with word boundaries
+PROLONGATION_MIN_SECONDS = 0.35
+STEADY_SIMILARITY = 0.97        # cosine similarity of consecutive log-mel frames in a held sound
+STEADY_PITCH_SEMITONES = 1.0
+BURST_MAX_SECONDS = 0.25        # a repeated part-word is a short burst...
+BURST_GAP_SECONDS = 0.3         # ...separated from the next by a short but clear gap
+BURST_MIN_GAP_SECONDS = 0.06
+BURST_SIMILARITY = 0.95
+
+EVENT_TYPES = ('block', 'prolongation', 'part_word_repetition')
+
+
+def frame_features(samples):
+    """
+    Per-frame (10 ms hop) features of an int16 16 kHz clip.
+    Returns (energy_db, pitch_hz with 0 for unvoiced frames, mean-normalized log-mel frames).
+    """
+    x = to_float(samples)
+    if x.size < FRAME_LENGTH:
+        empty = np.zeros(0, dtype=np.float32)
+        return empty, empty, np.zeros((0, N_MELS), dtype=np.float32)
+
+    frames, power = frames_and_power(x)
+    energy_db = frame_db(power)
+
+    # Pitch from the autocorrelation peak inside the speaking range (Wiener-Khinchin)
+    centered = frames - frames.mean(axis=1, keepdims=True)
+    acf = np.fft.irfft(np.abs(np.fft.rfft(centered, ACF_FFT)) ** 2, ACF_FFT)[:, :FRAME_LENGTH]
+    min_lag = SAMPLE_RATE // MAX_PITCH_HZ
+    max_lag = SAMPLE_RATE // MIN_PITCH_HZ
+    lags = acf[:, min_lag:max_lag] / (acf[:, :1] + 1e-10)
+    peak = lags.argmax(axis=1)
+    strength = lags[np.arange(len(lags)), peak]
+    pitch = np.where(strength > VOICING_THRESHOLD, SAMPLE_RATE / (peak + min_lag), 0.0)
+
+    mel = log_mel(power)
+    mel -= mel.mean(axis=1, keepdims=True)
+    return energy_db.astype(np.float32), pitch.astype(np.float32), mel.astype(np.float32)
+
+
+def _runs(mask):
+    """(start, end) frame indices of each run of True in a boolean mask"""
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[0::2], edges[1::2]
+
+
+def _unit(rows):
+    return rows / (np.linalg.norm(rows, axis=-1, keepdims=True) + 1e-10)
+
+
+def detect_disfluencies(samples):
+    """
+    Block, prolongation and part-word repetition events in one recording.
+    Returns columnar {'type', 'start', 'duration'} with times in seconds.
+    """
+    energy_db, pitch, log_mel = frame_features(samples)
+    events = {'type': [], 'start': [], 'duration': []}
+    if len(energy_db) == 0:
+        return events
+
+    def add(kind, start_frame, end_frame):
+        events['type'].append(kind)
+        events['start'].append(round(float(start_frame * FRAME_SECONDS), 3))
+        events['duration'].append(round(float((end_frame - start_frame) * FRAME_SECONDS), 3))
+
+    sounding = energy_db > max(energy_db.max() - SILENCE_DB, -60)
+    starts, ends = _runs(sounding)
+    if len(starts) == 0:
+        return events
+
+    # Blocks: silent gaps bounded by sound on both sides; whether they fall inside a word
+    # is decided later against the word timings
+    gap_frames = starts[1:] - ends[:-1]
+    block_min = int(BLOCK_MIN_SECONDS / FRAME_SECONDS)
+    block_max = int(BLOCK_MAX_SECONDS / FRAME_SECONDS)
+    for i in np.flatnonzero((gap_frames >= block_min) & (gap_frames <= block_max)):
+        add('block', ends[i], starts[i + 1])
+
+    # Prolongations: consecutive frames with a near-identical spectrum and, when voiced, a flat pitch
+    unit = _unit(log_mel)
+    similarity = (unit[1:] * unit[:-1]).sum(axis=1)
+    semitones = 12 * np.abs(np.log2(np.maximum(pitch[1:], 1) / np.maximum(pitch[:-1], 1)))
+    both_voiced = (pitch[1:] > 0) & (pitch[:-1] > 0)
+    steady = (similarity > STEADY_SIMILARITY) & sounding[1:] & sounding[:-1] \
+        & (~both_voiced | (semitones < STEADY_PITCH_SEMITONES))
+    steady_starts, steady_ends = _runs(steady)
+    long_enough = (steady_ends - steady_starts) * FRAME_SECONDS >= PROLONGATION_MIN_SECONDS
+    for start, end in zip(steady_starts[long_enough], steady_ends[long_enough] + 1):
+        add('prolongation', start, end)
+
+    # Part-word repetitions: short bursts close together whose average spectra match
+    burst_max = int(BURST_MAX_SECONDS / FRAME_SECONDS)
+    burst_gap = int(BURST_GAP_SECONDS / FRAME_SECONDS)
+    burst_min_gap = int(BURST_MIN_GAP_SECONDS / FRAME_SECONDS)
+    lengths = ends - starts
+    if len(starts) > 1:
+        spectra = _unit(np.stack([log_mel[s:e].mean(axis=0) for s, e in zip(starts, ends)]))
+        matching = (spectra[1:] * spectra[:-1]).sum(axis=1) > BURST_SIMILARITY
+        short = lengths <= burst_max
+        repeated = short[:-1] & short[1:] & (gap_frames >= burst_min_gap) & (gap_frames <= burst_gap) & matching
+        rep_starts, rep_ends = _runs(repeated)
+        for first, last in zip(rep_starts, rep_ends):
+            # Bursts first..last repeat; the event runs up to the next burst, the attempt that got through
+            add('part_word_repetition', starts[first], starts[min(last + 1, len(starts) - 1)])
+
+    order = np.argsort(events['start'], kind='stable')
+    return {field: [values[i] for i in order] for field, values in events.items()}
+
+
+def attach_to_words(events, offsets, durations):
+    """
+    Index of the word each event belongs to: the word it overlaps, otherwise the next word
+    (a block or repetition lands on the word it holds up). A silence between two recognized
+    words is an ordinary pause, so uncovered blocks are kept only when the sound before them
+    was not recognized as a word (an aborted onset) and the next word starts as they end.
+    Returns the events with a 'word_index' column added.
+    """
+    offsets = np.asarray(offsets, dtype=np.float64)
+    ends = offsets + np.asarray(durations, dtype=np.float64)
+    merged = {field: [] for field in ('type', 'start', 'duration', 'word_index')}
+    if len(offsets) == 0:
+        return merged
+
+    def covering(times):
+        index = np.searchsorted(offsets, times, side='right') - 1
+        return index, (index >= 0) & (times < ends[np.maximum(index, 0)])
+
+    starts = np.asarray(events['start'], dtype=np.float64)
+    stops = starts + np.asarray(events['duration'], dtype=np.float64)
+    midpoints = (starts + stops) / 2
+    inside, covered = covering(midpoints)
+    following = np.minimum(np.searchsorted(offsets, midpoints), len(offsets) - 1)
+    word_index = np.where(covered, inside, following)
+
+    _, before_in_word = covering(starts - ONSET_SECONDS)
+    onset_follows = np.abs(offsets[following] - stops) <= ONSET_SECONDS
+
+    for i, kind in enumerate(events['type']):
+        if kind == 'block' and not covered[i] and (before_in_word[i] or not onset_follows[i]):
+            continue
+        merged['type'].append(kind)
+        merged['start'].append(events['start'][i])
+        merged['duration'].append(events['duration'][i])
+        merged['word_index'].append(int(word_index[i]))
+    return merged
+
+
+def combine_disfluencies(analysis, events):
+    """
+    Disfluency count and prolongated word indices for a fluency result. Acoustic events
+    (already attached to words) replace the spelling-based prolongation guess; whole-word
+    repetitions still come from the transcript. Without events the word-timing analysis
+    is used as is.
+    """
+    if events is None:
+        return analysis['disfluencies'], analysis.get('prolongations', [])
+    prolongations = sorted({index for kind, index in zip(events['type'], events['word_index'])
+                            if kind == 'prolongation'})
+    return len(analysis.get('repetitions', [])) + len(events['type']), prolongations
+
+
+def summarize(events):
+    """Event counts per type"""
+    return {kind: events['type'].count(kind) for kind in EVENT_TYPES}
+
+
+def submit_detection(samples):
+    """Start detect_disfluencies in the audio analysis pool; returns the future"""
+    return get_pool().submit(detect_disfluencies, samples)
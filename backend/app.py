@@ -1,15 +1,24 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from flask_bcrypt import Bcrypt
-from pymongo import MongoClient
+from flask_sock import Sock
+from pymongo import MongoClient, ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from bson import ObjectId
 import jwt
 import datetime
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
 import os
+import json
+import threading
+import numpy as np
 from dotenv import load_dotenv
 import firebase_admin
-from firebase_admin import credentials, auth
+from firebase_admin import credentials
+
+# Load environment variables from .env file (before the modules below read them)
+load_dotenv()
 
 # Import fluency CRUD blueprint
 from fluency_crud import fluency_bp, init_fluency_crud
@@ -19,9 +28,45 @@ from language_crud import language_bp, init_language_crud
 from receptive_crud import receptive_bp, init_receptive_crud
 # Import articulation CRUD blueprint
 from articulation_crud import articulation_bp, init_articulation_crud
-
-# Load environment variables from .env file
-load_dotenv()
+# Shared authenticated-user cache
+from user_cache import user_cache
+# Revocation list for stateless (claims-only) auth
+from token_revocation import revocation_list, init_token_revocation, issued_at_ms
+# Cached Firebase ID token verification
+from firebase_tokens import FirebaseTokenVerifier, start_certificate_prefetch
+# Bounded bcrypt worker pool
+from password_hashing import PasswordHasher, HasherBusy
+# In-memory audio decoding for the speech endpoints
+from audio_decode import TARGET_SAMPLE_RATE
+# Import voice activity detection
+from voice_activity import trim_silence
+# Import word-timing fluency metrics
+from fluency_analysis import analyze_words
+# Import signal-level disfluency detection
+from acoustic_disfluency import submit_detection, attach_to_words, combine_disfluencies, summarize as summarize_disfluencies
+# Import shared upload validation and normalization
+from audio_ingest import ingest, AudioRejected
+# Shared Azure Speech configs and recognizer factory
+from speech_backend import speech_backend, StageTimer
+# Bounded pool for blocking recognition calls
+from recognition_pool import recognition_executor, RecognitionBusy
+# Silence-chunked recognition for passages longer than one recognize_once
+from long_form import is_long_form, recognize_long_form
+# Exercise scoring specs resolved by exercise_id
+from exercise_specs import language_exercise_specs, fluency_exercise_specs
+# Compiled expected-keyword matchers for expressive scoring
+from keyword_matcher import KeywordMatcher, keyword_matchers
+# Content-addressed archive of scored recordings
+from recording_archive import create_recording_archive
+# Content-addressed cache of assessment results
+from result_cache import result_cache, init_result_cache
+# Derived-score rules shared with the rescoring job
+from scoring import (SCORING_VERSION, pronunciation_result_dict, articulation_score, articulation_feedback,
+                     fluency_score as compute_fluency_score, fluency_feedback)
+# Packed per-trial phoneme scores and the per-user phoneme aggregate
+from phoneme_scores import pack_phonemes, phoneme_stats
+# Import offline articulation scorer
+from local_scorer import TemplateStore, score_in_pool
 
 # Helper function for timezone-aware UTC datetime
 def utc_now():
@@ -32,10 +77,76 @@ def utc_now():
 cred = credentials.Certificate('cvaped-fa8b2-firebase-adminsdk-fbsvc-92b2666b41.json')
 firebase_admin.initialize_app(cred)
 
+# auth.verify_id_token with verified claims cached until exp; its certificate fetch is
+# warmed in the background so the first social logins after a deploy don't wait on Google
+firebase_verifier = FirebaseTokenVerifier()
+if os.getenv('FIREBASE_CERT_PREFETCH', 'True').lower() == 'true':
+    start_certificate_prefetch()
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'fallback-secret-key')
+app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
 CORS(app)
 bcrypt = Bcrypt(app)
+sock = Sock(app)
+
+# Hash passwords off the request workers; overflow is shed with a 503
+password_hasher = PasswordHasher(
+    bcrypt,
+    rounds=app.config['BCRYPT_LOG_ROUNDS'],
+    workers=int(os.getenv('BCRYPT_WORKERS', 2)),
+    max_queue=int(os.getenv('BCRYPT_MAX_QUEUE', 16))
+)
+
+def server_busy_response():
+    """Fast 503 for requests shed by a saturated worker pool"""
+    return jsonify({'message': 'Server is busy, please try again shortly'}), 503, {'Retry-After': '1'}
+
+def speech_busy_response():
+    """Fast 503 for recordings the recognition pool couldn't take in time"""
+    return jsonify({
+        'success': False,
+        'busy': True,
+        'message': 'Speech assessment is busy, please try again in a moment'
+    }), 503, {'Retry-After': '2'}
+
+NO_SPEECH_MESSAGE = 'No speech could be recognized. Please try speaking more clearly.'
+
+def no_speech_response():
+    """The 400 the speech endpoints give for NoMatch, answered locally for silent clips"""
+    return jsonify({'success': False, 'message': NO_SPEECH_MESSAGE}), 400
+
+def audio_rejected_response(error):
+    """Upload refused by audio_ingest before any recognition work"""
+    return jsonify({'success': False, 'message': error.message}), error.status
+
+def ingest_speech(audio_file, kind, timer=None):
+    """
+    Validate, decode to 16kHz mono PCM and trim silence under the limits for kind.
+    Raises AudioRejected; recording.pcm_bytes is None when the clip has no speech.
+    """
+    timer = timer or StageTimer()
+    with timer.stage('ingest'):
+        recording = ingest(audio_file, kind)
+    if not recording.has_speech:
+        print(f"No speech detected in {recording.durations['original_duration']}s clip, skipping recognition")
+    return recording
+
+def recognize_recording(recording, timer, word_timestamps=False, expected_text=None):
+    """
+    Recognize a whole recording: one recognize_once for short clips, silence-split chunks
+    recognized concurrently for long passages. Returns (RecognitionResult, chunk count).
+    """
+    if is_long_form(recording.samples):
+        with timer.stage('recognize'):
+            return recognize_long_form(speech_backend, recognition_executor, recording.samples,
+                                       word_timestamps=word_timestamps, expected_text=expected_text)
+
+    with timer.stage('config'):
+        recognize = speech_backend.prepare(recording.pcm_bytes, word_timestamps=word_timestamps,
+                                           expected_text=expected_text)
+    with timer.stage('recognize'):
+        return recognition_executor.run(recognize), 1
 
 # MongoDB connection
 MONGO_URI = os.getenv('MONGO_URI')
@@ -51,6 +162,16 @@ articulation_exercises_collection = db['articulation_exercises']
 language_progress_collection = db['language_progress']
 language_trials_collection = db['language_trials']
 
+# One progress document per user and sound / mode, so concurrent first saves can't both insert
+try:
+    articulation_progress_collection.create_index([('user_id', 1), ('sound_id', 1)], unique=True)
+except Exception as e:
+    print(f"Warning: Could not create unique articulation progress index (duplicate progress documents?): {e}")
+try:
+    language_progress_collection.create_index([('user_id', 1), ('mode', 1)], unique=True)
+except Exception as e:
+    print(f"Warning: Could not create unique language progress index (duplicate progress documents?): {e}")
+
 # Register fluency CRUD blueprint
 app.register_blueprint(fluency_bp)
 init_fluency_crud(db)
@@ -67,6 +188,54 @@ init_receptive_crud(db, app.config['SECRET_KEY'])
 app.register_blueprint(articulation_bp, url_prefix='/api/articulation/exercises')
 init_articulation_crud(db, app.config['SECRET_KEY'])
 
+# Stateless auth: trust routing claims in the JWT instead of loading the user
+AUTH_STATELESS = os.getenv('AUTH_STATELESS', 'False').lower() == 'true'
+init_token_revocation(db, enabled=AUTH_STATELESS)
+
+# Reuse assessment results for retried uploads (optionally shared through Mongo)
+init_result_cache(db)
+
+# Optional archive of the normalized clips behind each trial, for rescoring (off unless RECORDING_ARCHIVE is set)
+recording_archive = create_recording_archive(db)
+
+# Per-user phoneme score aggregate, updated as articulation trials are saved
+phoneme_stats.init_collection(db['phoneme_stats'])
+
+# Reference recordings for the local articulation scorer
+articulation_templates = TemplateStore(max_per_target=int(os.getenv('LOCAL_SCORER_TEMPLATES', 5)))
+articulation_templates.init_collection(db['articulation_templates'])
+LOCAL_TEMPLATE_MIN_SCORE = float(os.getenv('LOCAL_TEMPLATE_MIN_SCORE', 0.9))
+
+# Compatibility for older clients that post expected_keywords/target_text without an exercise_id
+ACCEPT_POSTED_EXERCISE_SPECS = os.getenv('ACCEPT_POSTED_EXERCISE_SPECS', 'False').lower() == 'true'
+
+# Signal-level disfluency detection for fluency recordings (runs alongside recognition)
+ACOUSTIC_DISFLUENCY_TIMEOUT = float(os.getenv('ACOUSTIC_DISFLUENCY_TIMEOUT', 5))
+
+# Streaming articulation sessions hold a recognizer open while the child speaks
+STREAM_MAX_SESSIONS = int(os.getenv('STREAM_MAX_SESSIONS', 8))
+STREAM_MAX_SECONDS = float(os.getenv('STREAM_MAX_SECONDS', 10))
+STREAM_IDLE_SECONDS = float(os.getenv('STREAM_IDLE_SECONDS', 3))
+stream_slots = threading.BoundedSemaphore(STREAM_MAX_SESSIONS)
+
+# Batch trial submissions decode and score their recordings side by side
+BATCH_MAX_TRIALS = int(os.getenv('BATCH_MAX_TRIALS', 5))
+batch_executor = ThreadPoolExecutor(max_workers=int(os.getenv('BATCH_WORKERS', 8)), thread_name_prefix='trial-batch')
+
+def generate_token(user_id, role, therapy_type=None, is_profile_complete=True):
+    """Mint the session JWT with the claims claims_required routes on"""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return jwt.encode({
+        'user_id': str(user_id),
+        'role': role,
+        'therapyType': therapy_type,
+        'isProfileComplete': is_profile_complete,
+        'iat': now,
+        # iat is whole seconds; revocations are compared at millisecond resolution
+        'iat_ms': int(now.timestamp() * 1000),
+        'exp': now + datetime.timedelta(hours=24)
+    }, app.config['SECRET_KEY'], algorithm="HS256")
+
 # Token required decorator
 def token_required(f):
     @wraps(f)
@@ -81,7 +250,7 @@ def token_required(f):
             if token.startswith('Bearer '):
                 token = token[7:]
             data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
-            current_user = users_collection.find_one({'_id': ObjectId(data['user_id'])})
+            current_user = user_cache.get_user(users_collection, data['user_id'])
             if not current_user:
                 return jsonify({'message': 'User not found!'}), 401
         except Exception as e:
@@ -91,6 +260,67 @@ def token_required(f):
     
     return decorated
 
+# Claims-only decorator for endpoints that need just the user id and role
+def claims_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not AUTH_STATELESS:
+            return token_required(f)(*args, **kwargs)
+        
+        token = request.headers.get('Authorization')
+        
+        if not token:
+            return jsonify({'message': 'Token is missing!'}), 401
+        
+        try:
+            if token.startswith('Bearer '):
+                token = token[7:]
+            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
+        except Exception as e:
+            return jsonify({'message': 'Token is invalid!', 'error': str(e)}), 401
+        
+        if not data.get('user_id'):
+            return jsonify({'message': 'Token is invalid!'}), 401
+        
+        # Tokens minted before claims were added still need the full lookup
+        if 'therapyType' not in data:
+            return token_required(f)(*args, **kwargs)
+        
+        if revocation_list.is_revoked(data['user_id'], issued_at_ms(data)):
+            return jsonify({'message': 'Token has been revoked, please log in again'}), 401
+        
+        current_user = {
+            '_id': ObjectId(data['user_id']),
+            'role': data.get('role', 'patient'),
+            'therapyType': data.get('therapyType'),
+            'isProfileComplete': data.get('isProfileComplete', True)
+        }
+        return f(current_user, *args, **kwargs)
+    
+    return decorated
+
+def user_from_token(token):
+    """current_user for a raw JWT (WebSocket clients can't send an Authorization header), or None"""
+    try:
+        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
+    except Exception:
+        return None
+    
+    if not data.get('user_id'):
+        return None
+    
+    if revocation_list.is_revoked(data['user_id'], issued_at_ms(data)):
+        return None
+    
+    if AUTH_STATELESS and 'therapyType' in data:
+        return {
+            '_id': ObjectId(data['user_id']),
+            'role': data.get('role', 'patient'),
+            'therapyType': data.get('therapyType'),
+            'isProfileComplete': data.get('isProfileComplete', True)
+        }
+    return user_cache.get_user(users_collection, data['user_id'])
+
 @app.route('/api/register', methods=['POST'])
 def register():
     try:
@@ -115,7 +345,7 @@ def register():
             return jsonify({'message': 'User already exists'}), 409
         
         # Hash password
-        hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+        hashed_password = password_hasher.hash(password)
         
         # Create base user document
         user = {
@@ -177,11 +407,7 @@ def register():
         result = users_collection.insert_one(user)
         
         # Generate token
-        token = jwt.encode({
-            'user_id': str(result.inserted_id),
-            'role': role,
-            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=24)
-        }, app.config['SECRET_KEY'], algorithm="HS256")
+        token = generate_token(result.inserted_id, role, therapy_type)
         
         return jsonify({
             'message': 'User registered successfully',
@@ -197,6 +423,8 @@ def register():
             }
         }), 201
         
+    except HasherBusy:
+        return server_busy_response()
     except Exception as e:
         return jsonify({'message': 'Registration failed', 'error': str(e)}), 500
 
@@ -219,15 +447,26 @@ def login():
             return jsonify({'message': 'Invalid email or password'}), 401
         
         # Check password
-        if not bcrypt.check_password_hash(user['password'], password):
+        if not password_hasher.check(user['password'], password):
             return jsonify({'message': 'Invalid email or password'}), 401
         
+        # Upgrade hashes made with an older cost factor in the background
+        if password_hasher.needs_rehash(user['password']):
+            def store_rehash(new_hash, user_id=user['_id'], old_hash=user['password']):
+                users_collection.update_one(
+                    {'_id': user_id, 'password': old_hash},
+                    {'$set': {'password': new_hash}}
+                )
+                user_cache.invalidate(user_id)
+            password_hasher.rehash_async(password, store_rehash)
+        
         # Generate token
-        token = jwt.encode({
-            'user_id': str(user['_id']),
-            'role': user.get('role', 'patient'),
-            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=24)
-        }, app.config['SECRET_KEY'], algorithm="HS256")
+        token = generate_token(
+            user['_id'],
+            user.get('role', 'patient'),
+            user.get('therapyType'),
+            user.get('isProfileComplete', True)
+        )
         
         return jsonify({
             'message': 'Login successful',
@@ -241,6 +480,8 @@ def login():
             }
         }), 200
         
+    except HasherBusy:
+        return server_busy_response()
     except Exception as e:
         return jsonify({'message': 'Login failed', 'error': str(e)}), 500
 
@@ -257,7 +498,7 @@ def firebase_auth():
         
         # Verify Firebase token
         try:
-            decoded_token = auth.verify_id_token(firebase_token)
+            decoded_token = firebase_verifier.verify(firebase_token)
             firebase_uid = decoded_token['uid']
             firebase_email = decoded_token.get('email', '').lower()
         except Exception as e:
@@ -268,11 +509,12 @@ def firebase_auth():
         
         if user:
             # Existing user - return user data
-            token = jwt.encode({
-                'user_id': str(user['_id']),
-                'role': user.get('role', 'patient'),
-                'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=24)
-            }, app.config['SECRET_KEY'], algorithm="HS256")
+            token = generate_token(
+                user['_id'],
+                user.get('role', 'patient'),
+                user.get('therapyType'),
+                user.get('isProfileComplete', True)
+            )
             
             return jsonify({
                 'message': 'Login successful',
@@ -317,11 +559,7 @@ def firebase_auth():
         result = users_collection.insert_one(new_user)
         
         # Generate token
-        token = jwt.encode({
-            'user_id': str(result.inserted_id),
-            'role': 'patient',
-            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=24)
-        }, app.config['SECRET_KEY'], algorithm="HS256")
+        token = generate_token(result.inserted_id, 'patient', is_profile_complete=False)
         
         return jsonify({
             'message': 'User created successfully',
@@ -414,12 +652,23 @@ def complete_profile(current_user):
             {'_id': current_user['_id']},
             {'$set': update_data}
         )
+        user_cache.invalidate(current_user['_id'])
+        revocation_list.revoke(current_user['_id'])
         
         # Get updated user
         updated_user = users_collection.find_one({'_id': current_user['_id']})
         
+        # Re-issue the token so its claims reflect the completed profile
+        token = generate_token(
+            updated_user['_id'],
+            updated_user.get('role', 'patient'),
+            updated_user['therapyType'],
+            True
+        )
+        
         return jsonify({
             'message': 'Profile completed successfully',
+            'token': token,
             'user': {
                 'id': str(updated_user['_id']),
                 'email': updated_user['email'],
@@ -483,6 +732,7 @@ def update_user(current_user):
             {'_id': current_user['_id']},
             {'$set': update_data}
         )
+        user_cache.invalidate(current_user['_id'])
         
         # Get updated user
         updated_user = users_collection.find_one({'_id': current_user['_id']})
@@ -505,91 +755,243 @@ def update_user(current_user):
 
 @app.route('/api/health', methods=['GET'])
 def health():
-    return jsonify({'status': 'healthy', 'message': 'CVACare API is running'}), 200
+    return jsonify({
+        'status': 'healthy',
+        'message': 'CVACare API is running',
+        'user_cache': user_cache.stats(),
+        'speech_timings': speech_backend.stats(),
+        'recognition': recognition_executor.stats(),
+        'result_cache': result_cache.stats(),
+        'recording_archive': recording_archive.stats() if recording_archive else None
+    }), 200
 
-# Azure Speech Configuration
-AZURE_SPEECH_KEY = os.getenv('AZURE_SPEECH_KEY')
-AZURE_SPEECH_REGION = os.getenv('AZURE_SPEECH_REGION', 'eastus')
+def archive_recording(pcm_bytes):
+    """Queue a scored clip for the recording archive; returns its hash (None when archiving is off or full)"""
+    if recording_archive is None or pcm_bytes is None:
+        return None
+    return recording_archive.archive(pcm_bytes)
 
-def assess_pronunciation_azure(audio_path, reference_text):
+def assess_pronunciation_speech(pcm_bytes, reference_text, timer=None):
     """
-    Use Azure Speech Services Pronunciation Assessment API
-    This is specifically designed for speech therapy and language learning!
+    Pronunciation assessment through the configured speech backend
+    (Azure Pronunciation Assessment, or the fake backend for load tests).
+    Takes raw 16kHz mono 16-bit PCM from audio_ingest.
     """
+    timer = timer or StageTimer()
     try:
-        import azure.cognitiveservices.speech as speechsdk
-        import json
-        
-        # Create speech config
-        speech_config = speechsdk.SpeechConfig(
-            subscription=AZURE_SPEECH_KEY,
-            region=AZURE_SPEECH_REGION
-        )
-        
-        # Create audio config from file
-        audio_config = speechsdk.audio.AudioConfig(filename=audio_path)
-        
-        # Configure pronunciation assessment
-        pronunciation_config = speechsdk.PronunciationAssessmentConfig(
-            reference_text=reference_text,
-            grading_system=speechsdk.PronunciationAssessmentGradingSystem.HundredMark,
-            granularity=speechsdk.PronunciationAssessmentGranularity.Phoneme,
-            enable_miscue=True
-        )
-        
-        # Create speech recognizer
-        speech_recognizer = speechsdk.SpeechRecognizer(
-            speech_config=speech_config,
-            audio_config=audio_config
-        )
-        
-        # Apply pronunciation assessment config
-        pronunciation_config.apply_to(speech_recognizer)
+        # Recognizer on the shared speech config with the cached pronunciation config
+        with timer.stage('config'):
+            recognize = speech_backend.prepare(pcm_bytes, reference_text=reference_text)
         
         # Recognize speech
-        result = speech_recognizer.recognize_once()
+        with timer.stage('recognize'):
+            result = recognition_executor.run(recognize)
         
-        if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-            # Get pronunciation assessment results
-            pronunciation_result = speechsdk.PronunciationAssessmentResult(result)
-            
-            return {
-                'success': True,
-                'transcription': result.text,
-                'accuracy_score': pronunciation_result.accuracy_score / 100,  # 0-1 scale
-                'pronunciation_score': pronunciation_result.pronunciation_score / 100,
-                'completeness_score': pronunciation_result.completeness_score / 100,
-                'fluency_score': pronunciation_result.fluency_score / 100,
-                'phonemes': [
-                    {
-                        'phoneme': p.phoneme,
-                        'score': p.accuracy_score / 100
-                    }
-                    for p in pronunciation_result.phonemes
-                ] if hasattr(pronunciation_result, 'phonemes') else []
-            }
-        else:
-            return {
-                'success': False,
-                'error': f'Recognition failed: {result.reason}'
-            }
+        # Get pronunciation assessment results
+        with timer.stage('parse'):
+            return pronunciation_result_dict(result)
             
+    except RecognitionBusy:
+        raise
     except Exception as e:
-        print(f"Azure assessment error: {str(e)}")
+        print(f"Speech assessment error: {str(e)}")
         return {
             'success': False,
             'error': str(e)
         }
+    finally:
+        speech_backend.record('articulation', timer.timings)
+
+def assess_pronunciation_local(pcm_bytes, sound_id, level, target):
+    """
+    Offline estimate from the reference templates for this item.
+    Same result shape as assess_pronunciation_speech, or None when no templates exist.
+    """
+    templates = articulation_templates.get(sound_id, level, target)
+    if not templates:
+        return None
+
+    timer = StageTimer()
+    try:
+        with timer.stage('local_score'):
+            scores = score_in_pool(np.frombuffer(pcm_bytes, dtype='<i2'), templates)
+    except Exception as e:
+        print(f"Local scoring error: {str(e)}")
+        return None
+    finally:
+        speech_backend.record('articulation', timer.timings)
+
+    if scores is None:
+        return None
+    return {
+        'success': True,
+        'transcription': '',
+        'accuracy_score': scores['accuracy_score'],
+        'pronunciation_score': scores['pronunciation_score'],
+        'completeness_score': scores['completeness_score'],
+        'fluency_score': scores['fluency_score'],
+        'phonemes': [],
+        'scorer': 'local'
+    }
+
+def score_articulation(pcm_bytes, sound_id, level, target, assess=None):
+    """
+    Pick the articulation result for one recording: the speech backend (assess,
+    by default a one-shot upload assessment), identical retries from the result
+    cache, and the local scorer when Azure is missing, busy or failing.
+    Returns (result or None, whether result is a fresh speech backend result).
+    """
+    if not speech_backend.configured:
+        return assess_pronunciation_local(pcm_bytes, sound_id, level, target), False
+    
+    cache_key = result_cache.key('articulation', pcm_bytes, {'target': target})
+    result = result_cache.get(cache_key)
+    if result is not None:
+        return result, False
+    
+    try:
+        result = assess() if assess else assess_pronunciation_speech(pcm_bytes, target)
+    except RecognitionBusy:
+        result = assess_pronunciation_local(pcm_bytes, sound_id, level, target)
+        if result is None:
+            raise
+        return result, False
+    
+    if result['success']:
+        result_cache.put(cache_key, result)
+        return result, True
+    return assess_pronunciation_local(pcm_bytes, sound_id, level, target) or result, False
+
+def articulation_trial(user_id, result, fresh_speech_result, pcm_bytes, sound_id, level, item_index, target, trial):
+    """
+    Scores, feedback and the trial document for one articulation recording.
+    Returns (response body, HTTP status, trial document or None); the caller inserts the document.
+    """
+    if result is None:
+        print("Azure not configured and no reference templates, using fallback scoring")
+        # Simple fallback scoring
+        computed_score = 0.75  # Default moderate score
+        feedback = f"Azure Speech not configured. Please add AZURE_SPEECH_KEY to .env file."
+        transcription = target  # Assume correct for now
+        
+        return {
+            'success': True,
+            'scores': {
+                'computed_score': computed_score
+            },
+            'feedback': feedback,
+            'transcription': transcription,
+            'target': target,
+            'note': 'Using fallback scoring. Configure Azure for accurate assessment.'
+        }, 200, None
+    
+    if not result['success']:
+        return {
+            'success': False,
+            'message': 'Pronunciation assessment failed',
+            'error': result.get('error', 'Unknown error')
+        }, 500, None
+    
+    # Azure gives us detailed scores!
+    accuracy = result['accuracy_score']
+    pronunciation = result['pronunciation_score']
+    completeness = result['completeness_score']
+    fluency = result['fluency_score']
+    
+    # Combine scores (emphasize pronunciation for articulation therapy; weights in scoring.py)
+    computed_score = articulation_score(result)
+    
+    # Generate feedback based on Azure's detailed analysis
+    transcription = result['transcription']
+    
+    scorer = result.get('scorer', 'azure')
+    feedback = articulation_feedback(computed_score, transcription, target)
+    
+    print(f"{scorer.capitalize()} Assessment - Target: '{target}' | Said: '{transcription}' | Score: {computed_score:.2f}")
+    print(f"Detailed: Accuracy={accuracy:.2f}, Pronunciation={pronunciation:.2f}, Completeness={completeness:.2f}, Fluency={fluency:.2f}")
+    
+    scores = {
+        'accuracy_score': round(accuracy, 3),
+        'pronunciation_score': round(pronunciation, 3),
+        'completeness_score': round(completeness, 3),
+        'fluency_score': round(fluency, 3),
+        'computed_score': round(computed_score, 3)
+    }
+    
+    # Trial data for the database
+    trial_data = {
+        'user_id': user_id,
+        'sound_id': sound_id,
+        'level': level,
+        'item_index': item_index,
+        'target': target,
+        'trial': trial,
+        'scores': scores,
+        'transcription': transcription,
+        'feedback': feedback,
+        'scorer': scorer,
+        'phonemes': pack_phonemes(result.get('phonemes')),
+        'recording_hash': archive_recording(pcm_bytes),
+        'scoring_version': SCORING_VERSION,
+        'timestamp': datetime.datetime.utcnow()
+    }
+    
+    # Strong Azure-scored recordings become reference templates for offline scoring
+    # (never the fake backend's simulated scores)
+    if (fresh_speech_result and speech_backend.name == 'azure'
+            and computed_score >= LOCAL_TEMPLATE_MIN_SCORE and sound_id):
+        try:
+            if articulation_templates.count(sound_id, level, target) < articulation_templates.max_per_target:
+                articulation_templates.enroll(sound_id, level, target, np.frombuffer(pcm_bytes, dtype='<i2'),
+                                              source=speech_backend.name, score=round(computed_score, 3))
+        except Exception as e:
+            print(f"Warning: Template enrollment failed: {e}")
+    
+    response_body = {
+        'success': True,
+        'scores': dict(scores),
+        'feedback': feedback,
+        'transcription': transcription,
+        'target': target,
+        'phonemes': result.get('phonemes', [])
+    }
+    if scorer == 'local':
+        response_body['scorer'] = 'local'
+        response_body['note'] = 'Scored locally against reference recordings.'
+    return response_body, 200, trial_data
+
+def upsert_progress(collection, query, pipeline, projection):
+    """
+    Pipeline upsert of one progress document, returning it after the update. Two first
+    saves racing on the unique index make one insert fail; that one is retried and
+    then updates the document the other created.
+    """
+    for attempt in range(2):
+        try:
+            return collection.find_one_and_update(
+                query, pipeline, projection=projection, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            if attempt:
+                raise
+
+def save_articulation_trials(user_id, trial_docs):
+    """Insert scored trial documents and fold their phoneme scores into the user's aggregate"""
+    if len(trial_docs) == 1:
+        articulation_trials_collection.insert_one(trial_docs[0])
+    else:
+        articulation_trials_collection.insert_many(trial_docs)
+    try:
+        phoneme_stats.record(user_id, [doc.get('phonemes') for doc in trial_docs])
+    except Exception as e:
+        print(f"Warning: Phoneme aggregate update failed: {e}")
 
 # Articulation Therapy Endpoints
 @app.route('/api/articulation/record', methods=['POST'])
-@token_required
+@claims_required
 def record_articulation(current_user):
     """Process articulation recordings with Azure Pronunciation Assessment"""
     try:
-        import tempfile
-        import uuid
-        
         # Get form data
         if 'audio' not in request.files:
             return jsonify({'success': False, 'message': 'No audio file provided'}), 400
@@ -604,142 +1006,292 @@ def record_articulation(current_user):
         if not target:
             return jsonify({'success': False, 'message': 'Target text is required'}), 400
         
-        # Save audio file temporarily and convert to WAV format for Azure
-        import soundfile as sf
-        import librosa
+        # Validate, decode to 16kHz mono PCM in memory (no temp files) and trim silence
+        recording = ingest_speech(audio_file, 'articulation')
+        if not recording.has_speech:
+            return no_speech_response()
+        pcm_bytes, durations = recording.pcm_bytes, recording.durations
         
-        temp_dir = tempfile.gettempdir()
-        temp_webm = os.path.join(temp_dir, f'recording_{uuid.uuid4()}.webm')
-        temp_wav = os.path.join(temp_dir, f'recording_{uuid.uuid4()}.wav')
+        print(f"Assessing pronunciation for target: '{target}'")
         
-        # Save uploaded file first
-        audio_file.save(temp_webm)
+        result, fresh_speech_result = score_articulation(pcm_bytes, sound_id, level, target)
+        response_body, status, trial_data = articulation_trial(
+            str(current_user['_id']), result, fresh_speech_result, pcm_bytes,
+            sound_id, level, item_index, target, trial
+        )
+        response_body['audio_duration'] = durations
         
-        # Convert to WAV format using librosa (Azure requires WAV)
-        try:
-            audio_data, sample_rate = librosa.load(temp_webm, sr=16000)  # Azure expects 16kHz
-            sf.write(temp_wav, audio_data, sample_rate, subtype='PCM_16')  # 16-bit PCM WAV
-            temp_path = temp_wav
-        except Exception as conv_error:
-            print(f"Audio conversion error: {str(conv_error)}")
-            # Cleanup
-            if os.path.exists(temp_webm):
-                os.unlink(temp_webm)
-            raise
+        # Save trial data to database
+        if trial_data is not None:
+            trial_data['audio_duration'] = durations
+            save_articulation_trials(trial_data['user_id'], [trial_data])
         
-        try:
-            print(f"Assessing pronunciation for target: '{target}'")
-            
-            # Check if Azure is configured
-            if not AZURE_SPEECH_KEY or AZURE_SPEECH_KEY == 'YOUR_AZURE_SPEECH_KEY_HERE':
-                print("Azure not configured, using fallback simple matching")
-                # Simple fallback scoring
-                computed_score = 0.75  # Default moderate score
-                feedback = f"Azure Speech not configured. Please add AZURE_SPEECH_KEY to .env file."
-                transcription = target  # Assume correct for now
-                
-                return jsonify({
-                    'success': True,
-                    'scores': {
-                        'computed_score': computed_score
-                    },
-                    'feedback': feedback,
-                    'transcription': transcription,
-                    'target': target,
-                    'note': 'Using fallback scoring. Configure Azure for accurate assessment.'
-                }), 200
-            
-            # Use Azure Pronunciation Assessment
-            result = assess_pronunciation_azure(temp_path, target)
-            
-            if not result['success']:
-                return jsonify({
-                    'success': False,
-                    'message': 'Pronunciation assessment failed',
-                    'error': result.get('error', 'Unknown error')
-                }), 500
-            
-            # Azure gives us detailed scores!
-            accuracy = result['accuracy_score']
-            pronunciation = result['pronunciation_score']
-            completeness = result['completeness_score']
-            fluency = result['fluency_score']
-            
-            # Combine scores (emphasize pronunciation for articulation therapy)
-            computed_score = (pronunciation * 0.5) + (accuracy * 0.3) + (completeness * 0.2)
-            
-            # Generate feedback based on Azure's detailed analysis
-            transcription = result['transcription']
-            
-            if computed_score >= 0.90:
-                feedback = f"🎉 Excellent pronunciation! Score: {int(computed_score*100)}%"
-            elif computed_score >= 0.75:
-                feedback = f"👍 Good job! You said '{transcription}'. Score: {int(computed_score*100)}%"
-            elif computed_score >= 0.50:
-                feedback = f"Keep practicing '{target}'. Score: {int(computed_score*100)}%"
-            else:
-                feedback = f"Try listening to the model again. Score: {int(computed_score*100)}%"
-            
-            print(f"Azure Assessment - Target: '{target}' | Said: '{transcription}' | Score: {computed_score:.2f}")
-            print(f"Detailed: Accuracy={accuracy:.2f}, Pronunciation={pronunciation:.2f}, Completeness={completeness:.2f}, Fluency={fluency:.2f}")
-            
-            # Save trial data to database
-            trial_data = {
-                'user_id': str(current_user['_id']),
-                'sound_id': sound_id,
-                'level': level,
-                'item_index': item_index,
-                'target': target,
-                'trial': trial,
-                'scores': {
-                    'accuracy_score': round(accuracy, 3),
-                    'pronunciation_score': round(pronunciation, 3),
-                    'completeness_score': round(completeness, 3),
-                    'fluency_score': round(fluency, 3),
-                    'computed_score': round(computed_score, 3)
-                },
-                'transcription': transcription,
-                'feedback': feedback,
-                'timestamp': datetime.datetime.utcnow()
-            }
-            articulation_trials_collection.insert_one(trial_data)
-            
-            return jsonify({
-                'success': True,
-                'scores': {
-                    'accuracy_score': round(accuracy, 3),
-                    'pronunciation_score': round(pronunciation, 3),
-                    'completeness_score': round(completeness, 3),
-                    'fluency_score': round(fluency, 3),
-                    'computed_score': round(computed_score, 3)
-                },
-                'feedback': feedback,
-                'transcription': transcription,
-                'target': target,
-                'phonemes': result.get('phonemes', [])
-            }), 200
-            
-        finally:
-            # Clean up temporary files
-            try:
-                if os.path.exists(temp_wav):
-                    os.unlink(temp_wav)
-            except:
-                pass
-            try:
-                if os.path.exists(temp_webm):
-                    os.unlink(temp_webm)
-            except:
-                pass
+        return jsonify(response_body), status
         
+    except AudioRejected as e:
+        return audio_rejected_response(e)
+    except RecognitionBusy:
+        return speech_busy_response()
     except Exception as e:
         import traceback
         print(f"Error processing recording: {str(e)}")
         print(traceback.format_exc())
         return jsonify({'success': False, 'message': 'Failed to process recording', 'error': str(e)}), 500
 
+@app.route('/api/articulation/record-batch', methods=['POST'])
+@claims_required
+def record_articulation_batch(current_user):
+    """
+    Score all trials of one item in one request: several 'audio' files for the same
+    sound_id/level/item_index are decoded and assessed concurrently, saved with a
+    single insert_many, and returned with the item average. A trial that can't be
+    scored reports its own error and status; the others are still saved.
+    """
+    try:
+        audio_files = request.files.getlist('audio')
+        if not audio_files:
+            return jsonify({'success': False, 'message': 'No audio file provided'}), 400
+        if len(audio_files) > BATCH_MAX_TRIALS:
+            return jsonify({'success': False, 'message': f'At most {BATCH_MAX_TRIALS} recordings per batch'}), 400
+        
+        target = request.form.get('target', '').strip()
+        sound_id = request.form.get('sound_id', '').strip()
+        level = int(request.form.get('level', 1))
+        item_index = int(request.form.get('item_index', 0))
+        first_trial = int(request.form.get('first_trial', 1))
+        
+        if not target:
+            return jsonify({'success': False, 'message': 'Target text is required'}), 400
+        
+        user_id = str(current_user['_id'])
+        
+        def score_trial(audio_file, trial):
+            # Failures stay with their trial, so the trials that did score are still saved
+            try:
+                recording = ingest_speech(audio_file, 'articulation')
+                pcm_bytes, durations = recording.pcm_bytes, recording.durations
+                if pcm_bytes is None:
+                    return {'success': False, 'message': NO_SPEECH_MESSAGE, 'audio_duration': durations}, 400, None
+                result, fresh_speech_result = score_articulation(pcm_bytes, sound_id, level, target)
+                response_body, status, trial_data = articulation_trial(
+                    user_id, result, fresh_speech_result, pcm_bytes,
+                    sound_id, level, item_index, target, trial
+                )
+            except AudioRejected as e:
+                return {'success': False, 'message': e.message}, e.status, None
+            except RecognitionBusy:
+                return {'success': False, 'busy': True,
+                        'message': 'Speech assessment is busy, please try again in a moment'}, 503, None
+            except Exception as e:
+                print(f"Error processing trial {trial}: {str(e)}")
+                return {'success': False, 'message': 'Failed to process recording', 'error': str(e)}, 500, None
+            response_body['audio_duration'] = durations
+            if trial_data is not None:
+                trial_data['audio_duration'] = durations
+            return response_body, status, trial_data
+        
+        print(f"Assessing {len(audio_files)} trials for target: '{target}'")
+        futures = [
+            batch_executor.submit(score_trial, audio_file, first_trial + i)
+            for i, audio_file in enumerate(audio_files)
+        ]
+        outcomes = [future.result() for future in futures]
+        
+        trials = []
+        trial_docs = []
+        for i, (response_body, status, trial_data) in enumerate(outcomes):
+            trials.append(dict(response_body, trial=first_trial + i, status=status))
+            if trial_data is not None:
+                trial_docs.append(trial_data)
+        
+        # Save all trials in one round trip
+        if trial_docs:
+            save_articulation_trials(trial_docs[0]['user_id'], trial_docs)
+        
+        scored = [t['scores']['computed_score'] for t in trials if t.get('success')]
+        average_score = round(sum(scored) / len(scored), 3) if scored else None
+        
+        return jsonify({
+            'success': bool(scored),
+            'sound_id': sound_id,
+            'level': level,
+            'item_index': item_index,
+            'target': target,
+            'trials': trials,
+            'average_score': average_score
+        }), 200 if scored else trials[0]['status']
+        
+    except Exception as e:
+        import traceback
+        print(f"Error processing recording batch: {str(e)}")
+        print(traceback.format_exc())
+        return jsonify({'success': False, 'message': 'Failed to process recordings', 'error': str(e)}), 500
+
+@sock.route('/ws/articulation')
+def articulation_stream(ws):
+    """
+    Streaming articulation assessment while the child is still speaking.
+    Client sends a JSON start message {token, sound_id, level, item_index, trial, target},
+    then binary frames of 16kHz mono 16-bit PCM, then {"type": "end"} at the end of speech.
+    Server sends {"type": "partial", "text"} while recognizing and finally
+    {"type": "result", ...} with the same body and status as /api/articulation/record.
+    Every failure, before or during the session, is a result with success False.
+    """
+    send_lock = threading.Lock()
+    
+    def send(payload):
+        with send_lock:
+            ws.send(json.dumps(payload))
+    
+    def fail(status, message, **extra):
+        send(dict(extra, type='result', status=status, success=False, message=message))
+    
+    # A malformed start message gets a failed result (what the client waits for), not a dropped socket
+    try:
+        start = json.loads(ws.receive(timeout=10) or '{}')
+        token = str(start.get('token', ''))
+        target = str(start.get('target', '')).strip()
+        sound_id = str(start.get('sound_id', '')).strip()
+        level = int(start.get('level', 1))
+        item_index = int(start.get('item_index', 0))
+        trial = int(start.get('trial', 1))
+    except (ValueError, TypeError, AttributeError) as e:
+        fail(400, 'Invalid start message', error=str(e))
+        return
+    
+    current_user = user_from_token(token)
+    if not current_user:
+        fail(401, 'Token is invalid!')
+        return
+    
+    if not target:
+        fail(400, 'Target text is required')
+        return
+    
+    if not stream_slots.acquire(blocking=False):
+        fail(503, 'Speech assessment is busy, please try again in a moment', busy=True)
+        return
+    
+    stream = None
+    timer = StageTimer()
+    try:
+        if speech_backend.configured:
+            stream = speech_backend.open_stream(target, on_partial=lambda text: send({'type': 'partial', 'text': text}))
+        
+        # Forward chunks as they arrive; stop at "end", the length cap or an idle client
+        chunks = []
+        received = 0
+        max_bytes = int(STREAM_MAX_SECONDS * TARGET_SAMPLE_RATE * 2)
+        while True:
+            message = ws.receive(timeout=STREAM_IDLE_SECONDS)
+            if message is None:
+                break
+            if isinstance(message, (bytes, bytearray)):
+                received += len(message)
+                if received > max_bytes:
+                    break
+                chunks.append(bytes(message))
+                if stream is not None:
+                    stream.write(bytes(message))
+            elif json.loads(message).get('type') == 'end':
+                break
+        trimmed, durations = trim_silence(np.frombuffer(b''.join(chunks), dtype='<i2'))
+        if trimmed is None:
+            fail(400, NO_SPEECH_MESSAGE, audio_duration=durations)
+            return
+        pcm_bytes = trimmed.tobytes()
+        
+        def finish_stream():
+            with timer.stage('finalize'):
+                return pronunciation_result_dict(stream.finish())
+        
+        result, fresh_speech_result = score_articulation(
+            pcm_bytes, sound_id, level, target,
+            assess=finish_stream if stream is not None else None
+        )
+        response_body, status, trial_data = articulation_trial(
+            str(current_user['_id']), result, fresh_speech_result, pcm_bytes,
+            sound_id, level, item_index, target, trial
+        )
+        response_body['audio_duration'] = durations
+        if trial_data is not None:
+            trial_data['audio_duration'] = durations
+            save_articulation_trials(trial_data['user_id'], [trial_data])
+        
+        send(dict(response_body, type='result', status=status))
+        
+    except RecognitionBusy:
+        fail(503, 'Speech assessment is busy, please try again in a moment', busy=True)
+    except Exception as e:
+        import traceback
+        print(f"Error in articulation stream: {str(e)}")
+        print(traceback.format_exc())
+        try:
+            fail(500, 'Failed to process recording', error=str(e))
+        except Exception:
+            pass  # Client already went away
+    finally:
+        if stream is not None and 'finalize' not in timer.timings:
+            stream.cancel()
+        stream_slots.release()
+        speech_backend.record('articulation_stream', timer.timings)
+
+@app.route('/api/articulation/templates', methods=['POST'])
+@claims_required
+def enroll_articulation_template(current_user):
+    """Add a reference recording for the local articulation scorer (admin only)"""
+    try:
+        if current_user.get('role') != 'admin':
+            return jsonify({'success': False, 'message': 'Unauthorized. Admin access required.'}), 403
+        
+        if 'audio' not in request.files:
+            return jsonify({'success': False, 'message': 'No audio file provided'}), 400
+        
+        target = request.form.get('target', '').strip()
+        sound_id = request.form.get('sound_id', '').strip()
+        level = int(request.form.get('level', 1))
+        
+        if not target or not sound_id:
+            return jsonify({'success': False, 'message': 'sound_id and target are required'}), 400
+        
+        recording = ingest_speech(request.files['audio'], 'articulation')
+        if not recording.has_speech or not articulation_templates.enroll(
+                sound_id, level, target, recording.samples, source='admin'):
+            return jsonify({'success': False, 'message': 'Recording contains no speech'}), 400
+        
+        return jsonify({
+            'success': True,
+            'message': 'Reference recording added',
+            'templates': articulation_templates.count(sound_id, level, target)
+        }), 201
+        
+    except AudioRejected as e:
+        return audio_rejected_response(e)
+    except Exception as e:
+        print(f"Error enrolling template: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to add reference recording', 'error': str(e)}), 500
+
+@app.route('/api/articulation/phonemes/weakest', methods=['GET'])
+@claims_required
+def get_weakest_phonemes(current_user):
+    """Lowest-scoring phonemes across a user's articulation trials (therapists may pass user_id)"""
+    try:
+        user_id = str(current_user['_id'])
+        if request.args.get('user_id') and current_user.get('role') in ('therapist', 'admin'):
+            user_id = request.args['user_id']
+        limit = min(int(request.args.get('limit', 5)), 40)
+        
+        return jsonify({
+            'success': True,
+            'user_id': user_id,
+            'phonemes': phoneme_stats.weakest(user_id, limit=limit)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': 'Failed to get phoneme scores', 'error': str(e)}), 500
+
 @app.route('/api/articulation/exercises/<sound_id>/<int:level>', methods=['GET'])
-@token_required
+@claims_required
 def get_exercises(current_user, sound_id, level):
     """Mock endpoint for getting exercise items"""
     try:
@@ -799,7 +1351,7 @@ def get_exercises(current_user, sound_id, level):
         return jsonify({'success': False, 'message': 'Failed to get exercises', 'error': str(e)}), 500
 
 @app.route('/api/articulation/progress', methods=['POST'])
-@token_required
+@claims_required
 def save_progress(current_user):
     """Save user's articulation progress"""
     try:
@@ -813,38 +1365,13 @@ def save_progress(current_user):
         average_score = data.get('average_score', 0)
         trial_details = data.get('trial_details', [])
         
-        # Find or create progress document
-        progress_doc = articulation_progress_collection.find_one({
-            'user_id': user_id,
-            'sound_id': sound_id
-        })
-        
-        if not progress_doc:
-            # Create new progress document
-            progress_doc = {
-                'user_id': user_id,
-                'sound_id': sound_id,
-                'levels': {},
-                'created_at': datetime.datetime.utcnow(),
-                'updated_at': datetime.datetime.utcnow()
-            }
-        
-        # Update level progress
-        level_key = str(level)
-        if level_key not in progress_doc.get('levels', {}):
-            progress_doc.setdefault('levels', {})[level_key] = {'items': {}}
-        
-        # Update item progress
-        item_key = str(item_index)
-        progress_doc['levels'][level_key]['items'][item_key] = {
-            'completed': completed,
-            'average_score': average_score,
-            'trial_details': trial_details,
-            'last_attempt': datetime.datetime.utcnow()
-        }
+        # Both become part of a field path, so they must be plain integers
+        try:
+            level = int(level)
+            item_index = int(item_index)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'message': 'level and item_index must be integers'}), 400
         
-        # Check if level is complete (all items completed)
-        level_data = progress_doc['levels'][level_key]
         # Determine total items for this level (1 for level 1, 3 for level 2, 2 for others)
         if level == 1:
             total_items = 1
@@ -852,19 +1379,39 @@ def save_progress(current_user):
             total_items = 3
         else:
             total_items = 2
-            
-        completed_items = sum(1 for item in level_data.get('items', {}).values() if item.get('completed', False))
-        level_data['is_complete'] = completed_items >= total_items
-        level_data['completed_items'] = completed_items
-        level_data['total_items'] = total_items
         
-        progress_doc['updated_at'] = datetime.datetime.utcnow()
-        
-        # Upsert progress document
-        articulation_progress_collection.update_one(
+        # One atomic upsert: set just this item, then let the server recount the level.
+        # Concurrent saves of other items can't be lost and the write doesn't grow with history.
+        now = datetime.datetime.utcnow()
+        level_path = f'levels.{level}'
+        item_path = f'{level_path}.items.{item_index}'
+        progress_doc = upsert_progress(
+            articulation_progress_collection,
             {'user_id': user_id, 'sound_id': sound_id},
-            {'$set': progress_doc},
-            upsert=True
+            [
+                {'$set': {
+                    item_path: {'$literal': {
+                        'completed': completed,
+                        'average_score': average_score,
+                        'trial_details': trial_details,
+                        'last_attempt': now
+                    }},
+                    'created_at': {'$ifNull': ['$created_at', now]},
+                    'updated_at': now
+                }},
+                {'$set': {
+                    f'{level_path}.completed_items': {'$size': {'$filter': {
+                        'input': {'$objectToArray': f'${level_path}.items'},
+                        'cond': {'$eq': ['$$this.v.completed', True]}
+                    }}},
+                    f'{level_path}.total_items': total_items
+                }},
+                {'$set': {
+                    f'{level_path}.is_complete': {'$gte': [f'${level_path}.completed_items', total_items]}
+                }}
+            ],
+            # Just the level that changed, so the response doesn't grow with the history
+            {'_id': 0, 'sound_id': 1, level_path: 1}
         )
         
         return jsonify({
@@ -880,7 +1427,7 @@ def save_progress(current_user):
         return jsonify({'success': False, 'message': 'Failed to save progress', 'error': str(e)}), 500
 
 @app.route('/api/articulation/progress/<sound_id>', methods=['GET'])
-@token_required
+@claims_required
 def get_progress(current_user, sound_id):
     """Get user's articulation progress for a specific sound"""
     try:
@@ -943,7 +1490,7 @@ def get_progress(current_user, sound_id):
         return jsonify({'success': False, 'message': 'Failed to get progress', 'error': str(e)}), 500
 
 @app.route('/api/articulation/progress/all', methods=['GET'])
-@token_required
+@claims_required
 def get_all_progress(current_user):
     """Get user's progress across all sounds"""
     try:
@@ -965,80 +1512,66 @@ def get_all_progress(current_user):
         return jsonify({'success': False, 'message': 'Failed to get all progress', 'error': str(e)}), 500
 
 @app.route('/api/language/assess-expressive', methods=['POST'])
-@token_required
+@claims_required
 def assess_expressive_language(current_user):
     """Assess expressive language using Azure Speech-to-Text and Text Analytics"""
+    timer = StageTimer()
     try:
-        import azure.cognitiveservices.speech as speechsdk
-        import io
-        import wave
-        
         # Get audio file
         audio_file = request.files.get('audio')
         if not audio_file:
             return jsonify({'success': False, 'message': 'No audio file provided'}), 400
         
-        # Get exercise parameters
+        # Scoring spec comes from the exercise itself. Posted fields are only honoured
+        # with ACCEPT_POSTED_EXERCISE_SPECS, from older clients that send no exercise_id,
+        # and their matcher isn't cached
         exercise_id = request.form.get('exercise_id')
-        exercise_type = request.form.get('exercise_type')
-        expected_keywords_str = request.form.get('expected_keywords', '[]')
-        min_words = int(request.form.get('min_words', 5))
-        
-        import json
-        expected_keywords = json.loads(expected_keywords_str)
+        spec = language_exercise_specs.get(exercise_id)
+        if spec is not None:
+            expected_keywords = spec.get('expected_keywords') or []
+            min_words = int(spec.get('min_words') or 5)
+            keyword_matcher = keyword_matchers.get(exercise_id, expected_keywords)
+        elif ACCEPT_POSTED_EXERCISE_SPECS and not exercise_id and 'expected_keywords' in request.form:
+            expected_keywords = json.loads(request.form.get('expected_keywords', '[]'))
+            min_words = int(request.form.get('min_words', 5))
+            keyword_matcher = KeywordMatcher(expected_keywords)
+        else:
+            return jsonify({'success': False, 'message': 'Exercise not found'}), 404
         
         # Azure Speech Config
-        speech_key = os.getenv('AZURE_SPEECH_KEY')
-        service_region = os.getenv('AZURE_SPEECH_REGION')
-        
-        if not speech_key or not service_region:
+        if not speech_backend.configured:
             return jsonify({'success': False, 'message': 'Azure credentials not configured'}), 500
         
-        speech_config = speechsdk.SpeechConfig(subscription=speech_key, region=service_region)
-        speech_config.speech_recognition_language = "en-US"
-        
-        # Save audio to temporary file
-        import tempfile
-        audio_bytes = audio_file.read()
+        # Validate and decode the upload to 16kHz mono PCM in memory; silent clips never reach Azure
+        recording = ingest_speech(audio_file, 'expressive', timer)
+        pcm_bytes, durations = recording.pcm_bytes, recording.durations
+        print(f"Expressive assessment - upload size: {recording.upload_bytes} bytes, "
+              f"duration: {durations['original_duration']}s -> {durations['trimmed_duration']}s")
+        if pcm_bytes is None:
+            return no_speech_response()
+        
+        # Identical retries are answered from the result cache without calling Azure
+        cache_key = result_cache.key('expressive', pcm_bytes, {
+            'expected_keywords': expected_keywords,
+            'min_words': min_words
+        })
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return jsonify(dict(cached, cached=True)), 200
         
-        # Create temporary file for WAV audio
-        temp_wav = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-        temp_wav_path = temp_wav.name
-        temp_wav.close()
+        # Perform speech recognition (long answers are split at pauses and recognized in parallel)
+        result, chunk_count = recognize_recording(recording, timer, expected_text=' '.join(expected_keywords))
         
-        try:
-            # Write the WAV audio directly (frontend now converts to WAV)
-            with open(temp_wav_path, 'wb') as f:
-                f.write(audio_bytes)
-            
-            print(f"Audio file saved: {temp_wav_path}, size: {len(audio_bytes)} bytes")
-            
-            # Create Azure audio config with the WAV file
-            audio_config = speechsdk.audio.AudioConfig(filename=temp_wav_path)
-            speech_recognizer = speechsdk.SpeechRecognizer(speech_config=speech_config, audio_config=audio_config)
-            
-            # Perform speech recognition
-            result = speech_recognizer.recognize_once()
-            
-            # Close/release the recognizer to free the file
-            del speech_recognizer
-            del audio_config
-            
-            import os as os_module
-            import time
-            
-            if result.reason == speechsdk.ResultReason.RecognizedSpeech:
+        if result.recognized:
+            with timer.stage('parse'):
                 transcription = result.text
                 
                 # Basic text analysis (word count, keyword matching)
                 words = transcription.lower().split()
                 word_count = len(words)
                 
-                # Check for expected keywords
-                keywords_found = []
-                for keyword in expected_keywords:
-                    if keyword.lower() in transcription.lower():
-                        keywords_found.append(keyword)
+                # Check for expected keywords (stemmed, token-level; compiled once per exercise)
+                keywords_found = keyword_matcher.match(transcription)
                 
                 # Calculate score
                 keyword_score = len(keywords_found) / len(expected_keywords) if expected_keywords else 0
@@ -1056,73 +1589,49 @@ def assess_expressive_language(current_user):
                     feedback = "Fair response. Try to include more details."
                 else:
                     feedback = "Your response needs improvement. Try to include more relevant information."
-                
-                # Wait a bit for file handle to be released, then clean up
-                time.sleep(0.1)
-                try:
-                    if os_module.path.exists(temp_wav_path):
-                        os_module.unlink(temp_wav_path)
-                except Exception as cleanup_error:
-                    print(f"Warning: Could not delete temp file: {cleanup_error}")
-                
-                return jsonify({
-                    'success': True,
-                    'transcription': transcription,
-                    'key_phrases': keywords_found,
-                    'word_count': word_count,
-                    'score': overall_score,
-                    'feedback': feedback
-                }), 200
-            
-            elif result.reason == speechsdk.ResultReason.NoMatch:
-                # Wait a bit for file handle to be released, then clean up
-                time.sleep(0.1)
-                try:
-                    if os_module.path.exists(temp_wav_path):
-                        os_module.unlink(temp_wav_path)
-                except Exception as cleanup_error:
-                    print(f"Warning: Could not delete temp file: {cleanup_error}")
-                    
-                return jsonify({
-                    'success': False,
-                    'message': 'No speech could be recognized. Please try speaking more clearly.'
-                }), 400
             
-            else:
-                # Wait a bit for file handle to be released, then clean up
-                time.sleep(0.1)
-                try:
-                    if os_module.path.exists(temp_wav_path):
-                        os_module.unlink(temp_wav_path)
-                except Exception as cleanup_error:
-                    print(f"Warning: Could not delete temp file: {cleanup_error}")
-                    
-                return jsonify({
-                    'success': False,
-                    'message': 'Speech recognition failed. Please try again.'
-                }), 400
-                
-        except Exception as e:
-            # Wait a bit for file handle to be released, then clean up
-            import os as os_module
-            import time
-            time.sleep(0.1)
-            try:
-                if os_module.path.exists(temp_wav_path):
-                    os_module.unlink(temp_wav_path)
-            except Exception as cleanup_error:
-                print(f"Warning: Could not delete temp file: {cleanup_error}")
-            raise e
+            response_body = {
+                'success': True,
+                'transcription': transcription,
+                'key_phrases': keywords_found,
+                'word_count': word_count,
+                'score': overall_score,
+                'feedback': feedback,
+                'audio_duration': durations,
+                'recognition_chunks': chunk_count,
+                'recording_hash': archive_recording(pcm_bytes)
+            }
+            result_cache.put(cache_key, response_body)
             
+            return jsonify(response_body), 200
+        
+        elif result.no_match:
+            return jsonify({
+                'success': False,
+                'message': NO_SPEECH_MESSAGE
+            }), 400
+        
+        else:
+            return jsonify({
+                'success': False,
+                'message': 'Speech recognition failed. Please try again.'
+            }), 400
+    
+    except AudioRejected as e:
+        return audio_rejected_response(e)
+    except RecognitionBusy:
+        return speech_busy_response()
     except Exception as e:
         import traceback
         print(f"Error assessing expressive language: {str(e)}")
         print(traceback.format_exc())
         return jsonify({'success': False, 'message': 'Assessment failed', 'error': str(e)}), 500
+    finally:
+        speech_backend.record('expressive', timer.timings)
 
 # Language Therapy Progress Endpoints
 @app.route('/api/language/progress', methods=['POST'])
-@token_required
+@claims_required
 def save_language_progress(current_user):
     """Save user's language therapy progress"""
     try:
@@ -1137,45 +1646,15 @@ def save_language_progress(current_user):
         user_answer = data.get('user_answer')
         transcription = data.get('transcription')
         
-        # Find or create progress document
-        progress_doc = language_progress_collection.find_one({
-            'user_id': user_id,
-            'mode': mode
-        })
-        
-        if not progress_doc:
-            # Create new progress document
-            progress_doc = {
-                'user_id': user_id,
-                'mode': mode,
-                'exercises': {},
-                'created_at': datetime.datetime.utcnow(),
-                'updated_at': datetime.datetime.utcnow()
-            }
-        
-        # Update exercise progress
-        exercise_key = str(exercise_index)
-        progress_doc.setdefault('exercises', {})[exercise_key] = {
-            'exercise_id': exercise_id,
-            'completed': True,
-            'is_correct': is_correct,
-            'score': score,
-            'user_answer': user_answer,
-            'transcription': transcription,
-            'last_attempt': datetime.datetime.utcnow()
-        }
-        
-        # Calculate overall progress
-        exercises = progress_doc.get('exercises', {})
-        total_exercises = len(exercises)
-        completed_exercises = sum(1 for ex in exercises.values() if ex.get('completed', False))
-        correct_exercises = sum(1 for ex in exercises.values() if ex.get('is_correct', False))
+        try:
+            exercise_path = f'exercises.{int(exercise_index)}'
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'message': 'exercise_index must be an integer'}), 400
         
-        progress_doc['total_exercises'] = total_exercises
-        progress_doc['completed_exercises'] = completed_exercises
-        progress_doc['correct_exercises'] = correct_exercises
-        progress_doc['accuracy'] = (correct_exercises / completed_exercises) if completed_exercises > 0 else 0
-        progress_doc['updated_at'] = datetime.datetime.utcnow()
+        now = datetime.datetime.utcnow()
+        # 1/0 for what the exercise held before this answer (0 when it is new)
+        was_completed = {'$cond': [{'$eq': [f'${exercise_path}.completed', True]}, 1, 0]}
+        was_correct = {'$cond': [{'$eq': [f'${exercise_path}.is_correct', True]}, 1, 0]}
         
         # Save trial data
         trial_data = {
@@ -1187,25 +1666,58 @@ def save_language_progress(current_user):
             'score': score,
             'user_answer': user_answer,
             'transcription': transcription,
-            'timestamp': datetime.datetime.utcnow()
+            'recording_hash': data.get('recording_hash'),
+            'timestamp': now
         }
+        # The trial and the progress update can't share one batched write: they go to
+        # different collections, and a cross-collection bulk write needs
+        # MongoClient.bulk_write (PyMongo 4.9+ with MongoDB 8.0), while we pin pymongo 4.6
         language_trials_collection.insert_one(trial_data)
         
-        # Upsert progress document
-        language_progress_collection.update_one(
+        # Overwrite this exercise and adjust the counters by the difference from its
+        # previous answer, in one atomic pipeline update (no reload, no recount)
+        progress_doc = upsert_progress(
+            language_progress_collection,
             {'user_id': user_id, 'mode': mode},
-            {'$set': progress_doc},
-            upsert=True
+            [
+                {'$set': {
+                    exercise_path: {'$literal': {
+                        'exercise_id': exercise_id,
+                        'completed': True,
+                        'is_correct': bool(is_correct),
+                        'score': score,
+                        'user_answer': user_answer,
+                        'transcription': transcription,
+                        'last_attempt': now
+                    }},
+                    'total_exercises': {'$add': [
+                        {'$ifNull': ['$total_exercises', 0]},
+                        {'$cond': [{'$eq': [{'$type': f'${exercise_path}'}, 'missing']}, 1, 0]}
+                    ]},
+                    'completed_exercises': {'$subtract': [
+                        {'$add': [{'$ifNull': ['$completed_exercises', 0]}, 1]}, was_completed
+                    ]},
+                    'correct_exercises': {'$subtract': [
+                        {'$add': [{'$ifNull': ['$correct_exercises', 0]}, 1 if is_correct else 0]}, was_correct
+                    ]},
+                    'created_at': {'$ifNull': ['$created_at', now]},
+                    'updated_at': now
+                }},
+                {'$set': {
+                    'accuracy': {'$cond': [
+                        {'$gt': ['$completed_exercises', 0]},
+                        {'$divide': ['$correct_exercises', '$completed_exercises']},
+                        0
+                    ]}
+                }}
+            ],
+            {'_id': 0, 'completed_exercises': 1, 'total_exercises': 1, 'accuracy': 1}
         )
         
         return jsonify({
             'success': True,
             'message': 'Progress saved successfully',
-            'progress': {
-                'completed_exercises': completed_exercises,
-                'total_exercises': total_exercises,
-                'accuracy': progress_doc['accuracy']
-            }
+            'progress': progress_doc
         }), 200
         
     except Exception as e:
@@ -1215,7 +1727,7 @@ def save_language_progress(current_user):
         return jsonify({'success': False, 'message': 'Failed to save progress', 'error': str(e)}), 500
 
 @app.route('/api/language/progress/<mode>', methods=['GET'])
-@token_required
+@claims_required
 def get_language_progress(current_user, mode):
     """Get user's language therapy progress for a specific mode"""
     try:
@@ -1277,7 +1789,7 @@ def get_language_progress(current_user, mode):
         return jsonify({'success': False, 'message': 'Failed to get progress', 'error': str(e)}), 500
 
 @app.route('/api/language/progress/all', methods=['GET'])
-@token_required
+@claims_required
 def get_all_language_progress(current_user):
     """Get user's progress across all language therapy modes"""
     try:
@@ -1303,30 +1815,31 @@ fluency_progress_collection = db['fluency_progress']
 fluency_trials_collection = db['fluency_trials']
 
 @app.route('/api/fluency/assess', methods=['POST'])
-@token_required
+@claims_required
 def assess_fluency(current_user):
     """Assess fluency using Azure Speech-to-Text with word-level timing"""
+    timer = StageTimer()
     try:
-        import azure.cognitiveservices.speech as speechsdk
-        import tempfile
-        import os as os_module
-        import time
-        
         # Get audio file
         audio_file = request.files.get('audio')
         if not audio_file:
             return jsonify({'success': False, 'message': 'No audio file provided'}), 400
         
-        # Get exercise parameters
-        target_text = request.form.get('target_text', '')
-        expected_duration = float(request.form.get('expected_duration', 10))
-        exercise_type = request.form.get('exercise_type', '')
+        # Scoring spec comes from the exercise itself. Posted fields are only honoured
+        # with ACCEPT_POSTED_EXERCISE_SPECS, from older clients that send no exercise_id
+        exercise_id = request.form.get('exercise_id')
+        spec = fluency_exercise_specs.get(exercise_id)
+        if spec is not None:
+            target_text = spec.get('target') or ''
+            expected_duration = float(spec.get('expected_duration') or 10)
+        elif ACCEPT_POSTED_EXERCISE_SPECS and not exercise_id and 'target_text' in request.form:
+            target_text = request.form.get('target_text', '')
+            expected_duration = float(request.form.get('expected_duration', 10))
+        else:
+            return jsonify({'success': False, 'message': 'Exercise not found'}), 404
         
         # Azure Speech Config
-        speech_key = os.getenv('AZURE_SPEECH_KEY')
-        service_region = os.getenv('AZURE_SPEECH_REGION')
-        
-        if not speech_key or not service_region or speech_key == 'YOUR_AZURE_SPEECH_KEY_HERE':
+        if not speech_backend.configured:
             # Return mock data if Azure is not configured
             print("Warning: Azure not configured, returning mock fluency data")
             return jsonify({
@@ -1339,202 +1852,142 @@ def assess_fluency(current_user):
                 'duration': expected_duration,
                 'word_count': len(target_text.split()),
                 'feedback': 'Good job! (Note: Using mock data - configure Azure for real assessment)',
-                'pauses': [],
-                'words': []
+                'pauses': {'position': [], 'duration': []},
+                'words': {'word': [], 'offset': [], 'duration': []}
             }), 200
         
-        speech_config = speechsdk.SpeechConfig(subscription=speech_key, region=service_region)
-        speech_config.speech_recognition_language = "en-US"
-        speech_config.request_word_level_timestamps()  # Enable word timing
+        # Validate and decode the upload to 16kHz mono PCM in memory (same as language therapy)
+        recording = ingest_speech(audio_file, 'fluency', timer)
+        pcm_bytes, durations = recording.pcm_bytes, recording.durations
+        print(f"Fluency assessment - upload size: {recording.upload_bytes} bytes, "
+              f"duration: {durations['original_duration']}s -> {durations['trimmed_duration']}s")
+        if pcm_bytes is None:
+            return no_speech_response()
+        
+        # Identical retries are answered from the result cache without calling Azure
+        cache_key = result_cache.key('fluency', pcm_bytes, {
+            'target_text': target_text,
+            'expected_duration': expected_duration
+        })
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return jsonify(dict(cached, cached=True)), 200
         
-        # Save audio to temporary file (same simple approach as language therapy)
-        audio_bytes = audio_file.read()
+        # Acoustic disfluency detection runs in the process pool while Azure recognizes
+        disfluency_future = submit_detection(recording.samples)
         
-        # Create temporary file for WAV audio
-        temp_wav = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-        temp_wav_path = temp_wav.name
-        temp_wav.close()
+        # Perform speech recognition with word timing; long passages are split at pauses,
+        # recognized in parallel and merged back onto one timeline
+        result, chunk_count = recognize_recording(recording, timer, word_timestamps=True, expected_text=target_text)
         
-        try:
-            # Write the WAV audio directly (frontend already converts to WAV)
-            with open(temp_wav_path, 'wb') as f:
-                f.write(audio_bytes)
-            
-            print(f"Fluency assessment - Audio file: {temp_wav_path}, size: {len(audio_bytes)} bytes")
-            
-            # Create Azure audio config
-            audio_config = speechsdk.audio.AudioConfig(filename=temp_wav_path)
-            speech_recognizer = speechsdk.SpeechRecognizer(speech_config=speech_config, audio_config=audio_config)
-            
-            # Perform speech recognition with detailed results
-            result = speech_recognizer.recognize_once_async().get()
-            
-            # Release resources
-            del speech_recognizer
-            del audio_config
-            
-            if result.reason == speechsdk.ResultReason.RecognizedSpeech:
+        if result.recognized:
+            with timer.stage('parse'):
                 transcription = result.text
                 
                 # Get detailed timing information
-                import json
-                words = []
-                pauses = []
-                disfluencies = 0
-                
+                word_list = []
                 try:
                     detailed_result = json.loads(result.json)
                     
                     # Extract word timings
-                    if 'NBest' in detailed_result and len(detailed_result['NBest']) > 0:
-                        nbest = detailed_result['NBest'][0]
-                        if 'Words' in nbest:
-                            word_list = nbest['Words']
+                    if detailed_result.get('NBest'):
+                        word_list = detailed_result['NBest'][0].get('Words', [])
                 except Exception as json_error:
-                    print(f"Warning: Could not parse detailed results: {json_error}")
                     # Fall back to simple word count from transcription
-                    word_list = []
-                
-                if word_list:
-                    prev_end_time = 0
-                    prev_word = None
-                    
-                    for i, word_info in enumerate(word_list):
-                        word = word_info.get('Word', '')
-                        offset = word_info.get('Offset', 0) / 10000000  # Convert to seconds
-                        duration = word_info.get('Duration', 0) / 10000000
-                        
-                        words.append({
-                            'word': word,
-                            'offset': offset,
-                            'duration': duration
-                        })
-                        
-                        # Detect pauses (silence > 300ms between words)
-                        if i > 0:
-                            pause_duration = offset - prev_end_time
-                            if pause_duration > 0.3:  # 300ms threshold
-                                pauses.append({
-                                    'position': i,
-                                    'duration': pause_duration
-                                })
-                        
-                        # Detect repetitions (same word repeated consecutively)
-                        if prev_word and word.lower() == prev_word.lower():
-                            disfluencies += 1
-                        
-                        # Detect prolongations (word duration > 1.5x expected)
-                        expected_word_duration = len(word) * 0.1  # Rough estimate
-                        if duration > expected_word_duration * 1.5:
-                            disfluencies += 1
-                        
-                        prev_end_time = offset + duration
-                        prev_word = word
-                
-                # Calculate metrics
-                total_words = len(words) if words else len(transcription.split())
-                total_duration = words[-1]['offset'] + words[-1]['duration'] if words else expected_duration
-                
-                # Speaking rate (WPM)
-                speaking_rate = int((total_words / total_duration) * 60) if total_duration > 0 else 0
-                
-                # Pause count
-                pause_count = len(pauses)
-                
-                # Calculate fluency score (0-100)
-                # Factors: speaking rate, pauses, disfluencies
-                
-                # Ideal speaking rate: 120-150 WPM
-                rate_score = 100
-                if speaking_rate < 80 or speaking_rate > 180:
-                    rate_score = max(0, 100 - abs(speaking_rate - 120))
-                
-                # Pause penalty: -5 points per excessive pause
-                pause_penalty = min(30, pause_count * 5)
-                
-                # Disfluency penalty: -10 points per disfluency
-                disfluency_penalty = min(40, disfluencies * 10)
-                
-                fluency_score = max(0, min(100, rate_score - pause_penalty - disfluency_penalty))
-                
-                # Generate feedback
-                if fluency_score >= 90:
-                    feedback = "Excellent fluency! Your speech was smooth and natural."
-                elif fluency_score >= 75:
-                    feedback = "Good fluency! Keep practicing to improve smoothness."
-                elif fluency_score >= 60:
-                    feedback = "Fair fluency. Try to reduce pauses and speak more steadily."
-                else:
-                    feedback = "Keep practicing. Focus on breathing and speaking slowly."
-                
-                print(f"Fluency Assessment Results:")
-                print(f"  Transcription: {transcription}")
-                print(f"  Words: {total_words}, Duration: {total_duration:.2f}s")
-                print(f"  Speaking Rate: {speaking_rate} WPM")
-                print(f"  Pauses: {pause_count}, Disfluencies: {disfluencies}")
-                print(f"  Fluency Score: {fluency_score}")
-                
-                # Clean up temp file
-                try:
-                    if os.path.exists(temp_wav_path):
-                        os.unlink(temp_wav_path)
-                except Exception as cleanup_error:
-                    print(f"Warning: Could not delete temp file: {cleanup_error}")
+                    print(f"Warning: Could not parse detailed results: {json_error}")
                 
-                return jsonify({
-                    'success': True,
-                    'transcription': transcription,
-                    'speaking_rate': speaking_rate,
-                    'fluency_score': fluency_score,
-                    'pause_count': pause_count,
-                    'disfluencies': disfluencies,
-                    'duration': round(total_duration, 1),
-                    'word_count': total_words,
-                    'feedback': feedback,
-                    'pauses': pauses[:5],  # Return first 5 pauses for analysis
-                    'words': words[:20]  # Return first 20 words for analysis
-                }), 200
+                # Gaps, pauses, rates and repetition/prolongation flags over the full passage
+                analysis = analyze_words(word_list) or {
+                    'word_count': len(transcription.split()),
+                    'total_duration': expected_duration,
+                    'speaking_rate': int(len(transcription.split()) / expected_duration * 60) if expected_duration > 0 else 0,
+                    'articulation_rate': 0,
+                    'pause_count': 0,
+                    'disfluencies': 0,
+                    'words': {'word': [], 'offset': [], 'duration': []},
+                    'pauses': {'position': [], 'duration': []}
+                }
+                total_words = analysis['word_count']
+                total_duration = analysis['total_duration']
+                speaking_rate = analysis['speaking_rate']
+                pause_count = analysis['pause_count']
+                disfluencies = analysis['disfluencies']
             
-            elif result.reason == speechsdk.ResultReason.NoMatch:
+            # Blocks, prolongations and part-word repetitions from the audio, placed on the words
+            disfluency_events = None
+            with timer.stage('disfluency'):
                 try:
-                    if os.path.exists(temp_wav_path):
-                        os.unlink(temp_wav_path)
-                except Exception as cleanup_error:
-                    print(f"Warning: Could not delete temp file: {cleanup_error}")
-                    
-                return jsonify({
-                    'success': False,
-                    'message': 'No speech could be recognized. Please try speaking more clearly.'
-                }), 400
+                    events = disfluency_future.result(timeout=ACOUSTIC_DISFLUENCY_TIMEOUT)
+                    disfluency_events = attach_to_words(events, analysis['words']['offset'], analysis['words']['duration'])
+                except Exception as detector_error:
+                    print(f"Warning: Acoustic disfluency detection failed, using word timing only: {detector_error}")
+            disfluencies, prolongations = combine_disfluencies(analysis, disfluency_events)
             
-            else:
-                try:
-                    if os.path.exists(temp_wav_path):
-                        os.unlink(temp_wav_path)
-                except Exception as cleanup_error:
-                    print(f"Warning: Could not delete temp file: {cleanup_error}")
-                    
-                return jsonify({
-                    'success': False,
-                    'message': 'Speech recognition failed. Please try again.'
-                }), 400
-                
-        except Exception as e:
-            try:
-                if os.path.exists(temp_wav_path):
-                    os.unlink(temp_wav_path)
-            except Exception as cleanup_error:
-                print(f"Warning: Could not delete temp file: {cleanup_error}")
-            raise e
+            # Calculate fluency score (0-100) from speaking rate, pauses and disfluencies
+            fluency_score = compute_fluency_score(speaking_rate, pause_count, disfluencies)
+            feedback = fluency_feedback(fluency_score)
             
+            print(f"Fluency Assessment Results:")
+            print(f"  Transcription: {transcription}")
+            print(f"  Words: {total_words}, Duration: {total_duration:.2f}s")
+            print(f"  Speaking Rate: {speaking_rate} WPM")
+            print(f"  Pauses: {pause_count}, Disfluencies: {disfluencies}")
+            print(f"  Fluency Score: {fluency_score}")
+            
+            response_body = {
+                'success': True,
+                'transcription': transcription,
+                'speaking_rate': speaking_rate,
+                'fluency_score': fluency_score,
+                'pause_count': pause_count,
+                'disfluencies': disfluencies,
+                'duration': round(total_duration, 1),
+                'word_count': total_words,
+                'feedback': feedback,
+                'audio_duration': durations,
+                'recognition_chunks': chunk_count,
+                'recording_hash': archive_recording(pcm_bytes),
+                'articulation_rate': analysis['articulation_rate'],
+                'pause_histogram': analysis.get('pause_histogram'),
+                'repetitions': analysis.get('repetitions', []),
+                'prolongations': prolongations,
+                'disfluency_source': 'acoustic' if disfluency_events is not None else 'timing',
+                'disfluency_events': disfluency_events,
+                'disfluency_counts': summarize_disfluencies(disfluency_events) if disfluency_events is not None else None,
+                # Columnar timing for the whole passage: one list per field
+                'pauses': analysis['pauses'],
+                'words': analysis['words']
+            }
+            result_cache.put(cache_key, response_body)
+            
+            return jsonify(response_body), 200
+        
+        elif result.no_match:
+            return jsonify({
+                'success': False,
+                'message': NO_SPEECH_MESSAGE
+            }), 400
+        
+        else:
+            return jsonify({
+                'success': False,
+                'message': 'Speech recognition failed. Please try again.'
+            }), 400
+    
+    except AudioRejected as e:
+        return audio_rejected_response(e)
+    except RecognitionBusy:
+        return speech_busy_response()
     except Exception as e:
         import traceback
         print(f"Error assessing fluency: {str(e)}")
         print(traceback.format_exc())
         return jsonify({'success': False, 'message': 'Assessment failed', 'error': str(e)}), 500
+    finally:
+        speech_backend.record('fluency', timer.timings)
 
 @app.route('/api/fluency/progress', methods=['POST'])
-@token_required
+@claims_required
 def save_fluency_progress(current_user):
     """Save user's fluency therapy progress"""
     try:
@@ -1592,6 +2045,8 @@ def save_fluency_progress(current_user):
             'pause_count': pause_count,
             'disfluencies': disfluencies,
             'passed': passed,
+            'recording_hash': data.get('recording_hash'),
+            'scoring_version': SCORING_VERSION,
             'timestamp': utc_now()
         }
         fluency_trials_collection.insert_one(trial_data)
@@ -1615,7 +2070,7 @@ def save_fluency_progress(current_user):
         return jsonify({'success': False, 'message': 'Failed to save progress', 'error': str(e)}), 500
 
 @app.route('/api/fluency/progress', methods=['GET'])
-@token_required
+@claims_required
 def get_fluency_progress(current_user):
     """Get user's fluency therapy progress"""
     try:
@@ -1680,7 +2135,7 @@ def get_fluency_progress(current_user):
 # ========== ADMIN ENDPOINTS ==========
 
 @app.route('/api/admin/stats', methods=['GET'])
-@token_required
+@claims_required
 def get_admin_stats(current_user):
     """Get admin dashboard statistics"""
     try:
@@ -1817,7 +2272,7 @@ def get_admin_stats(current_user):
         return jsonify({'success': False, 'message': 'Failed to get admin stats', 'error': str(e)}), 500
 
 @app.route('/api/admin/users', methods=['GET'])
-@token_required
+@claims_required
 def get_all_users(current_user):
     """Get all users for admin management"""
     try:
@@ -1879,7 +2334,7 @@ def get_all_users(current_user):
         return jsonify({'success': False, 'message': 'Failed to get users', 'error': str(e)}), 500
 
 @app.route('/api/admin/users/<user_id>', methods=['PUT'])
-@token_required
+@claims_required
 def admin_update_user(current_user, user_id):
     """Update user details (admin only)"""
     try:
@@ -1907,6 +2362,8 @@ def admin_update_user(current_user, user_id):
             {'_id': ObjectId(user_id)},
             {'$set': update_fields}
         )
+        user_cache.invalidate(user_id)
+        revocation_list.revoke(user_id)
         
         if result.modified_count == 0:
             return jsonify({'message': 'User not found or no changes made'}), 404
@@ -1923,7 +2380,7 @@ def admin_update_user(current_user, user_id):
         return jsonify({'success': False, 'message': 'Failed to update user', 'error': str(e)}), 500
 
 @app.route('/api/admin/users/<user_id>', methods=['DELETE'])
-@token_required
+@claims_required
 def admin_delete_user(current_user, user_id):
     """Delete user (admin only)"""
     try:
@@ -1937,6 +2394,8 @@ def admin_delete_user(current_user, user_id):
         
         # Delete user and all their data
         users_collection.delete_one({'_id': ObjectId(user_id)})
+        user_cache.invalidate(user_id)
+        revocation_list.revoke(user_id)
         articulation_progress_collection.delete_many({'user_id': user_id})
         articulation_trials_collection.delete_many({'user_id': user_id})
         language_progress_collection.delete_many({'user_id': user_id})
@@ -1956,7 +2415,7 @@ def admin_delete_user(current_user, user_id):
         return jsonify({'success': False, 'message': 'Failed to delete user', 'error': str(e)}), 500
 
 @app.route('/api/admin/therapies/articulation', methods=['GET'])
-@token_required
+@claims_required
 def get_articulation_therapy_data(current_user):
     """Get all articulation therapy data (admin only)"""
     try:
@@ -1996,7 +2455,7 @@ def get_articulation_therapy_data(current_user):
         return jsonify({'success': False, 'message': 'Failed to fetch data', 'error': str(e)}), 500
 
 @app.route('/api/admin/therapies/language/<mode>', methods=['GET'])
-@token_required
+@claims_required
 def get_language_therapy_data(current_user, mode):
     """Get all language therapy data for a specific mode (admin only)"""
     try:
@@ -2043,7 +2502,7 @@ def get_language_therapy_data(current_user, mode):
         return jsonify({'success': False, 'message': 'Failed to fetch data', 'error': str(e)}), 500
 
 @app.route('/api/admin/therapies/fluency', methods=['GET'])
-@token_required
+@claims_required
 def get_fluency_therapy_data(current_user):
     """Get all fluency therapy data (admin only)"""
     try:
@@ -2083,7 +2542,7 @@ def get_fluency_therapy_data(current_user):
         return jsonify({'success': False, 'message': 'Failed to fetch data', 'error': str(e)}), 500
 
 @app.route('/api/admin/therapies/physical', methods=['GET'])
-@token_required
+@claims_required
 def get_physical_therapy_data(current_user):
     """Get all physical therapy data (admin only)"""
     try:
@@ -9,6 +9,7 @@ import datetime
 from functools import wraps
 import jwt
 import os
+from user_cache import user_cache
 
 # Create Blueprint
 articulation_bp = Blueprint('articulation_exercises', __name__)
@@ -43,7 +44,7 @@ def token_required(f):
             data = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
             
             # Get user from database
-            current_user = users_collection.find_one({'_id': ObjectId(data['user_id'])})
+            current_user = user_cache.get_user(users_collection, data['user_id'])
             
             if not current_user:
                 return jsonify({'success': False, 'message': 'User not found'}), 401
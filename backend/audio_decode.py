@@ -0,0 +1,115 @@
+"""
+In-Memory Audio Decoding
+Turns uploaded recordings (WebM/Opus from MediaRecorder, WAV, OGG...) into the
+mono 16 kHz 16-bit PCM that Azure Speech expects, without touching the disk.
+
+WAV uploads are parsed directly and resampled with a polyphase filter, compressed
+containers go through an ffmpeg pipe, and librosa is only used as a last resort.
+Samples stay int16 from decode to output.
+"""
+
+from math import gcd
+import io
+import shutil
+import subprocess
+import wave
+import numpy as np
+
+TARGET_SAMPLE_RATE = 16000  # Azure expects 16kHz
+
+
+class AudioDecodeError(Exception):
+    """Raised when an upload can't be decoded to PCM"""
+
+
+def decode_audio(audio_bytes, sample_rate=TARGET_SAMPLE_RATE, max_seconds=None):
+    """
+    Decode an uploaded recording to a mono int16 numpy array at sample_rate. With
+    max_seconds, compressed containers are decoded no further than that.
+    """
+    if not audio_bytes:
+        raise AudioDecodeError('Audio upload is empty')
+
+    if audio_bytes[:4] == b'RIFF' and audio_bytes[8:12] == b'WAVE':
+        try:
+            return _decode_wav(audio_bytes, sample_rate)
+        except (wave.Error, EOFError, ValueError):
+            pass  # Not plain PCM (e.g. float or compressed WAV), let ffmpeg handle it
+
+    if shutil.which('ffmpeg'):
+        return _decode_ffmpeg(audio_bytes, sample_rate, max_seconds)
+    return _decode_librosa(audio_bytes, sample_rate, max_seconds)
+
+
+def decode_to_pcm16(audio_bytes, sample_rate=TARGET_SAMPLE_RATE):
+    """Decode an uploaded recording to raw mono 16-bit little-endian PCM bytes"""
+    return decode_audio(audio_bytes, sample_rate).astype('<i2', copy=False).tobytes()
+
+
+def resample_int16(samples, from_rate, to_rate=TARGET_SAMPLE_RATE):
+    """Polyphase resample of int16 samples; exact for the usual 48k/44.1k/8k -> 16k ratios"""
+    if from_rate == to_rate or samples.size == 0:
+        return samples
+
+    from scipy.signal import resample_poly
+
+    divisor = gcd(int(from_rate), int(to_rate))
+    resampled = resample_poly(samples.astype(np.float32), to_rate // divisor, from_rate // divisor)
+    return np.clip(np.rint(resampled), -32768, 32767).astype(np.int16)
+
+
+def _decode_wav(audio_bytes, sample_rate):
+    """Parse PCM WAV with the stdlib reader, downmix and resample"""
+    with wave.open(io.BytesIO(audio_bytes), 'rb') as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        source_rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+
+    if sample_width == 2:
+        samples = np.frombuffer(frames, dtype='<i2')
+    elif sample_width == 1:
+        samples = ((np.frombuffer(frames, dtype=np.uint8).astype(np.int16) - 128) << 8)
+    elif sample_width == 4:
+        samples = (np.frombuffer(frames, dtype='<i4') >> 16).astype(np.int16)
+    else:
+        raise ValueError(f'Unsupported WAV sample width: {sample_width}')
+
+    if channels > 1:
+        samples = samples[:samples.size - samples.size % channels].reshape(-1, channels)
+        samples = samples.mean(axis=1, dtype=np.int32).astype(np.int16)
+
+    return resample_int16(samples, source_rate, sample_rate)
+
+
+def _decode_ffmpeg(audio_bytes, sample_rate, max_seconds=None):
+    """Pipe the upload through ffmpeg: container in on stdin, s16le PCM out on stdout"""
+    command = [
+        'ffmpeg', '-hide_banner', '-loglevel', 'error',
+        '-i', 'pipe:0',
+        '-f', 's16le', '-acodec', 'pcm_s16le',
+        '-ac', '1', '-ar', str(sample_rate)
+    ]
+    if max_seconds is not None:
+        command += ['-t', f'{max_seconds:g}']
+    process = subprocess.run(
+        command + ['pipe:1'],
+        input=audio_bytes,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    if process.returncode != 0 or not process.stdout:
+        raise AudioDecodeError(f"ffmpeg could not decode audio: {process.stderr.decode('utf-8', 'ignore').strip()}")
+    return np.frombuffer(process.stdout, dtype='<i2')
+
+
+def _decode_librosa(audio_bytes, sample_rate, max_seconds=None):
+    """Fallback for hosts without ffmpeg; handles formats libsndfile can read from memory"""
+    import librosa
+
+    try:
+        audio_data, _ = librosa.load(io.BytesIO(audio_bytes), sr=sample_rate, mono=True, duration=max_seconds)
+    except Exception as e:
+        raise AudioDecodeError(f"Could not decode audio: {e}")
+
+    return (np.clip(audio_data, -1.0, 1.0) * 32767).astype(np.int16)
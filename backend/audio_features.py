@@ -0,0 +1,105 @@
+"""
+Audio Features
+Short-time analysis shared by the local articulation scorer and the acoustic
+disfluency detector: 25 ms Hamming frames on a 10 ms hop, power spectra, the
+mel filterbank and the cepstral DCT. Both run their analysis in the one
+process pool below, sized by AUDIO_ANALYSIS_WORKERS, rather than each starting
+its own.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import threading
+import os
+import numpy as np
+
+from audio_decode import TARGET_SAMPLE_RATE
+
+SAMPLE_RATE = TARGET_SAMPLE_RATE
+FRAME_LENGTH = 400   # 25 ms
+HOP_LENGTH = 160     # 10 ms
+N_FFT = 512
+N_MELS = 26
+N_CEPS = 13
+
+AUDIO_ANALYSIS_WORKERS = int(os.getenv('AUDIO_ANALYSIS_WORKERS', 2))
+
+# Modules the pool's tasks live in, loaded once by the fork server so workers start warm
+POOL_PRELOAD = ['audio_features', 'local_scorer', 'acoustic_disfluency']
+
+
+def _mel_filterbank():
+    def hz_to_mel(hz):
+        return 2595 * np.log10(1 + hz / 700)
+
+    def mel_to_hz(mel):
+        return 700 * (10 ** (mel / 2595) - 1)
+
+    mel_points = np.linspace(hz_to_mel(60), hz_to_mel(SAMPLE_RATE / 2), N_MELS + 2)
+    bins = np.floor((N_FFT + 1) * mel_to_hz(mel_points) / SAMPLE_RATE).astype(int)
+    filterbank = np.zeros((N_MELS, N_FFT // 2 + 1), dtype=np.float32)
+    for m in range(1, N_MELS + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            filterbank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            filterbank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return filterbank
+
+
+def _dct_matrix():
+    n = np.arange(N_MELS)
+    k = np.arange(N_CEPS)[:, None]
+    return (np.cos(np.pi * k * (2 * n + 1) / (2 * N_MELS)) * np.sqrt(2 / N_MELS)).astype(np.float32)
+
+
+MEL_FILTERBANK = _mel_filterbank()
+DCT_MATRIX = _dct_matrix()
+WINDOW = np.hamming(FRAME_LENGTH).astype(np.float32)
+
+
+def to_float(samples):
+    """int16 samples as float32 in [-1, 1)"""
+    return np.asarray(samples, dtype=np.float32) / 32768.0
+
+
+def frames_and_power(x):
+    """Windowed frames[frames, FRAME_LENGTH] of a float clip and their power spectra"""
+    frames = np.lib.stride_tricks.sliding_window_view(x, FRAME_LENGTH)[::HOP_LENGTH] * WINDOW
+    return frames, np.abs(np.fft.rfft(frames, N_FFT)) ** 2
+
+
+def frame_db(power):
+    """Per-frame energy in dB"""
+    return 10 * np.log10(power.sum(axis=1) + 1e-10)
+
+
+def log_mel(power):
+    return np.log(power @ MEL_FILTERBANK.T + 1e-10)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _pool_context():
+    """
+    The pool starts after the web server's threads (Mongo monitors, executors, refresh
+    loops) are running, and forking a threaded process can copy a lock some other thread
+    held. Workers come from a fork server instead: a clean single-threaded process that
+    preloads only POOL_PRELOAD, not app.py. Where there is no fork server, they are spawned.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(POOL_PRELOAD)
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def get_pool():
+    """Lazily started process pool shared by all requests"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=AUDIO_ANALYSIS_WORKERS, mp_context=_pool_context())
+        return _pool
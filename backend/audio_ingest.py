@@ -0,0 +1,286 @@
+"""
+Audio Ingestion
+One path for every speech upload: read the file with a byte cap, sniff and
+validate the container header, reject uploads that are malformed or too long
+before any decoding, then normalize to mono 16 kHz int16 exactly once and
+trim silence. Limits are per endpoint (see ENDPOINT_LIMITS).
+"""
+
+import struct
+import os
+
+from audio_decode import decode_audio, AudioDecodeError, TARGET_SAMPLE_RATE
+from voice_activity import trim_silence
+
+READ_CHUNK = 64 * 1024
+WAV_FORMATS = {1: 'pcm', 3: 'float', 0xFFFE: 'extensible'}
+
+# Matroska/WebM element ids parse_webm_header reads; the other masters are skipped whole
+EBML_SEGMENT = 0x18538067
+EBML_CLUSTER = 0x1F43B675
+EBML_MASTERS = {
+    0x1549A966,  # Info
+    0x1654AE6B,  # Tracks
+    0xAE,        # TrackEntry
+    0xE1         # Audio
+}
+EBML_TIMECODE_SCALE = 0x2AD7B1
+EBML_DURATION = 0x4489
+EBML_SAMPLING_FREQUENCY = 0xB5
+EBML_CHANNELS = 0x9F
+
+# Compressed uploads are decoded for at most this multiple of the limit, enough for
+# the decoded length to show the recording is too long without decoding all of it
+DECODE_HEADROOM = 1.1
+
+
+def _limits(kind, max_seconds, max_bytes):
+    prefix = kind.upper()
+    return {
+        'max_seconds': float(os.getenv(f'{prefix}_MAX_SECONDS', max_seconds)),
+        'max_bytes': int(os.getenv(f'{prefix}_MAX_BYTES', max_bytes))
+    }
+
+
+# Longest recording and largest upload accepted by each speech endpoint
+ENDPOINT_LIMITS = {
+    'articulation': _limits('articulation', 15, 2 * 1024 * 1024),
+    'expressive': _limits('expressive', 45, 8 * 1024 * 1024),
+    'fluency': _limits('fluency', 90, 16 * 1024 * 1024)
+}
+
+
+class AudioRejected(Exception):
+    """Upload refused before recognition; carries the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+class Recording:
+    """A normalized upload: trimmed 16 kHz mono int16 samples plus what we learned on the way"""
+
+    def __init__(self, samples, durations, container, upload_bytes):
+        self.samples = samples                  # None when the clip has no speech
+        self.durations = durations
+        self.container = container
+        self.upload_bytes = upload_bytes
+        self._pcm_bytes = None
+
+    @property
+    def has_speech(self):
+        return self.samples is not None
+
+    @property
+    def pcm_bytes(self):
+        """Raw little-endian PCM for Azure push streams and cache keys, built once"""
+        if self._pcm_bytes is None and self.samples is not None:
+            self._pcm_bytes = self.samples.astype('<i2', copy=False).tobytes()
+        return self._pcm_bytes
+
+
+def parse_wav_header(data):
+    """
+    Walk the RIFF chunks up to 'data'.
+    Returns dict(format, channels, sample_rate, bits, duration or None); raises AudioRejected if malformed.
+    """
+    if len(data) < 12 or data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        raise AudioRejected('Malformed WAV upload')
+
+    offset = 12
+    fmt = None
+    while offset + 8 <= len(data):
+        chunk_id = data[offset:offset + 4]
+        chunk_size = struct.unpack('<I', data[offset + 4:offset + 8])[0]
+        body = offset + 8
+
+        if chunk_id == b'fmt ':
+            if chunk_size < 16 or body + 16 > len(data):
+                raise AudioRejected('Malformed WAV header')
+            audio_format, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', data[body:body + 16])
+            fmt = {
+                'format': WAV_FORMATS.get(audio_format, audio_format),
+                'channels': channels,
+                'sample_rate': sample_rate,
+                'bits': bits,
+                'duration': None
+            }
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise AudioRejected('Malformed WAV header')
+            bytes_per_second = fmt['sample_rate'] * fmt['channels'] * max(fmt['bits'] // 8, 1)
+            # Streaming writers leave the size at 0 or 0xFFFFFFFF; the decoded length decides then
+            if 0 < chunk_size < 0xFFFFFFFF and bytes_per_second:
+                fmt['duration'] = chunk_size / bytes_per_second
+            break
+
+        offset = body + chunk_size + (chunk_size & 1)
+
+    if fmt is None:
+        raise AudioRejected('Malformed WAV header')
+    if fmt['format'] not in WAV_FORMATS.values():
+        raise AudioRejected('Unsupported WAV encoding')
+    if not 1 <= fmt['channels'] <= 2:
+        raise AudioRejected('Recordings must be mono or stereo')
+    if not 8000 <= fmt['sample_rate'] <= 96000:
+        raise AudioRejected('Unsupported sample rate')
+    if fmt['bits'] not in (8, 16, 24, 32):
+        raise AudioRejected('Unsupported WAV sample width')
+    return fmt
+
+
+def _ebml_vint(data, offset, keep_marker):
+    """One EBML variable-length integer at offset: (value, next offset), or (None, offset) if cut off"""
+    if offset >= len(data) or data[offset] == 0:
+        return None, offset
+    first = data[offset]
+    length = 8 - first.bit_length() + 1
+    if offset + length > len(data):
+        return None, offset
+    value = first if keep_marker else first & ((1 << (8 - length)) - 1)
+    for byte in data[offset + 1:offset + length]:
+        value = (value << 8) | byte
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        value = -1  # Unknown size, as live MediaRecorder output writes the Segment
+    return value, offset + length
+
+
+def parse_webm_header(data):
+    """
+    Walk the Matroska elements ahead of the first Cluster for the declared duration and
+    the audio track settings. Returns dict(channels, sample_rate, duration), each None if
+    not present in data (MediaRecorder usually leaves Duration out); raises AudioRejected
+    if the element structure is broken.
+    """
+    info = {'channels': None, 'sample_rate': None, 'duration': None}
+    timecode_scale = 1000000
+    duration = None
+
+    offset = 0
+    while offset < len(data):
+        element_id, body = _ebml_vint(data, offset, keep_marker=True)
+        size, body = _ebml_vint(data, body, keep_marker=False)
+        if element_id is None or size is None:
+            break
+        if element_id == EBML_CLUSTER:
+            break
+        if element_id == EBML_SEGMENT or element_id in EBML_MASTERS:
+            offset = body  # Descend into the children
+            continue
+        if size < 0:
+            raise AudioRejected('Malformed WebM header')
+
+        value = data[body:body + size]
+        if len(value) == size:
+            if element_id == EBML_TIMECODE_SCALE and size:
+                timecode_scale = int.from_bytes(value, 'big')
+            elif element_id == EBML_DURATION and size in (4, 8):
+                duration = struct.unpack('>f' if size == 4 else '>d', value)[0]
+            elif element_id == EBML_SAMPLING_FREQUENCY and size in (4, 8):
+                info['sample_rate'] = struct.unpack('>f' if size == 4 else '>d', value)[0]
+            elif element_id == EBML_CHANNELS and size:
+                info['channels'] = int.from_bytes(value, 'big')
+        offset = body + size
+
+    if duration is not None:
+        info['duration'] = duration * timecode_scale / 1e9
+    if info['channels'] is not None and not 1 <= info['channels'] <= 2:
+        raise AudioRejected('Recordings must be mono or stereo')
+    if info['sample_rate'] is not None and not 8000 <= info['sample_rate'] <= 96000:
+        raise AudioRejected('Unsupported sample rate')
+    return info
+
+
+def sniff_container(head):
+    """Container name from the first bytes of an upload, or None if it isn't audio we accept"""
+    if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+        return 'wav'
+    if head[:4] == b'\x1a\x45\xdf\xa3':
+        return 'webm'
+    if head[:4] == b'OggS':
+        return 'ogg'
+    if head[4:8] == b'ftyp':
+        return 'mp4'
+    return None
+
+
+def too_large_message(limits):
+    return f"Recording is too large (limit {limits['max_bytes'] // 1024} KB)"
+
+
+def too_long_message(limits):
+    return f"Recording is too long (limit {limits['max_seconds']:g} seconds)"
+
+
+def read_limited(stream, max_bytes, message='Recording is too large'):
+    """Read an upload stream, refusing it (with message) as soon as it passes max_bytes"""
+    chunks = []
+    total = 0
+    while True:
+        chunk = stream.read(READ_CHUNK)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_bytes:
+            raise AudioRejected(message, status=413)
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+
+def check_header(head, limits):
+    """
+    Sniff the container and, for WAV and WebM, validate the format and declared duration.
+    Other containers are only held to the limit when decoded.
+    """
+    container = sniff_container(head[:16])
+    if container is None:
+        raise AudioRejected('Unsupported audio format')
+
+    header = None
+    if container == 'wav':
+        header = parse_wav_header(head)
+    elif container == 'webm':
+        header = parse_webm_header(head)
+    if header is not None and header['duration'] is not None and header['duration'] > limits['max_seconds']:
+        raise AudioRejected(too_long_message(limits))
+    return container
+
+
+def ingest(audio_file, kind):
+    """
+    Validate, decode and trim one uploaded recording (a werkzeug FileStorage or raw bytes)
+    under the limits for kind. Raises AudioRejected; returns a Recording.
+    """
+    limits = ENDPOINT_LIMITS[kind]
+    too_large = too_large_message(limits)
+
+    # The header is checked on the first chunk, before the rest of the upload is read
+    if isinstance(audio_file, (bytes, bytearray)):
+        if len(audio_file) > limits['max_bytes']:
+            raise AudioRejected(too_large, status=413)
+        data = bytes(audio_file)
+        if not data:
+            raise AudioRejected('Audio upload is empty')
+        container = check_header(data[:READ_CHUNK], limits)
+    else:
+        head = audio_file.stream.read(READ_CHUNK)
+        if not head:
+            raise AudioRejected('Audio upload is empty')
+        if len(head) > limits['max_bytes']:
+            raise AudioRejected(too_large, status=413)
+        container = check_header(head, limits)
+        data = head + read_limited(audio_file.stream, limits['max_bytes'] - len(head), too_large)
+
+    # The one decode: whatever came in leaves as mono 16 kHz int16. A container that
+    # declared no duration is decoded only a little past the limit, not to its end.
+    try:
+        samples = decode_audio(data, max_seconds=limits['max_seconds'] * DECODE_HEADROOM)
+    except AudioDecodeError as e:
+        raise AudioRejected(f'Could not decode audio: {e}')
+    if len(samples) > limits['max_seconds'] * TARGET_SAMPLE_RATE * 1.05:
+        raise AudioRejected(too_long_message(limits))
+
+    trimmed, durations = trim_silence(samples)
+    return Recording(trimmed, durations, container, len(data))
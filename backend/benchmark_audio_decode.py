@@ -0,0 +1,116 @@
+"""
+Benchmark audio decoding: audio_decode vs librosa.load.
+
+Synthesizes child-like voice clips (1-10 s, 48 kHz WAV as the browsers upload,
+plus WebM/Opus when ffmpeg is available) and decodes each to 16 kHz with both
+engines. Every engine/clip pair runs in a fresh subprocess so import cost and
+peak RSS are measured the way a cold worker would see them.
+
+> python benchmark_audio_decode.py --durations 1 3 5 10
+"""
+
+import argparse
+import io
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+import numpy as np
+
+
+def synthesize_clip(seconds, sample_rate=48000):
+    """Harmonic 'voice' around a child's pitch (~300 Hz) with syllable-rate bursts and noise"""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 300 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = np.clip(np.sin(2 * np.pi * 3 * t), 0, None)
+    signal = 0.3 * voice * envelope + 0.01 * np.random.default_rng(0).standard_normal(t.size)
+    samples = np.clip(signal * 32767, -32768, 32767).astype('<i2')
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def to_webm(wav_bytes):
+    process = subprocess.run(
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-i', 'pipe:0',
+         '-c:a', 'libopus', '-f', 'webm', 'pipe:1'],
+        input=wav_bytes, stdout=subprocess.PIPE, check=True
+    )
+    return process.stdout
+
+
+def worker(engine, path):
+    """Decode once in this (fresh) process and print timing + peak RSS as JSON"""
+    with open(path, 'rb') as f:
+        audio_bytes = f.read()
+
+    start = time.perf_counter()
+    if engine == 'audio_decode':
+        from audio_decode import decode_audio
+        samples = decode_audio(audio_bytes)
+    else:
+        import librosa
+        samples, _ = librosa.load(io.BytesIO(audio_bytes) if path.endswith('.wav') else path, sr=16000)
+    cold_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    if engine == 'audio_decode':
+        decode_audio(audio_bytes)
+    else:
+        librosa.load(io.BytesIO(audio_bytes) if path.endswith('.wav') else path, sr=16000)
+    warm_ms = (time.perf_counter() - start) * 1000
+
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'cold_ms': cold_ms, 'warm_ms': warm_ms, 'peak_mib': peak_kib / 1024,
+                      'samples': int(len(samples))}))
+
+
+def measure(engine, path):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--worker', engine, path],
+        stdout=subprocess.PIPE, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    ).stdout
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--durations', type=float, nargs='+', default=[1, 3, 5, 10])
+    parser.add_argument('--worker', nargs=2, metavar=('ENGINE', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(*args.worker)
+        return
+
+    formats = ['wav'] + (['webm'] if shutil.which('ffmpeg') else [])
+    print(f"{'clip':<10}{'engine':<14}{'cold ms':>10}{'warm ms':>10}{'peak MiB':>10}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for seconds in args.durations:
+            wav_bytes = synthesize_clip(seconds)
+            for fmt in formats:
+                path = os.path.join(temp_dir, f'clip_{seconds:g}s.{fmt}')
+                with open(path, 'wb') as f:
+                    f.write(wav_bytes if fmt == 'wav' else to_webm(wav_bytes))
+
+                for engine in ('audio_decode', 'librosa'):
+                    result = measure(engine, path)
+                    print(f"{f'{seconds:g}s {fmt}':<10}{engine:<14}{result['cold_ms']:>10.1f}"
+                          f"{result['warm_ms']:>10.1f}{result['peak_mib']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark the articulation audio path: temp files vs in-memory decoding.
+
+The legacy path saves the upload as .webm, decodes it with librosa, writes a
+16kHz .wav and lets Azure re-read it from disk. The in-memory path decodes the
+upload bytes straight to PCM for a push stream. Reports wall-clock time and
+bytes written to disk per trial (Azure itself is not called).
+
+> python benchmark_audio_pipeline.py --input recording.webm --trials 20
+> python benchmark_audio_pipeline.py --seconds 3   # synthesizes a WebM clip (needs ffmpeg)
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+import uuid
+
+from audio_decode import decode_to_pcm16
+
+
+def synthesize_webm(seconds):
+    """Encode a short tone sweep as WebM/Opus like MediaRecorder produces"""
+    process = subprocess.run(
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error',
+         '-f', 'lavfi', '-i', f'sine=frequency=220:sample_rate=48000:duration={seconds}',
+         '-c:a', 'libopus', '-f', 'webm', 'pipe:1'],
+        stdout=subprocess.PIPE, check=True
+    )
+    return process.stdout
+
+
+def legacy_trial(audio_bytes):
+    """The old record_articulation + assess_pronunciation_azure file round trip"""
+    import librosa
+    import soundfile as sf
+
+    temp_dir = tempfile.gettempdir()
+    temp_webm = os.path.join(temp_dir, f'recording_{uuid.uuid4()}.webm')
+    temp_wav = os.path.join(temp_dir, f'recording_{uuid.uuid4()}.wav')
+    try:
+        with open(temp_webm, 'wb') as f:
+            f.write(audio_bytes)
+        audio_data, sample_rate = librosa.load(temp_webm, sr=16000)
+        sf.write(temp_wav, audio_data, sample_rate, subtype='PCM_16')
+        with open(temp_wav, 'rb') as f:  # Azure's AudioConfig(filename=...) reads it back
+            f.read()
+        return len(audio_bytes) + os.path.getsize(temp_wav)
+    finally:
+        for path in (temp_webm, temp_wav):
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+def in_memory_trial(audio_bytes):
+    decode_to_pcm16(audio_bytes)
+    return 0
+
+
+def run(label, trial_fn, audio_bytes, trials):
+    trial_fn(audio_bytes)  # warm up imports
+    samples = []
+    written = 0
+    for _ in range(trials):
+        start = time.perf_counter()
+        written = trial_fn(audio_bytes)
+        samples.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<10} mean={statistics.mean(samples):8.2f} ms  "
+          f"p50={statistics.median(samples):8.2f} ms  disk written/trial={written / 1024:8.1f} KiB")
+    return statistics.mean(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--input', help='recording to replay (defaults to a synthesized WebM clip)')
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--trials', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, 'rb') as f:
+            audio_bytes = f.read()
+    else:
+        audio_bytes = synthesize_webm(args.seconds)
+
+    print(f"Upload size: {len(audio_bytes) / 1024:.1f} KiB, {args.trials} trials")
+    legacy = run('temp files', legacy_trial, audio_bytes, args.trials)
+    in_memory = run('in-memory', in_memory_trial, audio_bytes, args.trials)
+    print(f"Saved per trial: {legacy - in_memory:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark cached Firebase ID token verification for repeated social logins.
+
+Runs fully offline: a local RSA key pair stands in for Google's certificate set,
+tokens are minted the way Firebase signs them, and a PyJWT check with the same
+issuer/audience rules stands in for auth.verify_id_token. Reports uncached vs
+cached repeat verification.
+
+> python benchmark_firebase_tokens.py --logins 500
+"""
+
+import argparse
+import statistics
+import time
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from firebase_tokens import FirebaseTokenVerifier
+
+PROJECT_ID = 'cvaped-benchmark'
+KEY_ID = 'local-key'
+
+
+def mint_token(private_key, uid):
+    now = int(time.time())
+    return jwt.encode({
+        'iss': f'https://securetoken.google.com/{PROJECT_ID}',
+        'aud': PROJECT_ID,
+        'sub': uid,
+        'auth_time': now,
+        'iat': now,
+        'exp': now + 3600,
+        'email': f'{uid}@example.com'
+    }, private_key, algorithm='RS256', headers={'kid': KEY_ID})
+
+
+def local_verify(public_key):
+    """Offline stand-in for auth.verify_id_token"""
+    def verify(id_token):
+        claims = jwt.decode(id_token, public_key, algorithms=['RS256'], audience=PROJECT_ID,
+                            issuer=f'https://securetoken.google.com/{PROJECT_ID}')
+        claims['uid'] = claims['sub']
+        return claims
+    return verify
+
+
+def time_verify(verifier, tokens):
+    samples = []
+    for token in tokens:
+        start = time.perf_counter()
+        verifier.verify(token)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--logins', type=int, default=500)
+    parser.add_argument('--users', type=int, default=25)
+    args = parser.parse_args()
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_key = private_key.public_key()
+    tokens = [mint_token(private_key, f'uid-{i}') for i in range(args.users)]
+    repeated = [tokens[i % len(tokens)] for i in range(args.logins)]
+
+    # Repeated logins with the same tokens
+    verify = local_verify(public_key)
+    uncached = FirebaseTokenVerifier(verify, max_size=0)
+    cached = FirebaseTokenVerifier(verify)
+
+    for label, verifier in (('uncached', uncached), ('cached', cached)):
+        samples = time_verify(verifier, repeated)
+        print(f"{label:<10} mean={statistics.mean(samples):7.3f} ms  "
+              f"p50={statistics.median(samples):7.3f} ms  max={max(samples):7.3f} ms")
+
+    print(f"Cache stats: {cached.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark fluency word-timing analysis: fluency_analysis vs the old per-word loop.
+
+Builds Azure-shaped NBest Words lists for reading passages (500 words by default,
+with pauses, repeated words and held words sprinkled in) and times both
+implementations, checking they agree on pauses and disfluencies.
+
+> python benchmark_fluency_analysis.py --words 100 500 2000 --repeat 200
+"""
+
+import argparse
+import random
+import time
+
+from fluency_analysis import analyze_words
+
+VOCABULARY = ['the', 'little', 'fox', 'jumped', 'over', 'a', 'lazy', 'brown', 'dog', 'and', 'ran', 'home', 'quickly']
+
+
+def synthesize_words(count, seed=0):
+    rng = random.Random(seed)
+    words = []
+    cursor = 0.5
+    previous = None
+    for _ in range(count):
+        word = previous if previous and rng.random() < 0.03 else rng.choice(VOCABULARY)
+        duration = 0.08 * len(word) * (3 if rng.random() < 0.05 else 1)
+        words.append({'Word': word, 'Offset': int(cursor * 1e7), 'Duration': int(duration * 1e7)})
+        cursor += duration + (rng.uniform(0.4, 1.5) if rng.random() < 0.08 else rng.uniform(0.02, 0.15))
+        previous = word
+    return words
+
+
+def legacy_analysis(word_list):
+    """The loop assess_fluency used before fluency_analysis"""
+    words = []
+    pauses = []
+    disfluencies = 0
+    prev_end_time = 0
+    prev_word = None
+    for i, word_info in enumerate(word_list):
+        word = word_info.get('Word', '')
+        offset = word_info.get('Offset', 0) / 10000000
+        duration = word_info.get('Duration', 0) / 10000000
+        words.append({'word': word, 'offset': offset, 'duration': duration})
+        if i > 0:
+            pause_duration = offset - prev_end_time
+            if pause_duration > 0.3:
+                pauses.append({'position': i, 'duration': pause_duration})
+        if prev_word and word.lower() == prev_word.lower():
+            disfluencies += 1
+        expected_word_duration = len(word) * 0.1
+        if duration > expected_word_duration * 1.5:
+            disfluencies += 1
+        prev_end_time = offset + duration
+        prev_word = word
+    return words, pauses, disfluencies
+
+
+def time_it(fn, arg, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--words', type=int, nargs='+', default=[500])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'words':>6}{'legacy ms':>12}{'numpy ms':>12}{'pauses':>8}{'disfl.':>8}")
+    for count in args.words:
+        word_list = synthesize_words(count)
+        _, pauses, disfluencies = legacy_analysis(word_list)
+        analysis = analyze_words(word_list)
+        assert analysis['pause_count'] == len(pauses)
+        assert analysis['disfluencies'] == disfluencies
+
+        legacy_ms = time_it(legacy_analysis, word_list, args.repeat)
+        numpy_ms = time_it(analyze_words, word_list, args.repeat)
+        print(f"{count:>6}{legacy_ms:>12.3f}{numpy_ms:>12.3f}{len(pauses):>8}{disfluencies:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark expressive keyword matching: keyword_matcher vs the old substring loop.
+
+Times matching synthesized answers against the seeded language exercises'
+expected keywords, both with a cold matcher (compiled per request) and with the
+per-exercise cache, and lists the answers where the two disagree (inflections
+the old loop missed, substrings it wrongly accepted).
+
+> python benchmark_keyword_matcher.py --answers 2000 --words 40
+"""
+
+import argparse
+import random
+import time
+
+import keyword_matcher
+from keyword_matcher import KeywordMatcher, MatcherCache
+
+EXERCISES = {
+    'desc-1': ['house', 'tree', 'family', 'people', 'home'],
+    'desc-2': ['sun', 'beach', 'water', 'ocean', 'sand'],
+    'desc-3': ['dog', 'ball', 'running', 'playing', 'pet'],
+    'pic-2': ['cat', 'sleeping', 'couch'],
+    'story-1': ['bird', 'fly', 'tried', 'sky'],
+    'story-3': ['seed', 'garden', 'watered', 'flower', 'grew'],
+    'story-5': ['rabbit', 'turtle', 'race', 'slow', 'won']
+}
+
+FILLER = ['the', 'a', 'and', 'then', 'it', 'was', 'very', 'she', 'he', 'they', 'big', 'went', 'to', 'with']
+VARIANTS = {
+    'running': ['runs', 'ran', 'run'], 'playing': ['plays', 'played'], 'watered': ['water', 'waters', 'watering'],
+    'grew': ['grows', 'growing', 'grown'], 'tried': ['tries', 'trying'], 'won': ['wins', 'winning'],
+    'cat': ['cats', 'kitty', 'catch'], 'sleeping': ['slept', 'sleeps'], 'race': ['racing', 'races'],
+    'fly': ['flew', 'flying'], 'flower': ['flowers'], 'seed': ['seeds'], 'couch': ['sofa']
+}
+
+
+def synthesize_answers(count, words, seed=0):
+    rng = random.Random(seed)
+    answers = []
+    for _ in range(count):
+        exercise_id = rng.choice(list(EXERCISES))
+        tokens = [rng.choice(FILLER) for _ in range(words)]
+        for keyword in EXERCISES[exercise_id]:
+            if rng.random() < 0.7:
+                tokens[rng.randrange(words)] = rng.choice(VARIANTS.get(keyword, []) + [keyword])
+        answers.append((exercise_id, ' '.join(tokens).capitalize() + '.'))
+    return answers
+
+
+def legacy_match(keywords, transcription):
+    """The loop assess_expressive_language used before keyword_matcher"""
+    found = []
+    for keyword in keywords:
+        if keyword.lower() in transcription.lower():
+            found.append(keyword)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--answers', type=int, default=2000)
+    parser.add_argument('--words', type=int, default=40, help='tokens per answer')
+    parser.add_argument('--examples', type=int, default=8, help='disagreements to print')
+    args = parser.parse_args()
+
+    answers = synthesize_answers(args.answers, args.words)
+
+    def timed(fn):
+        keyword_matcher._normalize.cache_clear()
+        start = time.perf_counter()
+        results = [fn(exercise_id, text) for exercise_id, text in answers]
+        return results, (time.perf_counter() - start) / len(answers) * 1e6
+
+    cache = MatcherCache()
+    legacy, legacy_us = timed(lambda exercise_id, text: legacy_match(EXERCISES[exercise_id], text))
+    cold, cold_us = timed(lambda exercise_id, text: KeywordMatcher(EXERCISES[exercise_id]).match(text))
+    cached, cached_us = timed(lambda exercise_id, text: cache.get(exercise_id, EXERCISES[exercise_id]).match(text))
+    assert cold == cached
+
+    print(f"{args.answers} answers, {args.words} words each")
+    print(f"  {'substring loop':<22}{legacy_us:>10.1f} us/answer")
+    print(f"  {'compiled, per request':<22}{cold_us:>10.1f} us/answer")
+    print(f"  {'compiled, cached':<22}{cached_us:>10.1f} us/answer   cache {cache.stats()}")
+
+    disagreements = [(answer, old, new) for answer, old, new in zip(answers, legacy, cached) if old != new]
+    print(f"\n{len(disagreements)} answers scored differently ({len(disagreements) / len(answers):.0%})")
+    for (exercise_id, text), old, new in disagreements[:args.examples]:
+        print(f"  [{exercise_id}] {text}\n      substring: {old}\n      compiled:  {new}")
+
+
+if __name__ == '__main__':
+    main()
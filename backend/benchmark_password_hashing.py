@@ -0,0 +1,73 @@
+"""
+Benchmark login throughput through the bcrypt worker pool.
+
+Fires a burst of concurrent logins (as when a clinic's tablets all sign in at
+session start) at several bcrypt cost factors and reports logins/sec, latency
+and how many requests were shed with 503.
+
+> python benchmark_password_hashing.py --costs 10 12 14 --clients 40
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from flask_bcrypt import Bcrypt
+
+from password_hashing import PasswordHasher, HasherBusy
+
+
+def run_burst(hasher, pw_hash, password, clients, logins_per_client):
+    latencies = []
+    shed = [0]
+    lock = threading.Lock()
+
+    def client():
+        for _ in range(logins_per_client):
+            start = time.perf_counter()
+            try:
+                hasher.check(pw_hash, password)
+            except HasherBusy:
+                with lock:
+                    shed[0] += 1
+                continue
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies, shed[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--costs', type=int, nargs='+', default=[10, 12, 14])
+    parser.add_argument('--clients', type=int, default=40)
+    parser.add_argument('--logins', type=int, default=3, help='logins per client')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--max-queue', type=int, default=16)
+    args = parser.parse_args()
+
+    bcrypt = Bcrypt()
+    password = 'correct horse battery staple'
+
+    print(f"{args.clients} clients x {args.logins} logins, "
+          f"{args.workers} workers, queue {args.max_queue}")
+    for cost in args.costs:
+        hasher = PasswordHasher(bcrypt, rounds=cost, workers=args.workers,
+                                max_queue=args.max_queue, timeout_seconds=120)
+        pw_hash = hasher.hash(password)
+        elapsed, latencies, shed = run_burst(hasher, pw_hash, password, args.clients, args.logins)
+
+        served = len(latencies)
+        p50 = statistics.median(latencies) if latencies else 0
+        print(f"cost={cost:<3} {served / elapsed:8.1f} logins/s  served={served:<5} "
+              f"shed={shed:<5} p50={p50:9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
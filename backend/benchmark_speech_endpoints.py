@@ -0,0 +1,124 @@
+"""
+Load-test the speech assessment endpoints of a running server.
+
+Start the API with SPEECH_BACKEND=fake (see FAKE_SPEECH_* in .env.example) so
+recognition is simulated locally, then fire concurrent uploads of synthesized
+WAV clips at the articulation, expressive and fluency endpoints. Reports
+requests/sec, latency percentiles and the status code mix (503 = shed as busy).
+
+> python benchmark_speech_endpoints.py --user-id <id> --clients 20 --requests 200
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import io
+import json
+import os
+import statistics
+import time
+import urllib.error
+import urllib.request
+import uuid
+import wave
+import jwt
+import numpy as np
+from dotenv import load_dotenv
+
+ENDPOINTS = {
+    'articulation': ('/api/articulation/record', {'target': 'sun', 'sound_id': 's', 'level': '2', 'item_index': '0', 'trial': '1'}),
+    'expressive': ('/api/language/assess-expressive', {'exercise_id': 'load-test', 'exercise_type': 'description',
+                                                       'expected_keywords': json.dumps(['dog', 'ball', 'park']), 'min_words': '5'}),
+    'fluency': ('/api/fluency/assess', {'target_text': 'The cat sat on the mat', 'expected_duration': '5'})
+}
+
+
+def synthesize_wav(seconds, seed, sample_rate=16000):
+    """Voiced bursts with a little noise; a different seed gives different bytes (no cache hits)"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    voice = np.sin(2 * np.pi * 250 * t) * np.clip(np.sin(2 * np.pi * 2.5 * t), 0, None)
+    samples = np.clip((0.3 * voice + 0.01 * rng.standard_normal(t.size)) * 32767, -32768, 32767).astype('<i2')
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def multipart(fields, audio_bytes):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode('utf-8'))
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="audio"; filename="recording.wav"\r\n'
+                 f'Content-Type: audio/wav\r\n\r\n'.encode('utf-8') + audio_bytes + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode('utf-8'))
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def make_token(user_id, secret_key):
+    return jwt.encode({
+        'user_id': user_id,
+        'role': 'patient',
+        'therapyType': None,
+        'isProfileComplete': True,
+        'iat': datetime.datetime.now(datetime.timezone.utc),
+        'exp': datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1)
+    }, secret_key, algorithm='HS256')
+
+
+def send(base_url, endpoint, token, audio_bytes):
+    path, fields = ENDPOINTS[endpoint]
+    body, content_type = multipart(fields, audio_bytes)
+    req = urllib.request.Request(base_url + path, data=body, method='POST', headers={
+        'Authorization': f'Bearer {token}',
+        'Content-Type': content_type
+    })
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except urllib.error.URLError:
+        status = 'error'
+    return status, (time.perf_counter() - start) * 1000
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--user-id', required=True, help='Existing user _id to sign the test token for')
+    parser.add_argument('--endpoints', nargs='+', choices=list(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--seconds', type=float, default=3.0, help='Length of each synthesized clip')
+    args = parser.parse_args()
+
+    token = make_token(args.user_id, os.getenv('SECRET_KEY', 'fallback-secret-key'))
+    clips = [synthesize_wav(args.seconds, seed) for seed in range(args.requests)]
+
+    for endpoint in args.endpoints:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            results = list(pool.map(lambda clip: send(args.url, endpoint, token, clip), clips))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(ms for _, ms in results)
+        statuses = {}
+        for status, _ in results:
+            statuses[status] = statuses.get(status, 0) + 1
+
+        print(f"{endpoint}: {len(results) / elapsed:.1f} req/s over {elapsed:.1f}s")
+        print(f"  latency ms: p50={statistics.median(latencies):.0f} "
+              f"p95={latencies[int(len(latencies) * 0.95) - 1]:.0f} max={latencies[-1]:.0f}")
+        print(f"  status: " + ", ".join(f"{k}={v}" for k, v in sorted(statuses.items(), key=str)))
+
+
+if __name__ == '__main__':
+    main()
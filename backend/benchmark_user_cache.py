@@ -0,0 +1,87 @@
+"""
+Benchmark the authenticated-user cache used by token_required.
+
+Runs the same token_required user lookup with and without the cache and prints
+the per-request latency saved. By default Mongo is simulated with a fixed round
+trip so it runs anywhere; pass --mongo to use the real MONGO_URI instead.
+
+> python benchmark_user_cache.py
+> python benchmark_user_cache.py --mongo --requests 2000
+"""
+
+import argparse
+import os
+import statistics
+import time
+from bson import ObjectId
+
+from user_cache import UserCache
+
+
+class SimulatedUsersCollection:
+    """Stand-in for users_collection with a fixed find_one round trip"""
+
+    def __init__(self, users, round_trip_ms):
+        self.users = {u['_id']: u for u in users}
+        self.round_trip = round_trip_ms / 1000
+
+    def find_one(self, query):
+        time.sleep(self.round_trip)
+        return self.users.get(query['_id'])
+
+
+def time_lookups(lookup, user_ids, requests):
+    samples = []
+    for i in range(requests):
+        user_id = user_ids[i % len(user_ids)]
+        start = time.perf_counter()
+        lookup(user_id)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<12} mean={statistics.mean(samples):8.3f} ms  "
+          f"p50={statistics.median(samples):8.3f} ms  p95={p95:8.3f} ms")
+    return statistics.mean(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--users', type=int, default=30, help='distinct users in the session')
+    parser.add_argument('--round-trip-ms', type=float, default=2.0, help='simulated Mongo latency')
+    parser.add_argument('--mongo', action='store_true', help='use the real MONGO_URI users collection')
+    args = parser.parse_args()
+
+    if args.mongo:
+        from dotenv import load_dotenv
+        from pymongo import MongoClient
+        load_dotenv()
+        users_collection = MongoClient(os.getenv('MONGO_URI'))['CVACare']['users']
+        user_ids = [str(u['_id']) for u in users_collection.find({}, {'_id': 1}).limit(args.users)]
+        if not user_ids:
+            print("No users found in the database")
+            return
+    else:
+        users = [{'_id': ObjectId(), 'email': f'user{i}@example.com', 'role': 'patient'}
+                 for i in range(args.users)]
+        users_collection = SimulatedUsersCollection(users, args.round_trip_ms)
+        user_ids = [str(u['_id']) for u in users]
+
+    cache = UserCache(max_size=1024, ttl_seconds=60)
+
+    print(f"{args.requests} authenticated requests across {len(user_ids)} users")
+    uncached = report('uncached', time_lookups(
+        lambda uid: users_collection.find_one({'_id': ObjectId(uid)}), user_ids, args.requests))
+    cached = report('cached', time_lookups(
+        lambda uid: cache.get_user(users_collection, uid), user_ids, args.requests))
+
+    print(f"Saved per request: {uncached - cached:.3f} ms")
+    print(f"Cache stats: {cache.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Exercise Spec Cache
+In-process snapshot of the scoring fields of each exercise, keyed by
+exercise_id, so assessment endpoints can resolve an exercise's expected
+keywords, word count, target text or duration from the id alone instead of
+trusting (and json-parsing) a copy posted with every recording. The snapshot
+is loaded with one query and dropped by the exercise CRUD writes; a TTL bounds
+how stale it can get in other worker processes, and an unknown id forces a
+(rate-limited) reload so exercises created in another process are found.
+"""
+
+import threading
+import time
+import os
+
+
+class ExerciseSpecCache:
+    """exercise_id -> scoring fields for one exercises collection"""
+
+    def __init__(self, fields, query=None, ttl_seconds=300, miss_reload_seconds=5):
+        self.fields = fields
+        self.query = query or {}
+        self.ttl_seconds = ttl_seconds
+        self.miss_reload_seconds = miss_reload_seconds
+        self._collection = None
+        self._specs = None
+        self._expires_at = 0.0
+        self._loaded_at = float('-inf')
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def init_collection(self, collection):
+        self._collection = collection
+        self.invalidate()
+
+    def _load(self):
+        projection = dict.fromkeys(self.fields, 1)
+        projection.update({'_id': 0, 'exercise_id': 1})
+        specs = {}
+        for doc in self._collection.find(self.query, projection):
+            specs[doc.pop('exercise_id')] = doc
+        self.loads += 1
+        return specs
+
+    def get(self, exercise_id):
+        """Spec dict for exercise_id, or None if there is no such exercise"""
+        if exercise_id is None or self._collection is None:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            stale = self._specs is None or now >= self._expires_at
+            # A miss may be an exercise created in another process; reload, at most every miss_reload_seconds
+            if not stale and exercise_id not in self._specs and now >= self._loaded_at + self.miss_reload_seconds:
+                stale = True
+            if stale:
+                self._specs = self._load()
+                self._loaded_at = now
+                self._expires_at = now + self.ttl_seconds
+            spec = self._specs.get(exercise_id)
+        return dict(spec) if spec is not None else None
+
+    def invalidate(self):
+        """Drop the snapshot; the next lookup reloads it (called after every exercise write)"""
+        with self._lock:
+            self._specs = None
+
+
+EXERCISE_SPEC_TTL = float(os.getenv('EXERCISE_SPEC_TTL', 300))
+
+# Expressive language exercises (language_exercises, mode=expressive)
+language_exercise_specs = ExerciseSpecCache(
+    ['expected_keywords', 'min_words', 'type'], query={'mode': 'expressive'}, ttl_seconds=EXERCISE_SPEC_TTL
+)
+
+# Fluency exercises (fluency_exercises)
+fluency_exercise_specs = ExerciseSpecCache(
+    ['target', 'expected_duration', 'type'], ttl_seconds=EXERCISE_SPEC_TTL
+)
@@ -0,0 +1,125 @@
+"""
+Firebase ID Token Verification
+firebase_admin's auth.verify_id_token stays the verifier. Around it, verified
+claims are cached by token hash until the token expires, so repeated social
+logins skip the signature check, and the certificate set verify_id_token
+downloads is fetched in the background through firebase_admin's own
+cache-control aware session, so the first login after a deploy doesn't pay
+for the fetch.
+"""
+
+from collections import OrderedDict
+import hashlib
+import re
+import threading
+import time
+
+ID_TOKEN_CERT_URL = 'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com'
+
+
+def firebase_cert_request(app=None):
+    """
+    The HTTP request callable verify_id_token fetches certificates with (its responses
+    are cached per Cache-Control), or None if this firebase_admin version doesn't expose it.
+    """
+    from firebase_admin import auth
+
+    client = auth._get_client(app)
+    return getattr(getattr(client, '_token_verifier', None), 'request', None)
+
+
+class CertificatePrefetcher:
+    """Keeps the certificate response in firebase_admin's HTTP cache warm"""
+
+    def __init__(self, request, url=ID_TOKEN_CERT_URL, retry_seconds=30):
+        self.url = url
+        self._request = request
+        self.retry_seconds = retry_seconds
+        self._expires_at = 0
+        self._thread = None
+        self.fetch_count = 0
+
+    def refresh(self):
+        """Fetch the certificates through the shared request; returns the response max-age"""
+        response = self._request(url=self.url, method='GET')
+        if response.status != 200:
+            raise RuntimeError(f'certificate fetch returned HTTP {response.status}')
+        match = re.search(r'max-age=(\d+)', response.headers.get('Cache-Control', ''))
+        max_age = int(match.group(1)) if match else 3600
+        self._expires_at = time.time() + max_age
+        self.fetch_count += 1
+        return max_age
+
+    def start_background_refresh(self):
+        """Prefetch now and again shortly before the cached response expires"""
+        if self._thread is not None:
+            return
+
+        def run():
+            while True:
+                try:
+                    self.refresh()
+                    delay = max(self._expires_at - time.time() - 60, self.retry_seconds)
+                except Exception as e:
+                    print(f"Warning: Could not prefetch Firebase certificates: {e}")
+                    delay = self.retry_seconds
+                time.sleep(delay)
+
+        self._thread = threading.Thread(target=run, name='firebase-cert-refresh', daemon=True)
+        self._thread.start()
+
+
+def start_certificate_prefetch(app=None):
+    """Warm verify_id_token's certificate cache in the background; returns the prefetcher or None"""
+    request = firebase_cert_request(app)
+    if request is None:
+        print("Warning: firebase_admin doesn't expose its certificate fetch; skipping prefetch")
+        return None
+    prefetcher = CertificatePrefetcher(request)
+    prefetcher.start_background_refresh()
+    return prefetcher
+
+
+class FirebaseTokenVerifier:
+    """Cache the claims verify (auth.verify_id_token by default) returns, until each token's exp"""
+
+    def __init__(self, verify=None, max_size=4096):
+        if verify is None:
+            from firebase_admin import auth
+            verify = auth.verify_id_token
+        self._verify = verify
+        self.max_size = max_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def verify(self, id_token):
+        """Return the decoded token (with 'uid'); raises whatever the verifier raises if invalid"""
+        key = hashlib.sha256(id_token.encode('utf-8')).hexdigest()
+        now = time.time()
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > now:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return dict(entry[1])
+            if entry is not None:
+                del self._cache[key]
+            self.misses += 1
+
+        claims = self._verify(id_token)
+
+        if self.max_size > 0:
+            with self._lock:
+                self._cache[key] = (claims['exp'], dict(claims))
+                while len(self._cache) > self.max_size:
+                    self._cache.popitem(last=False)
+
+        return dict(claims)
+
+    def stats(self):
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            return {'size': len(self._cache), 'hits': self.hits, 'misses': self.misses}
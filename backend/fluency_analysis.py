@@ -0,0 +1,91 @@
+"""
+Fluency Analysis
+Word-timing metrics for the fluency assessment, computed over parallel NumPy
+arrays (word, offset, duration) built from Azure's NBest Words list: inter-word
+gaps, pauses and a pause histogram, speaking vs articulation rate, and
+repetition/prolongation flags. The full timing data is returned in columnar
+form (one list per field) so long reading passages aren't truncated.
+"""
+
+import numpy as np
+
+TICKS_PER_SECOND = 10000000     # Azure offsets and durations are in 100 ns units
+PAUSE_SECONDS = 0.3             # gaps longer than this count as pauses
+PAUSE_BINS = np.array([0.3, 0.5, 1.0, 2.0, np.inf])
+SECONDS_PER_LETTER = 0.1        # rough expected word length
+PROLONGATION_FACTOR = 1.5
+
+
+def word_arrays(word_list):
+    """
+    Parallel columns from an NBest Words list: words (list), offsets and durations
+    in seconds, letter counts, and integer ids of the lowercased words.
+    """
+    count = len(word_list)
+    words = [w.get('Word', '') for w in word_list]
+    offsets = np.fromiter((w.get('Offset', 0) for w in word_list), dtype=np.float64, count=count) / TICKS_PER_SECOND
+    durations = np.fromiter((w.get('Duration', 0) for w in word_list), dtype=np.float64, count=count) / TICKS_PER_SECOND
+    lengths = np.fromiter(map(len, words), dtype=np.int64, count=count)
+    vocabulary = {}
+    word_ids = np.fromiter(
+        (vocabulary.setdefault(word.lower(), len(vocabulary)) for word in words),
+        dtype=np.int64, count=count
+    )
+    return words, offsets, durations, lengths, word_ids
+
+
+def analyze_words(word_list):
+    """
+    Timing metrics for one recognized passage.
+    Returns None for an empty word list so the caller can fall back to the transcript.
+    """
+    if not word_list:
+        return None
+
+    words, offsets, durations, lengths, word_ids = word_arrays(word_list)
+    ends = offsets + durations
+
+    # Gaps between consecutive words; pauses are the long ones
+    gaps = np.maximum(offsets[1:] - ends[:-1], 0)
+    pause_mask = gaps > PAUSE_SECONDS
+    pause_positions = np.flatnonzero(pause_mask) + 1
+    pause_durations = gaps[pause_mask]
+    histogram = np.bincount(np.searchsorted(PAUSE_BINS, pause_durations, side='right') - 1,
+                            minlength=len(PAUSE_BINS) - 1)[:len(PAUSE_BINS) - 1]
+
+    # Same word twice in a row, and words held much longer than their spelling suggests
+    repetitions = np.flatnonzero(word_ids[1:] == word_ids[:-1]) + 1
+    expected = lengths * SECONDS_PER_LETTER
+    prolongations = np.flatnonzero(durations > expected * PROLONGATION_FACTOR)
+
+    total_duration = float(ends[-1])
+    speech_span = float(ends[-1] - offsets[0])
+    pause_time = float(pause_durations.sum())
+    word_count = len(words)
+
+    return {
+        'word_count': word_count,
+        'total_duration': total_duration,
+        # Speaking rate includes pauses; articulation rate is the pace while actually talking
+        'speaking_rate': int(word_count / total_duration * 60) if total_duration > 0 else 0,
+        'articulation_rate': int(word_count / (speech_span - pause_time) * 60) if speech_span > pause_time else 0,
+        'pause_count': int(pause_mask.sum()),
+        'pause_time': round(pause_time, 3),
+        'pause_histogram': {
+            'bins': ['0.3-0.5', '0.5-1', '1-2', '2+'],
+            'counts': histogram.tolist()
+        },
+        'repetitions': repetitions.tolist(),
+        'prolongations': prolongations.tolist(),
+        'disfluencies': int(len(repetitions) + len(prolongations)),
+        'words': {
+            'word': words,
+            'offset': np.round(offsets, 3).tolist(),
+            'duration': np.round(durations, 3).tolist()
+        },
+        'pauses': {
+            'position': pause_positions.tolist(),
+            'duration': np.round(pause_durations, 3).tolist()
+        },
+        'gaps': np.round(gaps, 3).tolist()
+    }
@@ -9,6 +9,8 @@ from bson import ObjectId
 import datetime
 import jwt
 import os
+from user_cache import user_cache
+from exercise_specs import fluency_exercise_specs
 
 # Create Blueprint
 fluency_bp = Blueprint('fluency_crud', __name__)
@@ -24,6 +26,7 @@ def init_fluency_crud(database):
     db = database
     users_collection = db['users']
     fluency_exercises_collection = db['fluency_exercises']
+    fluency_exercise_specs.init_collection(fluency_exercises_collection)
 
 # Token required decorator
 def token_required(f):
@@ -38,7 +41,7 @@ def token_required(f):
             if token.startswith('Bearer '):
                 token = token[7:]
             data = jwt.decode(token, os.getenv('SECRET_KEY', 'your-secret-key-here'), algorithms=["HS256"])
-            current_user = users_collection.find_one({'_id': ObjectId(data['user_id'])})
+            current_user = user_cache.get_user(users_collection, data['user_id'])
             if not current_user:
                 return jsonify({'message': 'User not found!'}), 401
         except Exception as e:
@@ -403,6 +406,7 @@ def seed_default_exercises(current_user):
         
         # Insert all exercises
         result = fluency_exercises_collection.insert_many(default_exercises)
+        fluency_exercise_specs.invalidate()
         
         return jsonify({
             'success': True,
@@ -530,6 +534,7 @@ def create_exercise(current_user):
         }
         
         result = fluency_exercises_collection.insert_one(new_exercise)
+        fluency_exercise_specs.invalidate()
         new_exercise['_id'] = str(result.inserted_id)
         
         return jsonify({
@@ -567,6 +572,7 @@ def update_exercise(current_user, exercise_id):
             {'_id': ObjectId(exercise_id)},
             {'$set': update_data}
         )
+        fluency_exercise_specs.invalidate()
         
         if result.matched_count == 0:
             return jsonify({'message': 'Exercise not found'}), 404
@@ -590,6 +596,7 @@ def delete_exercise(current_user, exercise_id):
     """Delete a fluency exercise (therapist only)"""
     try:
         result = fluency_exercises_collection.delete_one({'_id': ObjectId(exercise_id)})
+        fluency_exercise_specs.invalidate()
         
         if result.deleted_count == 0:
             return jsonify({'message': 'Exercise not found'}), 404
@@ -628,6 +635,7 @@ def toggle_active(current_user, exercise_id):
                 }
             }
         )
+        fluency_exercise_specs.invalidate()
         
         return jsonify({
             'success': True,
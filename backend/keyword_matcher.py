@@ -0,0 +1,212 @@
+"""
+Keyword Matcher
+Token-level matching of an exercise's expected keywords against a transcript.
+Keywords (single words or short phrases) are compiled once into stemmed token
+patterns. A transcript is tokenized and stemmed a single time; single-word
+keywords are then a set lookup and phrases are checked only where their first
+token occurs. Inflections match ("watered" finds "water", "ran" finds
+"running"), and so do a few everyday synonyms ("mommy" finds "mom").
+Substrings inside other words no longer do ("cat" isn't found in "catch").
+Compiled matchers are cached per exercise_id.
+"""
+
+from collections import OrderedDict
+from functools import lru_cache
+import re
+import threading
+import os
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# Irregular forms children's answers use most, mapped to their base word
+IRREGULAR = {
+    'ran': 'run', 'went': 'go', 'gone': 'go', 'ate': 'eat', 'eaten': 'eat', 'saw': 'see', 'seen': 'see',
+    'flew': 'fly', 'flown': 'fly', 'flies': 'fly', 'grew': 'grow', 'grown': 'grow', 'won': 'win',
+    'drew': 'draw', 'drawn': 'draw', 'took': 'take', 'taken': 'take', 'came': 'come', 'sat': 'sit',
+    'slept': 'sleep', 'made': 'make', 'swam': 'swim', 'threw': 'throw', 'thrown': 'throw',
+    'caught': 'catch', 'bought': 'buy', 'brought': 'bring', 'found': 'find', 'felt': 'feel',
+    'gave': 'give', 'given': 'give', 'fell': 'fall', 'fallen': 'fall', 'rode': 'ride', 'ridden': 'ride',
+    'wrote': 'write', 'written': 'write', 'told': 'tell', 'said': 'say', 'had': 'have', 'has': 'have',
+    'was': 'be', 'were': 'be', 'is': 'be', 'are': 'be', 'am': 'be',
+    'children': 'child', 'people': 'person', 'mice': 'mouse', 'feet': 'foot', 'teeth': 'tooth',
+    'men': 'man', 'women': 'woman', 'geese': 'goose', 'leaves': 'leaf', 'wolves': 'wolf'
+}
+
+# Words a child may use for the expected one; the first of each group is the canonical form
+SYNONYMS = [
+    ('mom', 'mother', 'mommy', 'mum', 'mama'),
+    ('dad', 'father', 'daddy', 'papa'),
+    ('dog', 'doggy', 'doggie'),
+    ('puppy', 'pup'),
+    ('cat', 'kitty', 'kitten'),
+    ('rabbit', 'bunny'),
+    ('child', 'kid'),
+    ('couch', 'sofa'),
+    ('ocean', 'sea'),
+    ('big', 'large', 'huge'),
+    ('happy', 'glad'),
+    ('little', 'small', 'tiny')
+]
+
+VOWELS = set('aeiouy')
+
+# IRREGULAR with its base words stemmed, filled in below once stem() exists, so
+# "rode" lands on the same stem as the keyword "ride"
+_irregular_stems = {}
+
+
+def stem(word):
+    """
+    Light suffix-stripping stemmer: plural, -ing, -ed and -ly endings, undoubled final
+    consonants and a dropped final e. Keywords and transcripts go through the same
+    function, so the stems only need to agree with each other, not be real words.
+    """
+    if word in _irregular_stems:
+        return _irregular_stems[word]
+    if len(word) <= 3:
+        return word
+
+    if word.endswith("'s"):
+        word = word[:-2]
+    if word.endswith(('ies', 'ied')) and len(word) > 4:
+        word = word[:-3] + 'y'
+    elif word.endswith('sses'):
+        word = word[:-2]
+    elif word.endswith(('ches', 'shes', 'xes', 'zes')):
+        word = word[:-2]
+    elif word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+
+    if word.endswith('ing') and len(word) > 5 and VOWELS & set(word[:-3]):
+        word = _undouble(word[:-3])
+    elif word.endswith('ed') and len(word) > 4 and VOWELS & set(word[:-2]):
+        word = _undouble(word[:-2])
+
+    if word.endswith('ly') and len(word) > 4:
+        word = word[:-2]
+    if word.endswith('e') and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def _undouble(word):
+    """running -> run, stopped -> stop; but not fall or kiss"""
+    if len(word) > 2 and word[-1] == word[-2] and word[-1] not in 'lsz' and word[-1] not in VOWELS:
+        return word[:-1]
+    return word
+
+
+_irregular_stems.update({form: stem(base) for form, base in IRREGULAR.items()})
+
+
+def _canonical_table():
+    table = {}
+    for group in SYNONYMS:
+        canonical = stem(group[0])
+        for word in group:
+            table[stem(word)] = canonical
+    return table
+
+
+CANONICAL = _canonical_table()
+
+
+MAX_NORMALIZED = 50000
+
+
+@lru_cache(maxsize=MAX_NORMALIZED)
+def _normalize(token):
+    """Stemmed, synonym-folded form of one token (thread-safe bounded LRU)"""
+    stemmed = stem(token)
+    return CANONICAL.get(stemmed, stemmed)
+
+
+def normalize_tokens(text):
+    """Lowercased, stemmed, synonym-folded tokens of a text"""
+    return [_normalize(token) for token in TOKEN_PATTERN.findall(text.lower())]
+
+
+class KeywordMatcher:
+    """An exercise's expected keywords compiled into stemmed token patterns"""
+
+    def __init__(self, keywords):
+        self.keywords = tuple(keywords)
+        # Single-token keywords: normalized token -> keyword indices
+        self._words = {}
+        # Phrases: first token -> [(keyword index, full token pattern)]
+        self._phrases = {}
+        for i, keyword in enumerate(self.keywords):
+            pattern = tuple(normalize_tokens(str(keyword)))
+            if len(pattern) == 1:
+                self._words.setdefault(pattern[0], []).append(i)
+            elif pattern:
+                self._phrases.setdefault(pattern[0], []).append((i, pattern))
+
+    def match(self, transcription):
+        """Expected keywords present in the transcription, in the exercise's order"""
+        raw = TOKEN_PATTERN.findall(transcription.lower())
+        # Normalized once per distinct token in this call, so cache evictions can't lose any
+        normalized = {token: _normalize(token) for token in set(raw)}
+        found = set()
+
+        # Single words only need the set of distinct tokens
+        distinct = set(normalized.values())
+        for token in distinct.intersection(self._words):
+            found.update(self._words[token])
+
+        # Phrases are checked in order, only where their first token occurs
+        if self._phrases and not distinct.isdisjoint(self._phrases):
+            tokens = [normalized[token] for token in raw]
+            for position, token in enumerate(tokens):
+                for keyword_index, pattern in self._phrases.get(token, ()):
+                    if tuple(tokens[position:position + len(pattern)]) == pattern:
+                        found.add(keyword_index)
+        return [self.keywords[i] for i in sorted(found)]
+
+
+class MatcherCache:
+    """Compiled KeywordMatchers keyed by exercise_id (LRU)"""
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, exercise_id, keywords):
+        """
+        Matcher for the exercise, compiled on first use. An exercise whose keywords no
+        longer match the cached ones (edited since) is recompiled. Without an exercise_id
+        the matcher is compiled for this request only.
+        """
+        keywords = tuple(keywords)
+        if exercise_id is None:
+            return KeywordMatcher(keywords)
+
+        with self._lock:
+            entry = self._entries.get(exercise_id)
+            if entry is not None and entry.keywords == keywords:
+                self._entries.move_to_end(exercise_id)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        matcher = KeywordMatcher(keywords)
+        with self._lock:
+            self._entries[exercise_id] = matcher
+            self._entries.move_to_end(exercise_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return matcher
+
+    def invalidate(self, exercise_id):
+        with self._lock:
+            self._entries.pop(exercise_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+keyword_matchers = MatcherCache(max_size=int(os.getenv('KEYWORD_MATCHER_CACHE_SIZE', 256)))
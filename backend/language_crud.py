@@ -9,6 +9,8 @@ from functools import wraps
 import jwt
 import datetime
 from bson import ObjectId
+from token_revocation import revocation_list, issued_at_ms
+from exercise_specs import language_exercise_specs
 
 # Create Blueprint
 language_bp = Blueprint('language', __name__)
@@ -21,6 +23,7 @@ def init_language_crud(db, jwt_secret):
     """Initialize the language CRUD module with database connection"""
     global language_exercises_collection, JWT_SECRET
     language_exercises_collection = db['language_exercises']
+    language_exercise_specs.init_collection(language_exercises_collection)
     JWT_SECRET = jwt_secret
     print("✅ Language CRUD module initialized")
 
@@ -46,6 +49,9 @@ def token_required(f):
         except jwt.InvalidTokenError:
             return jsonify({'success': False, 'message': 'Invalid token'}), 401
         
+        if revocation_list.is_revoked(current_user.get('user_id'), issued_at_ms(current_user)):
+            return jsonify({'success': False, 'message': 'Token has been revoked'}), 401
+        
         return f(current_user, *args, **kwargs)
     
     return decorated
@@ -308,6 +314,7 @@ def seed_default_exercises(current_user):
         
         # Insert all exercises
         result = language_exercises_collection.insert_many(expressive_exercises)
+        language_exercise_specs.invalidate()
         
         return jsonify({
             'success': True,
@@ -458,6 +465,7 @@ def create_exercise(current_user):
             new_exercise['story'] = data['story']
         
         result = language_exercises_collection.insert_one(new_exercise)
+        language_exercise_specs.invalidate()
         new_exercise['_id'] = str(result.inserted_id)
         
         return jsonify({
@@ -497,6 +505,7 @@ def update_exercise(current_user, exercise_id):
             {'_id': ObjectId(exercise_id)},
             {'$set': update_data}
         )
+        language_exercise_specs.invalidate()
         
         if result.matched_count == 0:
             return jsonify({'success': False, 'message': 'Exercise not found'}), 404
@@ -522,6 +531,7 @@ def delete_exercise(current_user, exercise_id):
     """Delete a language exercise (therapist only)"""
     try:
         result = language_exercises_collection.delete_one({'_id': ObjectId(exercise_id)})
+        language_exercise_specs.invalidate()
         
         if result.deleted_count == 0:
             return jsonify({'success': False, 'message': 'Exercise not found'}), 404
@@ -558,6 +568,7 @@ def toggle_active(current_user, exercise_id):
             {'_id': ObjectId(exercise_id)},
             {'$set': {'is_active': new_status, 'updated_at': datetime.datetime.utcnow()}}
         )
+        language_exercise_specs.invalidate()
         
         return jsonify({
             'success': True,
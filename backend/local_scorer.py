@@ -0,0 +1,181 @@
+"""
+Local Articulation Scorer
+Offline pronunciation estimate used when Azure is not configured, busy or down.
+The decoded recording is turned into cepstral features (vectorized NumPy) and
+aligned with DTW against stored reference templates for the same sound, level
+and target. Scoring runs in the shared audio analysis process pool.
+"""
+
+import datetime
+import threading
+import time
+import numpy as np
+
+from audio_features import FRAME_LENGTH, N_CEPS, DCT_MATRIX, to_float, frames_and_power, frame_db, log_mel, get_pool
+
+MAX_FRAMES = 200     # longer clips are decimated before alignment
+SILENCE_DB = 35      # frames this far below the loudest frame count as silence
+
+# Logistic mapping from mean DTW step cost to a 0-1 similarity
+MATCH_COST = 3.0
+MATCH_WIDTH = 0.6
+
+
+def extract_features(samples):
+    """
+    Cepstral features of the voiced part of an int16 16kHz clip.
+    Returns (features[frames, N_CEPS - 1], voiced_frames, total_frames, gap_frames).
+    """
+    x = to_float(samples)
+    if x.size < FRAME_LENGTH:
+        return np.zeros((0, N_CEPS - 1), dtype=np.float32), 0, 0, 0
+
+    x = np.append(x[0], x[1:] - 0.97 * x[:-1])
+    frames, power = frames_and_power(x)
+
+    energy_db = frame_db(power)
+    voiced = energy_db > max(energy_db.max() - SILENCE_DB, -60)
+    voiced_idx = np.flatnonzero(voiced)
+    if voiced_idx.size == 0:
+        return np.zeros((0, N_CEPS - 1), dtype=np.float32), 0, len(frames), 0
+
+    # Keep the span from first to last voiced frame; internal gaps count against fluency
+    span = slice(voiced_idx[0], voiced_idx[-1] + 1)
+    gap_frames = int((~voiced[span]).sum())
+
+    ceps = log_mel(power[span]) @ DCT_MATRIX.T
+    ceps = ceps[:, 1:]                # drop c0 so loudness doesn't matter
+    ceps -= ceps.mean(axis=0)         # cepstral mean normalization
+    return ceps.astype(np.float32), int(voiced_idx.size), len(frames), gap_frames
+
+
+def dtw_cost(a, b):
+    """Mean step cost of the DTW alignment of two feature sequences"""
+    if len(a) > MAX_FRAMES:
+        a = a[::int(np.ceil(len(a) / MAX_FRAMES))]
+    if len(b) > MAX_FRAMES:
+        b = b[::int(np.ceil(len(b) / MAX_FRAMES))]
+
+    cost = np.sqrt(((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2))
+    n, m = cost.shape
+
+    previous = np.full(m + 1, np.inf)
+    previous[0] = 0.0
+    for i in range(n):
+        row_cost = cost[i]
+        # Diagonal/vertical moves, then the horizontal move as a prefix-min scan:
+        # D[j] = S[j] + min_{k<=j}(T[k] - S[k]) where S is the running row cost
+        diagonal_or_up = row_cost + np.minimum(previous[:-1], previous[1:])
+        running = np.cumsum(row_cost)
+        current = np.empty(m + 1)
+        current[0] = np.inf
+        current[1:] = running + np.minimum.accumulate(diagonal_or_up - running)
+        previous = current
+
+    return float(previous[-1] / (n + m))
+
+
+def score_clip(samples, templates):
+    """
+    Compare an int16 clip against reference templates.
+    templates: list of dicts with 'features' (2D float array) and 'voiced_frames'.
+    Returns the same 0-1 score keys as the Azure pronunciation assessment, or None.
+    """
+    features, voiced_frames, total_frames, gap_frames = extract_features(samples)
+    if voiced_frames == 0 or not templates:
+        return None
+
+    costs = np.array([dtw_cost(features, np.asarray(t['features'], dtype=np.float32)) for t in templates])
+    similarities = 1 / (1 + np.exp((costs - MATCH_COST) / MATCH_WIDTH))
+    best = int(np.argmax(similarities))
+
+    reference_frames = templates[best]['voiced_frames'] or voiced_frames
+    completeness = float(min(voiced_frames / reference_frames, 1.0))
+    fluency = float(1 - gap_frames / max(gap_frames + voiced_frames, 1))
+
+    return {
+        'pronunciation_score': float(similarities[best]),
+        # Agreement across all templates, not just the closest one
+        'accuracy_score': float(np.mean(np.sort(similarities)[-3:])),
+        'completeness_score': completeness,
+        'fluency_score': fluency,
+        'template_cost': float(costs[best])
+    }
+
+
+class TemplateStore:
+    """
+    Reference templates per (sound_id, level, target) in the articulation_templates
+    collection, with an in-process cache so scoring never waits on Mongo twice.
+    Features are stored as float16 bytes to keep documents small.
+    """
+
+    def __init__(self, max_per_target=5, ttl_seconds=600):
+        self.max_per_target = max_per_target
+        self.ttl_seconds = ttl_seconds
+        self.collection = None
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def init_collection(self, collection):
+        self.collection = collection
+        collection.create_index([('sound_id', 1), ('level', 1), ('target', 1)])
+
+    def get(self, sound_id, level, target):
+        """Templates for one exercise item as dicts ready for score_clip"""
+        key = (sound_id, level, target.lower())
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        templates = []
+        if self.collection is not None:
+            docs = self.collection.find(
+                {'sound_id': sound_id, 'level': level, 'target': key[2]},
+                {'features': 1, 'shape': 1, 'voiced_frames': 1}
+            )
+            templates = [
+                {
+                    'features': np.frombuffer(doc['features'], dtype=np.float16).reshape(doc['shape']).astype(np.float32),
+                    'voiced_frames': doc['voiced_frames']
+                }
+                for doc in docs
+            ]
+
+        with self._lock:
+            self._entries[key] = (now + self.ttl_seconds, templates)
+        return templates
+
+    def count(self, sound_id, level, target):
+        return len(self.get(sound_id, level, target))
+
+    def enroll(self, sound_id, level, target, samples, source, score=None):
+        """Store a reference recording; returns False if it has no voiced audio"""
+        features, voiced_frames, _, _ = extract_features(samples)
+        if voiced_frames == 0 or self.collection is None:
+            return False
+
+        self.collection.insert_one({
+            'sound_id': sound_id,
+            'level': level,
+            'target': target.lower(),
+            'features': features.astype(np.float16).tobytes(),
+            'shape': list(features.shape),
+            'voiced_frames': voiced_frames,
+            'source': source,
+            'score': score,
+            'created_at': datetime.datetime.utcnow()
+        })
+        self.invalidate(sound_id, level, target)
+        return True
+
+    def invalidate(self, sound_id, level, target):
+        with self._lock:
+            self._entries.pop((sound_id, level, target.lower()), None)
+
+
+def score_in_pool(samples, templates, timeout=5):
+    """Run score_clip in the audio analysis pool and wait for the result"""
+    return get_pool().submit(score_clip, samples, templates).result(timeout=timeout)
@@ -0,0 +1,142 @@
+"""
+Long-Form Recognition
+recognize_once stops at the first long pause or after about 15 seconds, which
+cuts story retells and passage reading short. Long recordings are split at
+detected silences into chunks that each fit comfortably in one recognition.
+The chunks are recognized side by side on the recognition executor, and the
+transcripts and word timings are merged back onto the recording's timeline.
+Wall-clock time then follows the longest chunk instead of the whole passage.
+"""
+
+import json
+import os
+import numpy as np
+
+from audio_decode import TARGET_SAMPLE_RATE
+from speech_backend import RecognitionResult, TICKS_PER_SECOND
+from voice_activity import speech_frames, FRAME_MS
+
+# Recordings longer than this are chunked; shorter ones keep the single recognize_once path
+LONG_FORM_MIN_SECONDS = float(os.getenv('LONG_FORM_MIN_SECONDS', 12))
+# Target chunk length; cuts go at the longest silence in the last stretch before it
+LONG_FORM_CHUNK_SECONDS = float(os.getenv('LONG_FORM_CHUNK_SECONDS', 10))
+MIN_CHUNK_SECONDS = 3.0
+MIN_CUT_SILENCE_MS = 200
+
+
+def split_at_silences(samples, sample_rate=TARGET_SAMPLE_RATE, chunk_seconds=LONG_FORM_CHUNK_SECONDS):
+    """
+    Chunk boundaries for a long clip as [(start_sample, end_sample)], covering it end to end.
+    Each cut is placed in the middle of the longest silence found between MIN_CHUNK_SECONDS
+    and chunk_seconds into the chunk; with no usable silence the chunk is cut at chunk_seconds.
+    """
+    samples_per_frame = sample_rate * FRAME_MS // 1000
+    silent = ~speech_frames(samples, sample_rate)
+    frame_count = len(silent)
+    chunk_frames = int(chunk_seconds * 1000 / FRAME_MS)
+    min_frames = int(MIN_CHUNK_SECONDS * 1000 / FRAME_MS)
+    min_silence = max(MIN_CUT_SILENCE_MS // FRAME_MS, 1)
+
+    # Length of the silent run ending at each frame, and where that run starts
+    padded = np.concatenate(([False], silent, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    run_starts, run_ends = edges[0::2], edges[1::2]
+    run_lengths = run_ends - run_starts
+
+    cuts = [0]
+    while frame_count - cuts[-1] > chunk_frames:
+        window_start, window_end = cuts[-1] + min_frames, cuts[-1] + chunk_frames
+        # Silent runs that lie inside the window (clipped to it)
+        clipped_starts = np.maximum(run_starts, window_start)
+        clipped_ends = np.minimum(run_ends, window_end)
+        usable = (clipped_ends - clipped_starts >= min_silence) & (run_lengths >= min_silence)
+        if usable.any():
+            # Ties (evenly paced reading) go to the latest silence, so chunks stay near chunk_seconds
+            lengths = (clipped_ends - clipped_starts)[usable]
+            best = np.flatnonzero(usable)[len(lengths) - 1 - np.argmax(lengths[::-1])]
+            cuts.append(int((clipped_starts[best] + clipped_ends[best]) // 2))
+        else:
+            cuts.append(window_end)
+
+    bounds = [cut * samples_per_frame for cut in cuts] + [len(samples)]
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+def _split_text(text, chunks):
+    """Expected text shared out over the chunks in proportion to their length"""
+    words = (text or '').split()
+    if not words:
+        return [text] * len(chunks)
+    lengths = np.array([end - start for start, end in chunks], dtype=np.float64)
+    edges = np.round(np.concatenate(([0], np.cumsum(lengths))) / lengths.sum() * len(words)).astype(int)
+    return [' '.join(words[a:b]) for a, b in zip(edges[:-1], edges[1:])]
+
+
+def merge_results(results, chunks, sample_rate=TARGET_SAMPLE_RATE):
+    """
+    One RecognitionResult for the whole recording. Word offsets are shifted by each
+    chunk's start so they sit on the recording's timeline. Chunks with no speech are
+    skipped. Any failed chunk fails the whole recording, because a transcript with a
+    hole in it would be scored as if the child had skipped that part.
+    """
+    for result in results:
+        if result.reason == RecognitionResult.FAILED:
+            return result
+
+    texts, lexical, words = [], [], []
+    for result, (start, _) in zip(results, chunks):
+        if not result.recognized:
+            continue
+        texts.append(result.text)
+        shift = int(start / sample_rate * TICKS_PER_SECOND)
+        try:
+            best = (json.loads(result.json).get('NBest') or [{}])[0]
+        except ValueError:
+            best = {}
+        lexical.append(best.get('Lexical', result.text))
+        for word in best.get('Words', []):
+            words.append(dict(word, Offset=word.get('Offset', 0) + shift))
+
+    if not texts:
+        return RecognitionResult(RecognitionResult.NO_MATCH)
+
+    text = ' '.join(texts)
+    detailed = {
+        'RecognitionStatus': 'Success',
+        'DisplayText': text,
+        'NBest': [{
+            'Lexical': ' '.join(lexical),
+            'Display': text,
+            'Words': words
+        }]
+    }
+    if words:
+        detailed['Offset'] = words[0]['Offset']
+        detailed['Duration'] = words[-1]['Offset'] + words[-1].get('Duration', 0) - words[0]['Offset']
+    return RecognitionResult(RecognitionResult.RECOGNIZED, text, json.dumps(detailed))
+
+
+def is_long_form(samples, sample_rate=TARGET_SAMPLE_RATE):
+    return len(samples) > LONG_FORM_MIN_SECONDS * sample_rate
+
+
+def recognize_long_form(backend, executor, samples, word_timestamps=False, expected_text=None):
+    """
+    Chunk a long recording at silences, recognize the chunks concurrently (at most one
+    queue's worth at a time) and merge them. Returns (RecognitionResult, chunk count).
+    Raises RecognitionBusy like executor.run.
+    """
+    samples = np.asarray(samples)
+    chunks = split_at_silences(samples)
+    recognizers = [
+        backend.prepare(samples[start:end].astype('<i2', copy=False).tobytes(),
+                        word_timestamps=word_timestamps, expected_text=chunk_text)
+        for (start, end), chunk_text in zip(chunks, _split_text(expected_text, chunks))
+    ]
+    # Submitted in waves the executor's queue can admit, so a long upload isn't turned
+    # away as busy on an idle server just for having more chunks than queue slots
+    wave = max(executor.max_queue, 1)
+    results = []
+    for i in range(0, len(recognizers), wave):
+        results.extend(executor.run_all(recognizers[i:i + wave]))
+    return merge_results(results, chunks), len(chunks)
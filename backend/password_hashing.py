@@ -0,0 +1,96 @@
+"""
+Password Hashing Pool
+Runs bcrypt hashing on a small dedicated thread pool so login/register bursts
+can't starve the request workers that serve the audio endpoints. When the pool
+and its queue are full, callers get HasherBusy immediately and answer with 503.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import threading
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing pool has no free slot"""
+
+
+class PasswordHasher:
+    """Bounded bcrypt worker pool with rehash-on-login support"""
+
+    def __init__(self, bcrypt, rounds=12, workers=2, max_queue=16, timeout_seconds=10):
+        self.bcrypt = bcrypt
+        self.rounds = rounds
+        self.timeout_seconds = timeout_seconds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        # One slot per running or queued hash
+        self._capacity = workers + max_queue
+        self._slots = threading.BoundedSemaphore(self._capacity)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HasherBusy('Password hashing queue is full')
+
+        with self._lock:
+            self.in_flight += 1
+
+        def release(_):
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(release)
+        return future
+
+    def _wait(self, future):
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except FutureTimeout:
+            raise HasherBusy('Password hashing timed out')
+
+    def hash(self, password):
+        """Hash a password at the configured cost"""
+        future = self._submit(self.bcrypt.generate_password_hash, password, self.rounds)
+        return self._wait(future).decode('utf-8')
+
+    def check(self, pw_hash, password):
+        """Check a password against a stored hash"""
+        future = self._submit(self.bcrypt.check_password_hash, pw_hash, password)
+        return self._wait(future)
+
+    def needs_rehash(self, pw_hash):
+        """True if the stored hash was made with a different cost than configured"""
+        try:
+            return int(pw_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def rehash_async(self, password, on_done):
+        """Rehash in the background and pass the new hash to on_done; skipped when busy"""
+        try:
+            future = self._submit(self.bcrypt.generate_password_hash, password, self.rounds)
+        except HasherBusy:
+            return False
+
+        def finish(f):
+            try:
+                on_done(f.result().decode('utf-8'))
+            except Exception as e:
+                print(f"Warning: Could not rehash password: {e}")
+
+        future.add_done_callback(finish)
+        return True
+
+    def stats(self):
+        """Queue depth and shedding counters"""
+        with self._lock:
+            return {
+                'rounds': self.rounds,
+                'in_flight': self.in_flight,
+                'capacity': self._capacity,
+                'rejected': self.rejected
+            }
@@ -0,0 +1,123 @@
+"""
+Phoneme Scores
+Per-phoneme pronunciation scores stored compactly on each articulation trial
+(phoneme ids and 0-100 scores as two uint8 byte strings), plus a per-user
+aggregate in phoneme_stats. The aggregate has one document per user holding a
+count, score total and low-score count for each phoneme. Every saved trial
+updates it with $inc, so "which phonemes does this child struggle with" is one
+indexed read instead of a scan over every trial.
+"""
+
+from bson import Binary
+import datetime
+import numpy as np
+
+# en-US phone set as Azure reports it (SAPI); ids are stored in trials, so only ever append
+PHONEMES = (
+    'unk',
+    'aa', 'ae', 'ah', 'ao', 'aw', 'ax', 'ay', 'b', 'ch', 'd', 'dh', 'eh', 'er', 'ey', 'f', 'g', 'h',
+    'ih', 'iy', 'jh', 'k', 'l', 'm', 'n', 'ng', 'ow', 'oy', 'p', 'r', 's', 'sh', 't', 'th', 'uh', 'uw',
+    'v', 'w', 'y', 'z', 'zh'
+)
+PHONEME_IDS = {phoneme: i for i, phoneme in enumerate(PHONEMES)}
+
+# The same phones when the speech config reports IPA
+PHONEME_IDS.update({
+    'ɑ': PHONEME_IDS['aa'], 'æ': PHONEME_IDS['ae'], 'ʌ': PHONEME_IDS['ah'], 'ɔ': PHONEME_IDS['ao'],
+    'aʊ': PHONEME_IDS['aw'], 'ə': PHONEME_IDS['ax'], 'aɪ': PHONEME_IDS['ay'], 'tʃ': PHONEME_IDS['ch'],
+    'ð': PHONEME_IDS['dh'], 'ɛ': PHONEME_IDS['eh'], 'ɝ': PHONEME_IDS['er'], 'ɚ': PHONEME_IDS['er'],
+    'eɪ': PHONEME_IDS['ey'], 'ɡ': PHONEME_IDS['g'], 'ɪ': PHONEME_IDS['ih'], 'i': PHONEME_IDS['iy'],
+    'dʒ': PHONEME_IDS['jh'], 'ŋ': PHONEME_IDS['ng'], 'oʊ': PHONEME_IDS['ow'], 'ɔɪ': PHONEME_IDS['oy'],
+    'ɹ': PHONEME_IDS['r'], 'ʃ': PHONEME_IDS['sh'], 'θ': PHONEME_IDS['th'], 'ʊ': PHONEME_IDS['uh'],
+    'u': PHONEME_IDS['uw'], 'j': PHONEME_IDS['y'], 'ʒ': PHONEME_IDS['zh']
+})
+
+LOW_SCORE = 60          # a phoneme scored below this (0-100) counts as a miss
+MIN_ATTEMPTS = 3        # phonemes seen fewer times aren't ranked as weak
+
+
+def pack_phonemes(phonemes):
+    """
+    Trial field for a result's phoneme list ([{'phoneme', 'score' 0-1}]):
+    {'ids': bytes, 'scores': bytes}, one uint8 per phoneme. None when there are none.
+    """
+    if not phonemes:
+        return None
+    ids = np.fromiter((PHONEME_IDS.get(str(p['phoneme']).lower(), 0) for p in phonemes),
+                      dtype=np.uint8, count=len(phonemes))
+    scores = np.fromiter((p['score'] for p in phonemes), dtype=np.float64, count=len(phonemes))
+    scores = np.clip(np.rint(scores * 100), 0, 100).astype(np.uint8)
+    return {'ids': Binary(ids.tobytes()), 'scores': Binary(scores.tobytes())}
+
+
+def unpack_phonemes(packed):
+    """Back to [{'phoneme', 'score' 0-1}]"""
+    if not packed:
+        return []
+    ids = np.frombuffer(packed['ids'], dtype=np.uint8)
+    scores = np.frombuffer(packed['scores'], dtype=np.uint8)
+    return [{'phoneme': PHONEMES[i] if i < len(PHONEMES) else 'unk', 'score': s / 100}
+            for i, s in zip(ids.tolist(), scores.tolist())]
+
+
+def aggregate_increments(packed_list):
+    """$inc document for the per-user aggregate from one or more packed trials"""
+    ids = [np.frombuffer(packed['ids'], dtype=np.uint8) for packed in packed_list if packed]
+    if not ids:
+        return None
+    ids = np.concatenate(ids)
+    scores = np.concatenate([np.frombuffer(packed['scores'], dtype=np.uint8) for packed in packed_list if packed])
+
+    counts = np.bincount(ids, minlength=len(PHONEMES))
+    totals = np.bincount(ids, weights=scores, minlength=len(PHONEMES))
+    lows = np.bincount(ids[scores < LOW_SCORE], minlength=len(PHONEMES))
+
+    increments = {}
+    for i in np.flatnonzero(counts):
+        phoneme = PHONEMES[i]
+        increments[f'phonemes.{phoneme}.count'] = int(counts[i])
+        increments[f'phonemes.{phoneme}.total'] = int(totals[i])
+        increments[f'phonemes.{phoneme}.low'] = int(lows[i])
+    return increments
+
+
+class PhonemeStats:
+    """Incrementally maintained per-user, per-phoneme score aggregate"""
+
+    def __init__(self):
+        self._collection = None
+
+    def init_collection(self, collection):
+        # One document per user, keyed by user_id
+        self._collection = collection
+        collection.create_index('user_id', unique=True)
+
+    def record(self, user_id, packed_list):
+        """Fold the phonemes of newly saved trials into the user's aggregate (one upsert)"""
+        increments = aggregate_increments(packed_list)
+        if increments is None or self._collection is None:
+            return
+        self._collection.update_one(
+            {'user_id': user_id},
+            {'$inc': increments, '$set': {'updated_at': datetime.datetime.utcnow()}},
+            upsert=True
+        )
+
+    def weakest(self, user_id, limit=5, min_attempts=MIN_ATTEMPTS):
+        """The user's lowest-scoring phonemes: [{'phoneme', 'average', 'attempts', 'low_rate'}]"""
+        doc = self._collection.find_one({'user_id': user_id}, {'phonemes': 1}) if self._collection is not None else None
+        ranked = [
+            {
+                'phoneme': phoneme,
+                'average': round(stats['total'] / stats['count'] / 100, 3),
+                'attempts': stats['count'],
+                'low_rate': round(stats.get('low', 0) / stats['count'], 3)
+            }
+            for phoneme, stats in ((doc or {}).get('phonemes') or {}).items()
+            if phoneme != 'unk' and stats.get('count', 0) >= min_attempts
+        ]
+        ranked.sort(key=lambda entry: entry['average'])
+        return ranked[:limit]
+
+
+phoneme_stats = PhonemeStats()
@@ -9,6 +9,7 @@ from functools import wraps
 import jwt
 import datetime
 from bson import ObjectId
+from token_revocation import revocation_list, issued_at_ms
 
 # Create Blueprint
 receptive_bp = Blueprint('receptive', __name__)
@@ -46,6 +47,9 @@ def token_required(f):
         except jwt.InvalidTokenError:
             return jsonify({'success': False, 'message': 'Invalid token'}), 401
         
+        if revocation_list.is_revoked(current_user.get('user_id'), issued_at_ms(current_user)):
+            return jsonify({'success': False, 'message': 'Token has been revoked'}), 401
+        
         return f(current_user, *args, **kwargs)
     
     return decorated
@@ -0,0 +1,146 @@
+"""
+Speech Recognition Executor
+Caps how many Azure recognitions run at once and how many may wait for a slot.
+Requests that can't start before their deadline are turned away immediately
+with RecognitionBusy so the endpoint can answer "busy, retry" instead of tying
+up a WSGI worker for seconds.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import threading
+import time
+import os
+
+
+class RecognitionBusy(Exception):
+    """Raised when a recognition can't be admitted or can't start before its deadline"""
+
+
+class RecognitionExecutor:
+    """Bounded worker pool for blocking recognize_once calls"""
+
+    def __init__(self, max_concurrency=4, max_queue=16, deadline_seconds=10.0, window=200):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.deadline_seconds = deadline_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='recognize')
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._waits = deque(maxlen=window)
+        self._service_times = deque(maxlen=window)
+        self.completed = 0
+        self.rejected = 0
+        self.expired = 0
+        self.abandoned = 0
+
+    def _estimated_wait(self):
+        """Rough time until a newly queued task would start"""
+        if not self._service_times or self._running < self.max_concurrency:
+            return 0.0
+        average = sum(self._service_times) / len(self._service_times)
+        return (self._queued + 1) * average / self.max_concurrency
+
+    def _admit(self, count, now, deadline):
+        with self._lock:
+            if self._queued + count > self.max_queue or now + self._estimated_wait() > deadline:
+                self.rejected += 1
+                raise RecognitionBusy('Speech recognition is at capacity')
+            self._queued += count
+
+    def _submit(self, fn, args, now, deadline):
+        def task():
+            started = time.monotonic()
+            with self._lock:
+                self._queued -= 1
+                self._waits.append(started - now)
+                if started > deadline:
+                    self.expired += 1
+                    raise RecognitionBusy('Speech recognition deadline passed while queued')
+                self._running += 1
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self.completed += 1
+                    self._service_times.append(time.monotonic() - started)
+
+        return self._executor.submit(task)
+
+    def _abandon(self, futures):
+        """
+        Give up on futures nobody will read: those still queued are cancelled and their
+        slots released; those already running can't be stopped and are counted as abandoned
+        """
+        cancelled = abandoned = 0
+        for future in futures:
+            if future.cancel():
+                cancelled += 1
+            elif not future.done():
+                abandoned += 1
+        with self._lock:
+            # A task cancelled before it started never gives its queue slot back itself
+            self._queued -= cancelled
+            self.abandoned += abandoned
+
+    def _wait(self, futures, deadline):
+        """Results in order; if any times out or fails, the rest are abandoned before raising"""
+        timeout_at = deadline + self.deadline_seconds
+        results = []
+        try:
+            for future in futures:
+                results.append(future.result(timeout=max(timeout_at - time.monotonic(), 0)))
+        except FutureTimeout:
+            self._abandon(futures)
+            raise RecognitionBusy('Speech recognition timed out')
+        except BaseException:
+            self._abandon(futures)
+            raise
+        return results
+
+    def run(self, fn, *args, deadline=None):
+        """Run fn(*args) on the pool and return its result, or raise RecognitionBusy"""
+        now = time.monotonic()
+        deadline = deadline or now + self.deadline_seconds
+        self._admit(1, now, deadline)
+        return self._wait([self._submit(fn, args, now, deadline)], deadline)[0]
+
+    def run_all(self, fns, deadline=None):
+        """
+        Run several zero-argument callables side by side (the chunks of one long recording).
+        They are admitted together, so either all of them queue or RecognitionBusy is raised.
+        Returns their results in order.
+        """
+        now = time.monotonic()
+        deadline = deadline or now + self.deadline_seconds
+        self._admit(len(fns), now, deadline)
+        futures = [self._submit(fn, (), now, deadline) for fn in fns]
+        return self._wait(futures, deadline)
+
+    def stats(self):
+        """Queue depth and wait-time metrics"""
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                'max_concurrency': self.max_concurrency,
+                'max_queue': self.max_queue,
+                'queue_depth': self._queued,
+                'running': self._running,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'expired': self.expired,
+                'abandoned': self.abandoned,
+                'avg_wait_ms': round(sum(waits) / len(waits) * 1000, 1) if waits else 0,
+                'p95_wait_ms': round(waits[int(len(waits) * 0.95) - 1] * 1000, 1) if waits else 0,
+                'max_wait_ms': round(waits[-1] * 1000, 1) if waits else 0
+            }
+
+
+# Shared by every speech assessment endpoint
+recognition_executor = RecognitionExecutor(
+    max_concurrency=int(os.getenv('RECOGNITION_CONCURRENCY', 4)),
+    max_queue=int(os.getenv('RECOGNITION_MAX_QUEUE', 16)),
+    deadline_seconds=float(os.getenv('RECOGNITION_DEADLINE', 10))
+)
@@ -0,0 +1,211 @@
+"""
+Recording Archive
+Optional store of the normalized (16 kHz mono int16, silence-trimmed) clips
+that were scored, so a scoring change can be re-applied to old trials. Clips
+are content-addressed: the key is the sha256 of the PCM, the same clip is only
+stored once, and trial documents keep just that hash. Encoding to FLAC
+(lossless) or Opus (small) and the write to local disk or GridFS happen on a
+small background pool, off the request path.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+import hashlib
+import io
+import os
+import threading
+import numpy as np
+
+from audio_decode import TARGET_SAMPLE_RATE
+
+FORMATS = {
+    'flac': {'format': 'FLAC', 'subtype': 'PCM_16', 'extension': 'flac', 'content_type': 'audio/flac'},
+    'opus': {'format': 'OGG', 'subtype': 'OPUS', 'extension': 'opus', 'content_type': 'audio/ogg'}
+}
+
+
+def recording_hash(pcm_bytes):
+    """Content address of a normalized clip"""
+    return hashlib.sha256(pcm_bytes).hexdigest()
+
+
+def encode_clip(samples, fmt='flac'):
+    """Encode int16 16 kHz samples to FLAC or Opus bytes"""
+    import soundfile
+
+    spec = FORMATS[fmt]
+    buffer = io.BytesIO()
+    soundfile.write(buffer, np.asarray(samples, dtype=np.int16), TARGET_SAMPLE_RATE,
+                    format=spec['format'], subtype=spec['subtype'])
+    return buffer.getvalue()
+
+
+def decode_clip(data):
+    """int16 samples of an archived clip"""
+    import soundfile
+
+    samples, _ = soundfile.read(io.BytesIO(data), dtype='int16')
+    return samples
+
+
+class DiskStore:
+    """Clips as files under root/ab/cd/<hash>.<ext>"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, key, extension):
+        return os.path.join(self.root, key[:2], key[2:4], f'{key}.{extension}')
+
+    def exists(self, key, extension):
+        return os.path.exists(self._path(key, extension))
+
+    def put(self, key, extension, data, content_type):
+        path = self._path(key, extension)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so a reader never sees half a file
+        temporary = f'{path}.{threading.get_ident()}.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(data)
+        os.replace(temporary, path)
+
+    def get(self, key, extension):
+        try:
+            with open(self._path(key, extension), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+
+class GridFSStore:
+    """Clips in a GridFS bucket, with the hash as the file name"""
+
+    def __init__(self, db, bucket='recordings'):
+        import gridfs
+
+        self._fs = gridfs.GridFS(db, collection=bucket)
+
+    def exists(self, key, extension):
+        return self._fs.exists({'filename': f'{key}.{extension}'})
+
+    def put(self, key, extension, data, content_type):
+        self._fs.put(data, filename=f'{key}.{extension}', content_type=content_type)
+
+    def get(self, key, extension):
+        grid_out = self._fs.find_one({'filename': f'{key}.{extension}'})
+        return grid_out.read() if grid_out is not None else None
+
+
+class RecordingArchive:
+    """
+    Background archiver. archive() hashes the clip, queues the encode and write, and
+    returns the hash right away, so requests never wait on storage; clips already
+    stored (or already queued) are not written again. When the queue is full the clip
+    is skipped and None is returned. A write that fails after the hash was handed out
+    leaves the trial pointing at no clip (counted in stats as failed); load() then
+    returns None and rescore_trials.py skips the trial as missing.
+    """
+
+    def __init__(self, store, fmt='flac', workers=2, max_queue=64, known_size=4096):
+        self.store = store
+        self.fmt = fmt
+        self.spec = FORMATS[fmt]
+        self.max_queue = max_queue
+        self.known_size = known_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='archive')
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._known = OrderedDict()     # hashes recently confirmed stored, to skip the exists() round trip
+        self.written = 0
+        self.deduplicated = 0
+        self.dropped = 0
+        self.failed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def archive(self, pcm_bytes):
+        """Queue one normalized clip (raw int16 PCM); returns its hash, or None if skipped"""
+        if not pcm_bytes:
+            return None
+        key = recording_hash(pcm_bytes)
+
+        with self._lock:
+            if key in self._known or key in self._pending:
+                self.deduplicated += 1
+                return key
+            if len(self._pending) >= self.max_queue:
+                self.dropped += 1
+                return None
+            self._pending.add(key)
+
+        self._executor.submit(self._write, key, pcm_bytes)
+        return key
+
+    def _remember(self, key):
+        self._known[key] = True
+        self._known.move_to_end(key)
+        while len(self._known) > self.known_size:
+            self._known.popitem(last=False)
+
+    def _write(self, key, pcm_bytes):
+        stored = False
+        try:
+            extension = self.spec['extension']
+            if self.store.exists(key, extension):
+                with self._lock:
+                    self.deduplicated += 1
+            else:
+                data = encode_clip(np.frombuffer(pcm_bytes, dtype='<i2'), self.fmt)
+                self.store.put(key, extension, data, self.spec['content_type'])
+                with self._lock:
+                    self.written += 1
+                    self.bytes_in += len(pcm_bytes)
+                    self.bytes_out += len(data)
+            stored = True
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            print(f"Warning: Could not archive recording {key[:12]}: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+                if stored:
+                    self._remember(key)
+
+    def load(self, key):
+        """int16 samples of an archived clip, or None if it isn't in the archive"""
+        data = self.store.get(key, self.spec['extension'])
+        return decode_clip(data) if data is not None else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'format': self.fmt,
+                'pending': len(self._pending),
+                'written': self.written,
+                'deduplicated': self.deduplicated,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'compression_ratio': round(self.bytes_in / self.bytes_out, 2) if self.bytes_out else None
+            }
+
+
+def create_recording_archive(db):
+    """Archive selected by RECORDING_ARCHIVE (off, disk or gridfs); None when off"""
+    backend = os.getenv('RECORDING_ARCHIVE', 'off').lower()
+    if backend == 'disk':
+        store = DiskStore(os.getenv('RECORDING_ARCHIVE_DIR', 'recordings'))
+    elif backend == 'gridfs':
+        store = GridFSStore(db)
+    else:
+        return None
+
+    fmt = os.getenv('RECORDING_ARCHIVE_FORMAT', 'flac').lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"RECORDING_ARCHIVE_FORMAT must be one of {', '.join(FORMATS)}")
+    return RecordingArchive(
+        store,
+        fmt=fmt,
+        workers=int(os.getenv('RECORDING_ARCHIVE_WORKERS', 2)),
+        max_queue=int(os.getenv('RECORDING_ARCHIVE_MAX_QUEUE', 64))
+    )
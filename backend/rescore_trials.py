@@ -0,0 +1,242 @@
+"""
+Recompute derived scores on historical trials after the rules in scoring.py change.
+
+Run from the backend folder:
+> python rescore_trials.py articulation
+> python rescore_trials.py fluency --workers 8 --batch 2000
+> python rescore_trials.py articulation --from-audio      # re-assess archived recordings
+
+Trials are streamed with a cursor in _id order, handed to a process pool in
+chunks, and written back with unordered bulk_write batches. Only trials whose
+scoring_version is behind scoring.SCORING_VERSION are read, so finished trials
+drop out on their own. The last written _id is also checkpointed in
+rescoring_checkpoints, so an interrupted run (or a --from-audio run with
+missing recordings) resumes where it stopped; --restart ignores the checkpoint.
+
+By default scores are recomputed from the raw metrics stored on each trial.
+With --from-audio the archived clip (see recording_archive.py) is recognized
+again, and the stored metrics are replaced too. Trials without an archived
+recording, or whose clip is missing because its background write failed, are
+left as they are and counted as missing.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+
+from pymongo import MongoClient, UpdateOne
+from dotenv import load_dotenv
+load_dotenv()
+
+from scoring import (SCORING_VERSION, FLUENCY_PASS_SCORE, pronunciation_result_dict, articulation_score,
+                     articulation_feedback, fluency_score)
+
+COLLECTIONS = {
+    'articulation': 'articulation_trials',
+    'fluency': 'fluency_trials'
+}
+PROJECTIONS = {
+    'articulation': {'scores': 1, 'transcription': 1, 'target': 1, 'recording_hash': 1},
+    'fluency': {'speaking_rate': 1, 'pause_count': 1, 'disfluencies': 1, 'recording_hash': 1, 'exercise_id': 1}
+}
+ARTICULATION_COMPONENTS = ('accuracy_score', 'pronunciation_score', 'completeness_score')
+# Update result for a --from-audio trial whose archived clip isn't in the archive
+MISSING = 'missing'
+
+# Per-process state for --from-audio, set up once by the pool initializer
+_archive = None
+_backend = None
+_fluency_targets = {}
+
+
+def _init_worker(from_audio):
+    global _archive, _backend, _fluency_targets
+    if not from_audio:
+        return
+    from recording_archive import create_recording_archive
+    from speech_backend import create_speech_backend
+
+    db = MongoClient(os.getenv('MONGO_URI'))['CVACare']
+    _archive = create_recording_archive(db)
+    _backend = create_speech_backend()
+    _fluency_targets = {doc['exercise_id']: doc.get('target', '')
+                        for doc in db['fluency_exercises'].find({}, {'exercise_id': 1, 'target': 1})}
+
+
+def _recognize_words(samples, target_text):
+    """Recognize an archived passage chunk by chunk (this process is already parallel)"""
+    from long_form import split_at_silences, merge_results
+
+    chunks = split_at_silences(samples)
+    results = [
+        _backend.prepare(samples[start:end].astype('<i2').tobytes(), word_timestamps=True, expected_text=target_text)()
+        for start, end in chunks
+    ]
+    result = merge_results(results, chunks)
+    if not result.recognized:
+        return None
+    return (json.loads(result.json).get('NBest') or [{}])[0].get('Words', [])
+
+
+def _articulation_update(doc, from_audio):
+    scores = dict(doc.get('scores') or {})
+    transcription = doc.get('transcription', '')
+
+    if from_audio:
+        samples = _archive.load(doc['recording_hash']) if _archive and doc.get('recording_hash') else None
+        if samples is None:
+            return MISSING
+        result = pronunciation_result_dict(
+            _backend.prepare(samples.astype('<i2').tobytes(), reference_text=doc.get('target', ''))()
+        )
+        if not result['success']:
+            return None
+        transcription = result['transcription']
+        for name in ARTICULATION_COMPONENTS + ('fluency_score',):
+            scores[name] = round(result[name], 3)
+
+    if not all(name in scores for name in ARTICULATION_COMPONENTS):
+        return None
+    computed = articulation_score(scores)
+    scores['computed_score'] = round(computed, 3)
+    return {
+        'scores': scores,
+        'transcription': transcription,
+        'feedback': articulation_feedback(computed, transcription, doc.get('target', '')),
+        'scoring_version': SCORING_VERSION
+    }
+
+
+def _fluency_update(doc, from_audio):
+    metrics = {name: doc.get(name) for name in ('speaking_rate', 'pause_count', 'disfluencies')}
+
+    if from_audio:
+        from fluency_analysis import analyze_words
+        from acoustic_disfluency import detect_disfluencies, attach_to_words, combine_disfluencies
+
+        samples = _archive.load(doc['recording_hash']) if _archive and doc.get('recording_hash') else None
+        if samples is None:
+            return MISSING
+        analysis = analyze_words(_recognize_words(samples, _fluency_targets.get(doc.get('exercise_id'), '')))
+        if analysis is None:
+            return None
+        events = attach_to_words(detect_disfluencies(samples), analysis['words']['offset'], analysis['words']['duration'])
+        metrics = {
+            'speaking_rate': analysis['speaking_rate'],
+            'pause_count': analysis['pause_count'],
+            'disfluencies': combine_disfluencies(analysis, events)[0]
+        }
+
+    if any(value is None for value in metrics.values()):
+        return None
+    score = fluency_score(metrics['speaking_rate'], metrics['pause_count'], metrics['disfluencies'])
+    return dict(metrics, fluency_score=score, passed=score >= FLUENCY_PASS_SCORE, scoring_version=SCORING_VERSION)
+
+
+def rescore_chunk(kind, docs, from_audio):
+    """Worker: (_id, $set fields, or None / MISSING to leave the trial alone) for each trial"""
+    update = _articulation_update if kind == 'articulation' else _fluency_update
+    results = []
+    for doc in docs:
+        try:
+            results.append((doc['_id'], update(doc, from_audio)))
+        except Exception as e:
+            print(f"Warning: Could not rescore trial {doc['_id']}: {e}", file=sys.stderr)
+            results.append((doc['_id'], None))
+    return results
+
+
+def _chunks(cursor, size):
+    chunk = []
+    for doc in cursor:
+        chunk.append(doc)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('kind', choices=sorted(COLLECTIONS))
+    parser.add_argument('--from-audio', action='store_true', help='re-assess archived recordings instead of stored metrics')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--chunk', type=int, default=200, help='trials per worker task')
+    parser.add_argument('--batch', type=int, default=1000, help='cursor batch size')
+    parser.add_argument('--limit', type=int, default=0, help='stop after this many trials (0 = all)')
+    parser.add_argument('--restart', action='store_true', help='ignore the saved checkpoint')
+    parser.add_argument('--dry-run', action='store_true', help='compute but do not write')
+    args = parser.parse_args()
+
+    mongo_uri = os.getenv('MONGO_URI')
+    if not mongo_uri:
+        print("ERROR: Please set MONGO_URI environment variable (or add it to a .env file).")
+        sys.exit(1)
+
+    db = MongoClient(mongo_uri)['CVACare']
+    trials = db[COLLECTIONS[args.kind]]
+    checkpoints = db['rescoring_checkpoints']
+    job_id = f"{args.kind}:v{SCORING_VERSION}:{'audio' if args.from_audio else 'metrics'}"
+
+    query = {'scoring_version': {'$ne': SCORING_VERSION}}
+    checkpoint = None if args.restart else checkpoints.find_one({'_id': job_id})
+    if checkpoint:
+        query['_id'] = {'$gt': checkpoint['last_id']}
+        print(f"Resuming {job_id} after {checkpoint['last_id']} ({checkpoint.get('processed', 0)} trials done before)")
+    if args.from_audio:
+        query['recording_hash'] = {'$ne': None}
+
+    projection = PROJECTIONS[args.kind]
+    cursor = trials.find(query, projection).sort('_id', 1).batch_size(args.batch)
+    if args.limit:
+        cursor = cursor.limit(args.limit)
+
+    processed = updated = skipped = missing = 0
+    start = last_report = time.monotonic()
+    previously_processed = checkpoint.get('processed', 0) if checkpoint else 0
+
+    def write(results):
+        nonlocal processed, updated, skipped, missing
+        operations = [UpdateOne({'_id': _id}, {'$set': fields}) for _id, fields in results if isinstance(fields, dict)]
+        missing += sum(1 for _, fields in results if fields == MISSING)
+        if operations and not args.dry_run:
+            trials.bulk_write(operations, ordered=False)
+        processed += len(results)
+        updated += len(operations)
+        skipped += len(results) - len(operations)
+        if not args.dry_run:
+            checkpoints.update_one(
+                {'_id': job_id},
+                {'$set': {'last_id': results[-1][0], 'processed': previously_processed + processed,
+                          'updated_at': datetime.datetime.utcnow()}},
+                upsert=True
+            )
+
+    # Results are written in submission order so the checkpoint only ever moves forward
+    in_flight = deque()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(args.from_audio,)) as pool:
+        for chunk in _chunks(cursor, args.chunk):
+            in_flight.append(pool.submit(rescore_chunk, args.kind, chunk, args.from_audio))
+            if len(in_flight) >= args.workers * 2:
+                write(in_flight.popleft().result())
+            if time.monotonic() - last_report >= 5:
+                last_report = time.monotonic()
+                print(f"  {processed} trials, {processed / (last_report - start):.0f} docs/sec")
+        while in_flight:
+            write(in_flight.popleft().result())
+
+    elapsed = time.monotonic() - start
+    rate = processed / elapsed if elapsed > 0 else 0
+    print(f"{job_id}: {processed} trials in {elapsed:.1f}s ({rate:.0f} docs/sec), "
+          f"{updated} rescored, {skipped} left unchanged ({missing} with no archived clip)"
+          f"{' (dry run)' if args.dry_run else ''}")
+
+
+if __name__ == '__main__':
+    main()
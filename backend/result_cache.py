@@ -0,0 +1,111 @@
+"""
+Assessment Result Cache
+Content-addressed cache for speech assessment results, keyed by a hash of the
+normalized PCM audio plus the reference text / exercise parameters. Retried
+uploads of the same recording get the stored scores without another Azure call.
+An in-process LRU sits in front of an optional Mongo collection with a TTL index.
+"""
+
+from collections import OrderedDict
+import datetime
+import hashlib
+import json
+import threading
+import time
+import os
+
+
+class AssessmentResultCache:
+    """LRU of assessment results with an optional shared Mongo tier"""
+
+    def __init__(self, max_size=512, ttl_seconds=24 * 3600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.collection = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_collection(self, collection):
+        """Share results across processes; Mongo expires them after ttl_seconds"""
+        self.collection = collection
+        collection.create_index('created_at', expireAfterSeconds=int(self.ttl_seconds))
+
+    @staticmethod
+    def key(kind, pcm_bytes, params):
+        """sha256 over the endpoint kind, the scoring parameters and the PCM samples"""
+        digest = hashlib.sha256()
+        digest.update(kind.encode('utf-8'))
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode('utf-8'))
+        digest.update(pcm_bytes)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Stored result for key, or None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        if self.collection is not None:
+            try:
+                doc = self.collection.find_one({'_id': key}, {'result': 1})
+            except Exception as e:
+                print(f"Warning: Result cache lookup failed: {e}")
+                doc = None
+            if doc is not None:
+                self._remember(key, doc['result'])
+                with self._lock:
+                    self.hits += 1
+                return doc['result']
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, result):
+        """Store a successful result"""
+        self._remember(key, result)
+        if self.collection is not None:
+            try:
+                self.collection.update_one(
+                    {'_id': key},
+                    {'$set': {'result': result, 'created_at': datetime.datetime.utcnow()}},
+                    upsert=True
+                )
+            except Exception as e:
+                print(f"Warning: Result cache write failed: {e}")
+
+    def _remember(self, key, result):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'shared': self.collection is not None
+            }
+
+
+# Shared by the articulation, expressive and fluency endpoints
+result_cache = AssessmentResultCache(
+    max_size=int(os.getenv('RESULT_CACHE_SIZE', 512)),
+    ttl_seconds=float(os.getenv('RESULT_CACHE_TTL', 24 * 3600))
+)
+
+
+def init_result_cache(db):
+    """Enable the Mongo tier when RESULT_CACHE_MONGO is set"""
+    if os.getenv('RESULT_CACHE_MONGO', 'False').lower() == 'true':
+        result_cache.init_collection(db['assessment_result_cache'])
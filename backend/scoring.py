@@ -0,0 +1,93 @@
+"""
+Scoring Rules
+The derived scores the assessment endpoints store on trials: the articulation
+computed_score and feedback, and the fluency score, feedback and pass mark.
+They live here, not inline in the endpoints, so rescore_trials.py applies the
+same rules to historical trials. Bump SCORING_VERSION whenever a weight,
+penalty or threshold changes; trials record the version they were scored
+with, and the rescoring job picks up the ones that are behind.
+"""
+
+SCORING_VERSION = 1
+
+# Articulation: pronunciation is emphasized for articulation therapy
+ARTICULATION_WEIGHTS = {
+    'pronunciation_score': 0.5,
+    'accuracy_score': 0.3,
+    'completeness_score': 0.2
+}
+
+# Fluency: ideal speaking rate band, and penalties per pause / disfluency with their caps
+FLUENCY_RATE_BAND = (80, 180)
+FLUENCY_RATE_CENTER = 120
+FLUENCY_PAUSE_PENALTY = 5
+FLUENCY_PAUSE_PENALTY_CAP = 30
+FLUENCY_DISFLUENCY_PENALTY = 10
+FLUENCY_DISFLUENCY_PENALTY_CAP = 40
+FLUENCY_PASS_SCORE = 70
+
+
+def pronunciation_result_dict(result):
+    """Convert a backend RecognitionResult into the 0-1 articulation result dict"""
+    if not result.recognized:
+        return {
+            'success': False,
+            'error': result.error or f'Recognition failed: {result.reason}'
+        }
+
+    pronunciation_result = result.pronunciation
+    return {
+        'success': True,
+        'transcription': result.text,
+        'accuracy_score': pronunciation_result['accuracy_score'] / 100,  # 0-1 scale
+        'pronunciation_score': pronunciation_result['pronunciation_score'] / 100,
+        'completeness_score': pronunciation_result['completeness_score'] / 100,
+        'fluency_score': pronunciation_result['fluency_score'] / 100,
+        'phonemes': [
+            {
+                'phoneme': p['phoneme'],
+                'score': p['accuracy_score'] / 100
+            }
+            for p in pronunciation_result['phonemes']
+        ]
+    }
+
+
+def articulation_score(scores):
+    """Combined 0-1 score from the accuracy/pronunciation/completeness components"""
+    return sum(scores[name] * weight for name, weight in ARTICULATION_WEIGHTS.items())
+
+
+def articulation_feedback(computed_score, transcription, target):
+    if computed_score >= 0.90:
+        return f"🎉 Excellent pronunciation! Score: {int(computed_score*100)}%"
+    elif computed_score >= 0.75 and transcription:
+        return f"👍 Good job! You said '{transcription}'. Score: {int(computed_score*100)}%"
+    elif computed_score >= 0.75:
+        return f"👍 Good job! Score: {int(computed_score*100)}%"
+    elif computed_score >= 0.50:
+        return f"Keep practicing '{target}'. Score: {int(computed_score*100)}%"
+    else:
+        return f"Try listening to the model again. Score: {int(computed_score*100)}%"
+
+
+def fluency_score(speaking_rate, pause_count, disfluencies):
+    """0-100 fluency score from speaking rate, pauses and disfluencies"""
+    rate_score = 100
+    if speaking_rate < FLUENCY_RATE_BAND[0] or speaking_rate > FLUENCY_RATE_BAND[1]:
+        rate_score = max(0, 100 - abs(speaking_rate - FLUENCY_RATE_CENTER))
+
+    pause_penalty = min(FLUENCY_PAUSE_PENALTY_CAP, pause_count * FLUENCY_PAUSE_PENALTY)
+    disfluency_penalty = min(FLUENCY_DISFLUENCY_PENALTY_CAP, disfluencies * FLUENCY_DISFLUENCY_PENALTY)
+    return max(0, min(100, rate_score - pause_penalty - disfluency_penalty))
+
+
+def fluency_feedback(score):
+    if score >= 90:
+        return "Excellent fluency! Your speech was smooth and natural."
+    elif score >= 75:
+        return "Good fluency! Keep practicing to improve smoothness."
+    elif score >= 60:
+        return "Fair fluency. Try to reduce pauses and speak more steadily."
+    else:
+        return "Keep practicing. Focus on breathing and speaking slowly."
@@ -0,0 +1,513 @@
+"""
+Speech Backends
+Recognition for the articulation, expressive language and fluency assessment
+endpoints, with per-stage timings (config, recognize, parse). The Azure backend
+builds the SDK configs once per process; the fake backend returns deterministic
+Azure-shaped results with configurable latency and failures so the request
+path can be load-tested without a subscription (SPEECH_BACKEND=fake).
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+import hashlib
+import json
+import random
+import threading
+import time
+import os
+
+from audio_decode import TARGET_SAMPLE_RATE
+
+
+class StageTimer:
+    """Collects wall-clock milliseconds for the stages of one assessment"""
+
+    def __init__(self):
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round(self.timings.get(name, 0) + (time.perf_counter() - start) * 1000, 2)
+
+
+class RecognitionResult:
+    """Backend-neutral outcome of one recognition"""
+
+    RECOGNIZED = 'recognized'
+    NO_MATCH = 'no_match'
+    FAILED = 'failed'
+
+    def __init__(self, reason, text='', json_text='{}', pronunciation=None, error=None):
+        self.reason = reason
+        self.text = text
+        self.json = json_text            # Azure-shaped detailed result (NBest, Words, ...)
+        self.pronunciation = pronunciation
+        self.error = error
+
+    @property
+    def recognized(self):
+        return self.reason == self.RECOGNIZED
+
+    @property
+    def no_match(self):
+        return self.reason == self.NO_MATCH
+
+
+class SpeechBackend(ABC):
+    """
+    Interface used by the assessment endpoints. prepare() does the cheap setup
+    and returns a zero-argument callable that performs the blocking recognition
+    (run it on the recognition executor) and returns a RecognitionResult.
+    pronunciation is a dict of 0-100 scores plus phonemes when reference_text is set.
+    """
+
+    name = 'base'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stage_stats = {}
+
+    @property
+    def configured(self):
+        return True
+
+    @abstractmethod
+    def prepare(self, pcm_bytes, word_timestamps=False, reference_text=None, expected_text=None):
+        """Set up one recognition; returns the callable that runs it"""
+
+    def open_stream(self, reference_text, on_partial=None):
+        """Session for audio that arrives in chunks while the speaker is still talking"""
+        return BufferedStream(self, reference_text)
+
+    def record(self, endpoint, timings):
+        """Fold one request's stage timings into the per-endpoint stats and log them"""
+        if not timings:
+            return
+        with self._lock:
+            stats = self._stage_stats.setdefault(endpoint, {})
+            for stage, ms in timings.items():
+                entry = stats.setdefault(stage, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+                entry['count'] += 1
+                entry['total_ms'] += ms
+                entry['max_ms'] = max(entry['max_ms'], ms)
+        print(f"Speech timings [{endpoint}]: " + ", ".join(f"{k}={v:.1f}ms" for k, v in timings.items()))
+
+    def stats(self):
+        """Average and max milliseconds per endpoint and stage"""
+        with self._lock:
+            return {
+                endpoint: {
+                    stage: {
+                        'count': entry['count'],
+                        'avg_ms': round(entry['total_ms'] / entry['count'], 2),
+                        'max_ms': round(entry['max_ms'], 2)
+                    }
+                    for stage, entry in stages.items()
+                }
+                for endpoint, stages in self._stage_stats.items()
+            }
+
+
+class BufferedStream:
+    """Collects PCM chunks and runs one recognition once the speaker stops"""
+
+    def __init__(self, backend, reference_text):
+        self.backend = backend
+        self.reference_text = reference_text
+        self._chunks = []
+
+    def write(self, pcm_chunk):
+        self._chunks.append(pcm_chunk)
+
+    def finish(self, timeout=10):
+        return self.backend.prepare(b''.join(self._chunks), reference_text=self.reference_text)()
+
+    def cancel(self):
+        self._chunks = []
+
+
+def merge_segment_json(segments, text):
+    """
+    Detailed JSON for a multi-segment stream: the words (with their phoneme detail) of
+    every segment in order. Continuous recognition offsets are already relative to the
+    start of the stream, so they are kept as they are.
+    """
+    words, lexical = [], []
+    for segment in segments:
+        try:
+            best = (json.loads(segment.json).get('NBest') or [{}])[0]
+        except (TypeError, ValueError):
+            best = {}
+        lexical.append(best.get('Lexical', segment.text))
+        words.extend(best.get('Words', []))
+
+    detailed = {
+        'RecognitionStatus': 'Success',
+        'DisplayText': text,
+        'NBest': [{'Lexical': ' '.join(lexical), 'Display': text, 'Words': words}]
+    }
+    if words:
+        detailed['Offset'] = words[0].get('Offset', 0)
+        detailed['Duration'] = words[-1].get('Offset', 0) + words[-1].get('Duration', 0) - detailed['Offset']
+    return json.dumps(detailed)
+
+
+class AzureContinuousStream:
+    """
+    Continuous recognition fed through a push stream as chunks arrive, so Azure
+    has already heard most of the utterance when the speaker stops and only the
+    final segment is left to score.
+    """
+
+    def __init__(self, backend, reference_text, on_partial=None):
+        speechsdk = backend.sdk
+        self._backend = backend
+        self._segments = []
+        self._error = None
+        self._done = threading.Event()
+
+        stream_format = speechsdk.audio.AudioStreamFormat(
+            samples_per_second=TARGET_SAMPLE_RATE,
+            bits_per_sample=16,
+            channels=1
+        )
+        self._push_stream = speechsdk.audio.PushAudioInputStream(stream_format=stream_format)
+        self._recognizer = backend.recognizer(
+            speechsdk.audio.AudioConfig(stream=self._push_stream),
+            reference_text=reference_text
+        )
+
+        if on_partial is not None:
+            self._recognizer.recognizing.connect(lambda evt: on_partial(evt.result.text))
+        self._recognizer.recognized.connect(self._on_recognized)
+        self._recognizer.canceled.connect(self._on_canceled)
+        self._recognizer.session_stopped.connect(lambda evt: self._done.set())
+        self._recognizer.start_continuous_recognition_async().get()
+
+    def _on_recognized(self, evt):
+        if evt.result.reason == self._backend.sdk.ResultReason.RecognizedSpeech:
+            self._segments.append(self._backend._convert(evt.result, True))
+
+    def _on_canceled(self, evt):
+        details = evt.cancellation_details
+        if details.reason == self._backend.sdk.CancellationReason.Error:
+            self._error = details.error_details
+        self._done.set()
+
+    def write(self, pcm_chunk):
+        self._push_stream.write(pcm_chunk)
+
+    def finish(self, timeout=10):
+        """Close the stream, wait for the last segment and merge the segments"""
+        self._push_stream.close()
+        self._done.wait(timeout)
+        self._recognizer.stop_continuous_recognition_async()
+
+        if not self._segments:
+            if self._error:
+                return RecognitionResult(RecognitionResult.FAILED, error=f'Recognition failed: {self._error}')
+            return RecognitionResult(RecognitionResult.NO_MATCH)
+        if len(self._segments) == 1:
+            return self._segments[0]
+
+        # Weight each segment's scores by its word count
+        weights = [max(len(segment.text.split()), 1) for segment in self._segments]
+        total = sum(weights)
+        pronunciation = {
+            key: sum(w * segment.pronunciation[key] for w, segment in zip(weights, self._segments)) / total
+            for key in ('accuracy_score', 'pronunciation_score', 'fluency_score', 'completeness_score')
+        }
+        pronunciation['phonemes'] = [p for segment in self._segments for p in segment.pronunciation['phonemes']]
+        text = ' '.join(segment.text for segment in self._segments)
+        return RecognitionResult(RecognitionResult.RECOGNIZED, text, merge_segment_json(self._segments, text), pronunciation)
+
+    def cancel(self):
+        self._push_stream.close()
+        self._recognizer.stop_continuous_recognition_async()
+
+
+def assessment_phonemes(assessment):
+    """
+    Phoneme scores of a PronunciationAssessmentResult, in spoken order. Azure only
+    reports them per word (assessment.words[i].phonemes), not on the result itself.
+    """
+    return [
+        {'phoneme': p.phoneme, 'accuracy_score': p.accuracy_score}
+        for word in (getattr(assessment, 'words', None) or [])
+        for p in (getattr(word, 'phonemes', None) or [])
+    ]
+
+
+class AzureSpeechBackend(SpeechBackend):
+    """Process-wide Azure Speech configs and recognizer factory"""
+
+    name = 'azure'
+
+    def __init__(self, key, region, language='en-US', max_reference_configs=512):
+        super().__init__()
+        self.key = key
+        self.region = region
+        self.language = language
+        self.max_reference_configs = max_reference_configs
+        self._sdk = None
+        self._speech_configs = {}
+        self._pronunciation_configs = OrderedDict()
+
+    @property
+    def configured(self):
+        return bool(self.key) and self.key != 'YOUR_AZURE_SPEECH_KEY_HERE' and bool(self.region)
+
+    @property
+    def sdk(self):
+        """The Azure Speech SDK module, imported on first use"""
+        if self._sdk is None:
+            import azure.cognitiveservices.speech as speechsdk
+            self._sdk = speechsdk
+        return self._sdk
+
+    def speech_config(self, word_timestamps=False):
+        """Shared SpeechConfig; one plain and one with word-level timestamps"""
+        with self._lock:
+            config = self._speech_configs.get(word_timestamps)
+            if config is None:
+                config = self.sdk.SpeechConfig(subscription=self.key, region=self.region)
+                config.speech_recognition_language = self.language
+                if word_timestamps:
+                    config.request_word_level_timestamps()
+                self._speech_configs[word_timestamps] = config
+            return config
+
+    def pronunciation_config(self, reference_text):
+        """Pre-built pronunciation assessment config per reference text (LRU)"""
+        with self._lock:
+            config = self._pronunciation_configs.get(reference_text)
+            if config is not None:
+                self._pronunciation_configs.move_to_end(reference_text)
+                return config
+
+        speechsdk = self.sdk
+        config = speechsdk.PronunciationAssessmentConfig(
+            reference_text=reference_text,
+            grading_system=speechsdk.PronunciationAssessmentGradingSystem.HundredMark,
+            granularity=speechsdk.PronunciationAssessmentGranularity.Phoneme,
+            enable_miscue=True
+        )
+
+        with self._lock:
+            self._pronunciation_configs[reference_text] = config
+            while len(self._pronunciation_configs) > self.max_reference_configs:
+                self._pronunciation_configs.popitem(last=False)
+        return config
+
+    def pcm_audio_config(self, pcm_bytes):
+        """Feed raw 16kHz mono PCM to the recognizer through a push stream (no temp file)"""
+        speechsdk = self.sdk
+        stream_format = speechsdk.audio.AudioStreamFormat(
+            samples_per_second=TARGET_SAMPLE_RATE,
+            bits_per_sample=16,
+            channels=1
+        )
+        push_stream = speechsdk.audio.PushAudioInputStream(stream_format=stream_format)
+        push_stream.write(pcm_bytes)
+        push_stream.close()
+        return speechsdk.audio.AudioConfig(stream=push_stream)
+
+    def file_audio_config(self, path):
+        return self.sdk.audio.AudioConfig(filename=path)
+
+    def recognizer(self, audio_config, word_timestamps=False, reference_text=None):
+        """SpeechRecognizer on the shared config, with pronunciation assessment if reference_text is set"""
+        recognizer = self.sdk.SpeechRecognizer(
+            speech_config=self.speech_config(word_timestamps),
+            audio_config=audio_config
+        )
+        if reference_text is not None:
+            self.pronunciation_config(reference_text).apply_to(recognizer)
+        return recognizer
+
+    def open_stream(self, reference_text, on_partial=None):
+        return AzureContinuousStream(self, reference_text, on_partial)
+
+    def prepare(self, pcm_bytes, word_timestamps=False, reference_text=None, expected_text=None):
+        """Recognizer over the PCM buffer; expected_text is only used by the fake backend"""
+        recognizer = self.recognizer(self.pcm_audio_config(pcm_bytes), word_timestamps, reference_text)
+
+        def recognize():
+            return self._convert(recognizer.recognize_once(), reference_text is not None)
+        return recognize
+
+    def _convert(self, result, assess):
+        speechsdk = self.sdk
+        if result.reason == speechsdk.ResultReason.RecognizedSpeech:
+            pronunciation = None
+            if assess:
+                assessment = speechsdk.PronunciationAssessmentResult(result)
+                pronunciation = {
+                    'accuracy_score': assessment.accuracy_score,
+                    'pronunciation_score': assessment.pronunciation_score,
+                    'completeness_score': assessment.completeness_score,
+                    'fluency_score': assessment.fluency_score,
+                    'phonemes': assessment_phonemes(assessment)
+                }
+            return RecognitionResult(RecognitionResult.RECOGNIZED, result.text, result.json, pronunciation)
+        if result.reason == speechsdk.ResultReason.NoMatch:
+            return RecognitionResult(RecognitionResult.NO_MATCH)
+        return RecognitionResult(RecognitionResult.FAILED, error=f'Recognition failed: {result.reason}')
+
+
+FAKE_VOCABULARY = (
+    'the', 'cat', 'is', 'on', 'a', 'red', 'ball', 'big', 'dog', 'runs',
+    'happy', 'sun', 'we', 'play', 'in', 'park', 'my', 'mom', 'likes', 'apples'
+)
+TICKS_PER_SECOND = 10000000  # Azure offsets and durations are in 100 ns units
+
+
+class FakeSpeechBackend(SpeechBackend):
+    """
+    Deterministic stand-in for load testing. The same audio and text always give
+    the same transcript, timings and scores; latency, failures and no-match
+    results are drawn from the configured distributions.
+    """
+
+    name = 'fake'
+
+    def __init__(self, latency_ms=800, jitter_ms=300, error_rate=0.0, no_match_rate=0.0, words_per_second=2.2):
+        super().__init__()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.no_match_rate = no_match_rate
+        self.words_per_second = words_per_second
+
+    def prepare(self, pcm_bytes, word_timestamps=False, reference_text=None, expected_text=None):
+        digest = hashlib.sha256(pcm_bytes)
+        digest.update((reference_text or expected_text or '').encode('utf-8'))
+        seed = int.from_bytes(digest.digest()[:8], 'little')
+        duration = len(pcm_bytes) / 2 / TARGET_SAMPLE_RATE
+
+        def recognize():
+            rng = random.Random(seed)
+            time.sleep(max(rng.gauss(self.latency_ms, self.jitter_ms), 0) / 1000)
+
+            roll = rng.random()
+            if roll < self.error_rate:
+                return RecognitionResult(RecognitionResult.FAILED, error='Recognition failed: simulated error')
+            if roll < self.error_rate + self.no_match_rate or duration < 0.1:
+                return RecognitionResult(RecognitionResult.NO_MATCH)
+            return self._synthesize(rng, duration, reference_text, expected_text)
+        return recognize
+
+    def _synthesize(self, rng, duration, reference_text, expected_text):
+        reference = (reference_text or expected_text or '').split()
+        if reference:
+            # Children skip and repeat words; a reference text is read more faithfully
+            words = []
+            for word in reference:
+                if expected_text and not reference_text and rng.random() < 0.1:
+                    continue
+                words.append(word)
+                if rng.random() < 0.05:
+                    words.append(word)
+            words = words or reference[:1]
+        else:
+            count = max(1, round(duration * self.words_per_second))
+            words = [rng.choice(FAKE_VOCABULARY) for _ in range(count)]
+
+        # Lay the words out on a timeline, with the occasional long pause
+        timings = []
+        cursor = rng.uniform(0.2, 0.5)
+        for word in words:
+            length = 0.08 * len(word) + rng.uniform(0.05, 0.15)
+            timings.append((cursor, length))
+            cursor += length + (rng.uniform(0.4, 1.0) if rng.random() < 0.1 else rng.uniform(0.05, 0.15))
+        scale = min(1.0, duration * 0.95 / cursor)
+
+        base_accuracy = rng.uniform(60, 98)
+        word_entries = []
+        for word, (offset, length) in zip(words, timings):
+            accuracy = min(100.0, max(0.0, rng.gauss(base_accuracy, 8)))
+            phonemes = [
+                {
+                    'Phoneme': letter,
+                    'PronunciationAssessment': {'AccuracyScore': round(min(100.0, max(0.0, rng.gauss(accuracy, 5))), 1)}
+                }
+                for letter in word.lower() if letter.isalpha()
+            ]
+            word_entries.append({
+                'Word': word,
+                'Offset': int(offset * scale * TICKS_PER_SECOND),
+                'Duration': int(length * scale * TICKS_PER_SECOND),
+                'PronunciationAssessment': {
+                    'AccuracyScore': round(accuracy, 1),
+                    'ErrorType': 'None' if accuracy >= 60 else 'Mispronunciation'
+                },
+                'Phonemes': phonemes
+            })
+
+        accuracy = sum(w['PronunciationAssessment']['AccuracyScore'] for w in word_entries) / len(word_entries)
+        long_pauses = sum(
+            1 for previous, current in zip(word_entries, word_entries[1:])
+            if current['Offset'] - previous['Offset'] - previous['Duration'] > 0.3 * TICKS_PER_SECOND
+        )
+        fluency = max(0.0, 100.0 - 15 * long_pauses - rng.uniform(0, 10))
+        completeness = 100.0 * min(len(set(words)) / len(set(reference)), 1.0) if reference else 100.0
+        pronunciation_score = 0.6 * accuracy + 0.2 * fluency + 0.2 * completeness
+        scores = {
+            'AccuracyScore': round(accuracy, 1),
+            'FluencyScore': round(fluency, 1),
+            'CompletenessScore': round(completeness, 1),
+            'PronScore': round(pronunciation_score, 1)
+        }
+
+        text = ' '.join(words).capitalize() + '.'
+        detailed = {
+            'RecognitionStatus': 'Success',
+            'DisplayText': text,
+            'Offset': word_entries[0]['Offset'],
+            'Duration': word_entries[-1]['Offset'] + word_entries[-1]['Duration'] - word_entries[0]['Offset'],
+            'NBest': [{
+                'Confidence': round(rng.uniform(0.7, 0.98), 4),
+                'Lexical': ' '.join(words).lower(),
+                'Display': text,
+                'PronunciationAssessment': scores,
+                'Words': word_entries
+            }]
+        }
+
+        pronunciation = None
+        if reference_text is not None:
+            pronunciation = {
+                'accuracy_score': scores['AccuracyScore'],
+                'pronunciation_score': scores['PronScore'],
+                'completeness_score': scores['CompletenessScore'],
+                'fluency_score': scores['FluencyScore'],
+                'phonemes': [
+                    {'phoneme': p['Phoneme'], 'accuracy_score': p['PronunciationAssessment']['AccuracyScore']}
+                    for w in word_entries for p in w['Phonemes']
+                ]
+            }
+        return RecognitionResult(RecognitionResult.RECOGNIZED, text, json.dumps(detailed), pronunciation)
+
+
+def create_speech_backend():
+    """Backend selected by SPEECH_BACKEND (azure or fake)"""
+    if os.getenv('SPEECH_BACKEND', 'azure').lower() == 'fake':
+        return FakeSpeechBackend(
+            latency_ms=float(os.getenv('FAKE_SPEECH_LATENCY_MS', 800)),
+            jitter_ms=float(os.getenv('FAKE_SPEECH_JITTER_MS', 300)),
+            error_rate=float(os.getenv('FAKE_SPEECH_ERROR_RATE', 0)),
+            no_match_rate=float(os.getenv('FAKE_SPEECH_NO_MATCH_RATE', 0))
+        )
+    return AzureSpeechBackend(
+        key=os.getenv('AZURE_SPEECH_KEY'),
+        region=os.getenv('AZURE_SPEECH_REGION', 'eastus')
+    )
+
+
+# Shared by every assessment endpoint
+speech_backend = create_speech_backend()
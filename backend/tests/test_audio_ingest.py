@@ -0,0 +1,60 @@
+import io
+import struct
+
+import pytest
+
+import audio_ingest
+from audio_ingest import AudioRejected, check_header, ingest, parse_webm_header
+
+
+def element(element_id, body):
+    """One EBML element with an 8-byte size"""
+    id_bytes = element_id.to_bytes((element_id.bit_length() + 7) // 8, 'big')
+    return id_bytes + b'\x01' + len(body).to_bytes(7, 'big') + body
+
+
+def webm(duration_ms=None, channels=1, sample_rate=48000.0):
+    info = element(0x2AD7B1, (1000000).to_bytes(3, 'big'))
+    if duration_ms is not None:
+        info += element(0x4489, struct.pack('>d', duration_ms))
+    audio = element(0xB5, struct.pack('>d', sample_rate)) + element(0x9F, bytes([channels]))
+    tracks = element(0xAE, element(0xD7, b'\x01') + element(0xE1, audio))
+    # Live MediaRecorder output: the Segment's size is unknown
+    segment = b'\x18\x53\x80\x67\x01\xff\xff\xff\xff\xff\xff\xff'
+    return (element(0x1A45DFA3, element(0x4282, b'webm')) + segment +
+            element(0x1549A966, info) + element(0x1654AE6B, tracks) +
+            element(0x1F43B675, b'\x00' * 32))
+
+
+LIMITS = {'max_seconds': 15, 'max_bytes': 2048}
+
+
+def test_webm_header_fields():
+    assert parse_webm_header(webm(duration_ms=3500)) == {'channels': 1, 'sample_rate': 48000.0, 'duration': 3.5}
+    assert parse_webm_header(webm())['duration'] is None
+
+
+def test_webm_declared_duration_and_tracks_are_checked():
+    assert check_header(webm(duration_ms=3500), LIMITS) == 'webm'
+    with pytest.raises(AudioRejected, match=r'too long \(limit 15 seconds\)'):
+        check_header(webm(duration_ms=60000), LIMITS)
+    with pytest.raises(AudioRejected, match='mono or stereo'):
+        check_header(webm(channels=6), LIMITS)
+
+
+@pytest.mark.parametrize('max_bytes, padding', [(2048, 4096), (100 * 1024, 200 * 1024)])
+def test_too_large_message_is_the_same_for_bytes_and_streams(monkeypatch, max_bytes, padding):
+    limits = dict(LIMITS, max_bytes=max_bytes)
+    monkeypatch.setitem(audio_ingest.ENDPOINT_LIMITS, 'articulation', limits)
+    upload = webm() + b'\x00' * padding
+
+    class FileStorage:
+        stream = io.BytesIO(upload)
+
+    messages = []
+    for audio_file in (upload, FileStorage()):
+        with pytest.raises(AudioRejected) as rejected:
+            ingest(audio_file, 'articulation')
+        assert rejected.value.status == 413
+        messages.append(rejected.value.message)
+    assert messages == [f'Recording is too large (limit {max_bytes // 1024} KB)'] * 2
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+import time
+
+import pytest
+
+from firebase_tokens import CertificatePrefetcher, FirebaseTokenVerifier
+
+
+class CountingVerify:
+    """Stands in for auth.verify_id_token"""
+
+    def __init__(self, exp_in=3600):
+        self.calls = 0
+        self.exp_in = exp_in
+
+    def __call__(self, id_token):
+        self.calls += 1
+        if id_token == 'bad':
+            raise ValueError('invalid token')
+        return {'uid': id_token, 'sub': id_token, 'exp': time.time() + self.exp_in}
+
+
+def test_verified_claims_are_cached_until_exp():
+    verify = CountingVerify()
+    verifier = FirebaseTokenVerifier(verify)
+    assert verifier.verify('user-1')['uid'] == 'user-1'
+    assert verifier.verify('user-1')['uid'] == 'user-1'
+    assert verify.calls == 1
+    assert verifier.stats() == {'size': 1, 'hits': 1, 'misses': 1}
+
+
+def test_expired_entries_are_verified_again():
+    verify = CountingVerify(exp_in=-1)
+    verifier = FirebaseTokenVerifier(verify)
+    verifier.verify('user-1')
+    verifier.verify('user-1')
+    assert verify.calls == 2
+
+
+def test_invalid_tokens_are_not_cached():
+    verify = CountingVerify()
+    verifier = FirebaseTokenVerifier(verify)
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            verifier.verify('bad')
+    assert verify.calls == 2
+    assert verifier.stats()['size'] == 0
+
+
+def test_cached_claims_are_copies():
+    verifier = FirebaseTokenVerifier(CountingVerify())
+    verifier.verify('user-1')['uid'] = 'someone-else'
+    assert verifier.verify('user-1')['uid'] == 'user-1'
+
+
+def test_prefetch_reads_max_age_through_the_shared_request():
+    requested = []
+
+    def request(url, method='GET'):
+        requested.append(url)
+        return SimpleNamespace(status=200, headers={'Cache-Control': 'public, max-age=19000'})
+
+    prefetcher = CertificatePrefetcher(request, url='https://certs.example')
+    assert prefetcher.refresh() == 19000
+    assert requested == ['https://certs.example']
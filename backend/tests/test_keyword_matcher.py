@@ -0,0 +1,30 @@
+import pytest
+
+from keyword_matcher import IRREGULAR, MAX_NORMALIZED, KeywordMatcher, _normalize, stem
+
+
+@pytest.mark.parametrize('form, base', [
+    ('rode', 'ride'), ('made', 'make'), ('gave', 'give'), ('came', 'come'),
+    ('took', 'take'), ('wrote', 'write'), ('has', 'have')
+])
+def test_irregular_form_matches_its_keyword(form, base):
+    assert stem(form) == stem(base)
+    assert KeywordMatcher([base]).match(f'the boy {form} it') == [base]
+
+
+def test_every_irregular_form_stems_like_its_base():
+    assert {form: stem(form) for form in IRREGULAR} == {form: stem(base) for form, base in IRREGULAR.items()}
+
+
+def test_inflections_and_synonyms():
+    matcher = KeywordMatcher(['water', 'run', 'mom', 'cat'])
+    assert matcher.match('Mommy watered the plants while running') == ['water', 'run', 'mom']
+    assert matcher.match('I can catch it') == []
+
+
+def test_match_survives_normalization_cache_eviction():
+    _normalize.cache_clear()
+    for i in range(MAX_NORMALIZED - 1):
+        _normalize(f'filler{i}')
+    matcher = KeywordMatcher(['red ball', 'fresh'])
+    assert matcher.match('the red ball and a fresh unseenword') == ['red ball', 'fresh']
@@ -0,0 +1,28 @@
+import threading
+
+import pytest
+
+from recognition_pool import RecognitionBusy, RecognitionExecutor
+
+
+def test_timed_out_batch_releases_its_queued_slots():
+    executor = RecognitionExecutor(max_concurrency=1, max_queue=4, deadline_seconds=0.1)
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append('slow')
+        release.wait(5)
+
+    def quick():
+        calls.append('quick')
+
+    with pytest.raises(RecognitionBusy):
+        executor.run_all([slow, quick, quick])
+    stats = executor.stats()
+    release.set()
+
+    assert stats['queue_depth'] == 0
+    assert stats['abandoned'] == 1
+    assert calls == ['slow']
+
@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+
+import pytest
+
+from phoneme_scores import pack_phonemes, unpack_phonemes
+from scoring import pronunciation_result_dict
+from speech_backend import FakeSpeechBackend, RecognitionResult, SpeechBackend, assessment_phonemes
+
+
+def azure_assessment(words):
+    """Shaped like speechsdk.PronunciationAssessmentResult: phonemes only under words"""
+    return SimpleNamespace(
+        accuracy_score=80, pronunciation_score=82, completeness_score=100, fluency_score=90,
+        words=[
+            SimpleNamespace(word=word, accuracy_score=80, phonemes=[
+                SimpleNamespace(phoneme=phoneme, accuracy_score=score) for phoneme, score in phonemes
+            ])
+            for word, phonemes in words
+        ]
+    )
+
+
+def test_phonemes_come_from_words():
+    assessment = azure_assessment([
+        ('red', [('r', 40), ('eh', 95), ('d', 88)]),
+        ('sun', [('s', 70), ('ah', 90), ('n', 100)])
+    ])
+    assert assessment_phonemes(assessment) == [
+        {'phoneme': 'r', 'accuracy_score': 40},
+        {'phoneme': 'eh', 'accuracy_score': 95},
+        {'phoneme': 'd', 'accuracy_score': 88},
+        {'phoneme': 's', 'accuracy_score': 70},
+        {'phoneme': 'ah', 'accuracy_score': 90},
+        {'phoneme': 'n', 'accuracy_score': 100}
+    ]
+
+
+def test_phonemes_without_words():
+    assert assessment_phonemes(SimpleNamespace(words=None)) == []
+    assert assessment_phonemes(azure_assessment([('uh', [])])) == []
+
+
+def test_azure_phonemes_reach_packed_trial():
+    assessment = azure_assessment([('red', [('r', 40), ('eh', 95), ('d', 88)])])
+    pronunciation = {
+        'accuracy_score': assessment.accuracy_score,
+        'pronunciation_score': assessment.pronunciation_score,
+        'completeness_score': assessment.completeness_score,
+        'fluency_score': assessment.fluency_score,
+        'phonemes': assessment_phonemes(assessment)
+    }
+    result = pronunciation_result_dict(
+        RecognitionResult(RecognitionResult.RECOGNIZED, 'red', '{}', pronunciation)
+    )
+    packed = pack_phonemes(result['phonemes'])
+    assert packed is not None
+    assert unpack_phonemes(packed) == [
+        {'phoneme': 'r', 'score': 0.4}, {'phoneme': 'eh', 'score': 0.95}, {'phoneme': 'd', 'score': 0.88}
+    ]
+
+
+def test_stream_segments_merge_words_and_average_completeness():
+    import json
+    import threading
+    from speech_backend import AzureContinuousStream
+
+    def segment(text, completeness, offset):
+        words = [{'Word': word, 'Offset': offset + i * 5000000, 'Duration': 4000000,
+                  'Phonemes': [{'Phoneme': word[0]}]} for i, word in enumerate(text.split())]
+        detailed = {'NBest': [{'Lexical': text, 'Words': words}]}
+        pronunciation = {'accuracy_score': 80, 'pronunciation_score': 80, 'fluency_score': 80,
+                         'completeness_score': completeness, 'phonemes': [{'phoneme': text[0], 'accuracy_score': 80}]}
+        return RecognitionResult(RecognitionResult.RECOGNIZED, text, json.dumps(detailed), pronunciation)
+
+    stream = AzureContinuousStream.__new__(AzureContinuousStream)
+    stream._segments = [segment('red ball', 90, 0), segment('big dog', 100, 30000000)]
+    stream._error = None
+    stream._done = threading.Event()
+    stream._done.set()
+    stream._push_stream = SimpleNamespace(close=lambda: None)
+    stream._recognizer = SimpleNamespace(stop_continuous_recognition_async=lambda: None)
+
+    result = stream.finish()
+    assert result.text == 'red ball big dog'
+    assert result.pronunciation['completeness_score'] == 95
+    assert len(result.pronunciation['phonemes']) == 2
+    words = json.loads(result.json)['NBest'][0]['Words']
+    assert [w['Word'] for w in words] == ['red', 'ball', 'big', 'dog']
+    assert all(w['Phonemes'] for w in words)
+
+
+def test_backend_without_prepare_cannot_be_created():
+    class Incomplete(SpeechBackend):
+        name = 'incomplete'
+
+    with pytest.raises(TypeError):
+        Incomplete()
+    assert FakeSpeechBackend().name == 'fake'
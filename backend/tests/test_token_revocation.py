@@ -0,0 +1,24 @@
+from unittest import mock
+
+from token_revocation import RevocationList, issued_at_ms
+
+
+def test_issued_at_ms_prefers_the_millisecond_claim():
+    assert issued_at_ms({'iat': 1700000000, 'iat_ms': 1700000000250}) == 1700000000250
+    assert issued_at_ms({'iat': 1700000000}) == 1700000000000
+    assert issued_at_ms({}) == 0
+
+
+def test_revocation_within_one_second():
+    revocations = RevocationList()
+    revocations.enabled = True
+    with mock.patch('token_revocation.time.time', return_value=1700000000.5):
+        revocations.revoke('user-1')
+
+    # Issued earlier in the same second: revoked
+    assert revocations.is_revoked('user-1', issued_at_ms({'iat': 1700000000, 'iat_ms': 1700000000200}))
+    # Re-issued right after the change, same second: still valid
+    assert not revocations.is_revoked('user-1', issued_at_ms({'iat': 1700000000, 'iat_ms': 1700000000600}))
+    # A token without iat_ms from that second is treated as issued at its start
+    assert revocations.is_revoked('user-1', issued_at_ms({'iat': 1700000000}))
+    assert not revocations.is_revoked('user-2', 0)
@@ -0,0 +1,48 @@
+from bson import ObjectId
+
+from user_cache import UserCache
+
+USER_ID = ObjectId()
+
+
+class Users:
+    """find_one stand-in; on_find runs between the read and the return"""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.finds = 0
+        self.on_find = None
+
+    def find_one(self, query):
+        self.finds += 1
+        doc = {key: (dict(value) if isinstance(value, dict) else value) for key, value in self.doc.items()}
+        if self.on_find:
+            self.on_find()
+        return doc
+
+
+def test_load_invalidated_midway_is_not_cached():
+    users = Users({'_id': USER_ID, 'role': 'patient'})
+    cache = UserCache()
+
+    def change_role():
+        users.doc['role'] = 'therapist'
+        cache.invalidate(USER_ID)
+
+    users.on_find = change_role
+    assert cache.get_user(users, USER_ID)['role'] == 'patient'
+
+    users.on_find = None
+    assert cache.get_user(users, USER_ID)['role'] == 'therapist'
+    assert cache.get_user(users, USER_ID)['role'] == 'therapist'
+    assert users.finds == 2
+
+
+def test_callers_cannot_modify_the_cached_document():
+    users = Users({'_id': USER_ID, 'profile': {'name': 'Ana'}})
+    cache = UserCache()
+
+    cache.get_user(users, USER_ID)['profile']['name'] = 'changed'
+    cache.get_user(users, USER_ID)['profile']['name'] = 'changed again'
+    assert cache.get_user(users, USER_ID)['profile'] == {'name': 'Ana'}
+    assert users.finds == 1
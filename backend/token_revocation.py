@@ -0,0 +1,140 @@
+"""
+Token Revocation List
+In-memory "changed-since" set for stateless JWT auth. A token issued before the
+user's last role/profile change or deletion is rejected without reading the user.
+Entries are mirrored to Mongo so every worker process picks them up on refresh.
+"""
+
+import datetime
+import threading
+import time
+import os
+
+# Tokens live 24 hours, so older revocations can never match a valid token
+TOKEN_LIFETIME_SECONDS = 24 * 3600
+
+
+def issued_at_ms(claims):
+    """
+    When a token was issued, in epoch milliseconds: the iat_ms claim generate_token adds,
+    or the second-resolution iat of older tokens
+    """
+    if claims.get('iat_ms') is not None:
+        return int(claims['iat_ms'])
+    return int(claims.get('iat') or 0) * 1000
+
+
+class RevocationList:
+    """
+    Maps user id -> epoch milliseconds of the last change that invalidates their tokens.
+    Milliseconds, because the token re-issued right after a change usually falls in the
+    same second as the change and must stay valid while older ones from that second don't.
+    """
+
+    def __init__(self, refresh_seconds=30, retention_seconds=TOKEN_LIFETIME_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.retention_seconds = retention_seconds
+        self.collection = None
+        self._changed = {}
+        self._last_seen = None
+        self._lock = threading.Lock()
+        self._thread = None
+        # Only checked in stateless mode; otherwise endpoints load the user instead
+        self.enabled = False
+
+    def init_collection(self, collection):
+        """Attach the Mongo collection; a TTL index drops revocations once no token can match"""
+        self.collection = collection
+        collection.create_index('changed_at', expireAfterSeconds=self.retention_seconds)
+        collection.create_index('user_id', unique=True)
+
+    def revoke(self, user_id):
+        """Reject every token issued for user_id before now"""
+        user_id = str(user_id)
+        changed_at = int(time.time() * 1000)
+        with self._lock:
+            self._changed[user_id] = changed_at
+
+        if self.collection is not None:
+            self.collection.update_one(
+                {'user_id': user_id},
+                {'$set': {'changed_at': datetime.datetime.fromtimestamp(changed_at / 1000, datetime.timezone.utc)}},
+                upsert=True
+            )
+
+    def is_revoked(self, user_id, issued_at):
+        """
+        True if the token (issued_at in epoch ms, see issued_at_ms) was issued before the
+        user's last recorded change. Always False when disabled.
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            changed_at = self._changed.get(str(user_id))
+        return changed_at is not None and (issued_at or 0) < changed_at
+
+    def refresh(self):
+        """Pull revocations written by other processes since the last refresh"""
+        if self.collection is None:
+            return
+
+        query = {}
+        if self._last_seen is not None:
+            query = {'changed_at': {'$gte': self._last_seen}}
+
+        entries = list(self.collection.find(query, {'_id': 0, 'user_id': 1, 'changed_at': 1}))
+        cutoff = (time.time() - self.retention_seconds) * 1000
+
+        with self._lock:
+            for entry in entries:
+                changed_at = entry['changed_at']
+                if changed_at.tzinfo is None:
+                    changed_at = changed_at.replace(tzinfo=datetime.timezone.utc)
+                timestamp = int(changed_at.timestamp() * 1000)
+                if timestamp > self._changed.get(entry['user_id'], 0):
+                    self._changed[entry['user_id']] = timestamp
+                if self._last_seen is None or entry['changed_at'] > self._last_seen:
+                    self._last_seen = entry['changed_at']
+
+            # Forget revocations older than any token that could still be valid
+            for user_id in [uid for uid, ts in self._changed.items() if ts < cutoff]:
+                del self._changed[user_id]
+
+    def start(self):
+        """Load the current list and keep refreshing it on a daemon thread"""
+        if self._thread is not None:
+            return
+        self.refresh()
+
+        def run():
+            while True:
+                time.sleep(self.refresh_seconds)
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Warning: Could not refresh token revocations: {e}")
+
+        self._thread = threading.Thread(target=run, name='token-revocation-refresh', daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._changed)
+
+
+# Shared by app.py and the language/receptive blueprints
+revocation_list = RevocationList(
+    refresh_seconds=float(os.getenv('AUTH_REVOCATION_REFRESH', 30))
+)
+
+
+def init_token_revocation(db, enabled=False):
+    """
+    Bind the revocation list to Mongo. When enabled (stateless auth) tokens are checked
+    against it and the refresh thread is started, so every process sees every revocation;
+    when disabled revocations are still recorded but no token is rejected by them.
+    """
+    revocation_list.init_collection(db['token_revocations'])
+    revocation_list.enabled = enabled
+    if enabled:
+        revocation_list.start()
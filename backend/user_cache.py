@@ -0,0 +1,102 @@
+"""
+Authenticated User Cache
+Process-wide TTL/LRU cache for the user documents loaded by every token_required
+decorator, so authenticated requests don't pay a Mongo round trip each time.
+"""
+
+from collections import OrderedDict
+from bson import ObjectId
+import copy
+import threading
+import time
+import os
+
+
+class UserCache:
+    """Bounded LRU cache of user documents keyed by user id, with a per-entry TTL"""
+
+    def __init__(self, max_size=1024, ttl_seconds=60):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        # Loads in flight per key, with a generation invalidate() bumps so a load that
+        # started before an invalidation doesn't cache the document it read
+        self._loading = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_user(self, users_collection, user_id):
+        """
+        Return the user document for user_id, loading it from Mongo on a miss. Callers
+        get their own deep copy, so nested fields they modify never reach the cache.
+        """
+        key = str(user_id)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            self.misses += 1
+            loading = self._loading.setdefault(key, [0, 0])
+            loading[0] += 1
+            generation = loading[1]
+
+        user = None
+        try:
+            user = users_collection.find_one({'_id': ObjectId(key)})
+        finally:
+            with self._lock:
+                loading[0] -= 1
+                if not loading[0]:
+                    del self._loading[key]
+                # Missing users are not cached so a fresh registration is seen immediately,
+                # and one invalidated while it loaded may have been read before the change
+                if user is not None and loading[1] == generation:
+                    self._entries[key] = (now + self.ttl_seconds, copy.deepcopy(user))
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+
+        return user
+
+    def invalidate(self, user_id):
+        """Drop a single user so the next request reloads it"""
+        key = str(user_id)
+        with self._lock:
+            self._entries.pop(key, None)
+            if key in self._loading:
+                self._loading[key][1] += 1
+
+    def clear(self):
+        """Drop every cached user and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            for loading in self._loading.values():
+                loading[1] += 1
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0
+            }
+
+
+# Shared by app.py and the CRUD blueprints. Each worker process has its own copy,
+# so the TTL bounds how long another process can serve a stale document.
+user_cache = UserCache(
+    max_size=int(os.getenv('USER_CACHE_SIZE', 1024)),
+    ttl_seconds=float(os.getenv('USER_CACHE_TTL', 60))
+)
@@ -0,0 +1,68 @@
+"""
+Voice Activity Detection
+Energy + zero-crossing VAD over the decoded 16 kHz int16 samples, vectorized
+with NumPy. Leading and trailing silence is trimmed before recognition, and
+clips with no speech at all are rejected locally instead of costing an Azure
+round trip that ends in NoMatch.
+"""
+
+import numpy as np
+
+from audio_decode import TARGET_SAMPLE_RATE
+
+FRAME_MS = 20
+PADDING_MS = 200            # silence kept around the speech so the recognizer has context
+MIN_SPEECH_MS = 60          # shorter bursts are clicks, not speech
+ENERGY_MARGIN_DB = 12       # voiced frames are this far above the noise floor
+FRICATIVE_MARGIN_DB = 5     # quieter frames still count if they are noisy like /s/ or /th/
+FRICATIVE_ZCR = 0.25        # zero crossings per sample of a fricative
+SILENCE_FLOOR_DBFS = -55    # frames quieter than this are never speech
+STEADY_SPEECH_DBFS = -35    # a clip with little dynamic range is speech only if it is this loud
+
+
+def speech_frames(samples, sample_rate=TARGET_SAMPLE_RATE):
+    """Boolean speech mask over consecutive FRAME_MS frames"""
+    frame_length = sample_rate * FRAME_MS // 1000
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        return np.zeros(0, dtype=bool)
+
+    frames = np.asarray(samples[:frame_count * frame_length], dtype=np.float32).reshape(frame_count, frame_length) / 32768.0
+    energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+    zcr = np.mean(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis=1)
+
+    noise_floor = np.percentile(energy_db, 10)
+    peak = energy_db.max()
+    if peak - noise_floor < ENERGY_MARGIN_DB and peak < STEADY_SPEECH_DBFS:
+        return np.zeros(frame_count, dtype=bool)  # steady background noise, no speech on top
+
+    # Speech that fills the whole clip has no quiet floor; stay relative to the peak then
+    loud = energy_db > max(min(noise_floor + ENERGY_MARGIN_DB, peak - 20), SILENCE_FLOOR_DBFS)
+    fricative = (energy_db > max(noise_floor + FRICATIVE_MARGIN_DB, SILENCE_FLOOR_DBFS)) & (zcr > FRICATIVE_ZCR)
+    return loud | fricative
+
+
+def trim_silence(samples, sample_rate=TARGET_SAMPLE_RATE, padding_ms=PADDING_MS):
+    """
+    Cut leading/trailing silence from an int16 clip.
+    Returns (trimmed samples, or None when the clip has no speech, durations dict in seconds).
+    """
+    samples = np.asarray(samples)
+    frame_length = sample_rate * FRAME_MS // 1000
+    durations = {
+        'original_duration': round(len(samples) / sample_rate, 2),
+        'trimmed_duration': 0.0
+    }
+
+    mask = speech_frames(samples, sample_rate)
+    if mask.sum() * FRAME_MS < MIN_SPEECH_MS:
+        return None, durations
+
+    voiced = np.flatnonzero(mask)
+    padding = sample_rate * padding_ms // 1000
+    start = max(voiced[0] * frame_length - padding, 0)
+    end = min((voiced[-1] + 1) * frame_length + padding, len(samples))
+
+    trimmed = samples[start:end]
+    durations['trimmed_duration'] = round(len(trimmed) / sample_rate, 2)
+    return trimmed, durations
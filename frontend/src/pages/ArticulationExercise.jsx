@@ -3,6 +3,7 @@ import { useParams, useNavigate } from 'react-router-dom';
 import { images } from '../assets/images';
 import WaveSurfer from 'wavesurfer.js';
 import { articulationService, articulationExerciseService } from '../services/api';
+import { startArticulationStream } from '../services/articulationStream';
 import './ArticulationExercise.css';
 
 // Exercise data will be loaded from database
@@ -34,6 +35,7 @@ function ArticulationExercise({ onLogout }) {
   const [isLoadingExercises, setIsLoadingExercises] = useState(true);
   
   const mediaRecorderRef = useRef(null);
+  const streamSessionRef = useRef(null);
   const audioChunksRef = useRef([]);
   const waveformRef = useRef(null);
   const waveSurferRef = useRef(null);
@@ -140,9 +142,64 @@ function ArticulationExercise({ onLogout }) {
     navigate('/login');
   };
 
+  // Stream audio while the child speaks; falls back to a full upload if the socket is unavailable
+  const startStreaming = async () => {
+    const session = await startArticulationStream({
+      token: localStorage.getItem('token'),
+      params: {
+        sound_id: soundId,
+        level: currentLevel,
+        item_index: currentItem,
+        trial: currentTrial,
+        target: currentTarget
+      },
+      onSpeechEnd: () => stopRecording()
+    });
+    streamSessionRef.current = session;
+    setIsRecording(true);
+
+    // Same 10 second cap as the upload path
+    setTimeout(() => {
+      if (streamSessionRef.current === session) {
+        stopRecording();
+      }
+    }, 10000);
+  };
+
+  const finishStreaming = async (session) => {
+    setIsProcessing(true);
+    session.stop();
+
+    try {
+      const data = await session.result;
+      const audioBlob = session.wavBlob();
+      setRecordedBlob(audioBlob);
+      if (waveSurferRef.current) {
+        try {
+          await waveSurferRef.current.load(URL.createObjectURL(audioBlob));
+        } catch (err) {
+          console.log('Waveform display error:', err);
+        }
+      }
+      applyTrialResult(data);
+    } catch (error) {
+      console.error('Error processing recording:', error);
+      applyFallbackScore();
+    }
+
+    setIsProcessing(false);
+  };
+
   const startRecording = async () => {
     if (isRecording || isProcessing) return;
 
+    try {
+      await startStreaming();
+      return;
+    } catch (error) {
+      console.log('Streaming unavailable, uploading the full recording instead:', error);
+    }
+
     try {
       const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
       mediaRecorderRef.current = new MediaRecorder(stream);
@@ -198,6 +255,13 @@ function ArticulationExercise({ onLogout }) {
   };
 
   const stopRecording = () => {
+    if (streamSessionRef.current) {
+      const session = streamSessionRef.current;
+      streamSessionRef.current = null;
+      setIsRecording(false);
+      finishStreaming(session);
+      return;
+    }
     if (mediaRecorderRef.current) {
       if (mediaRecorderRef.current.state === 'recording') {
         mediaRecorderRef.current.stop();
@@ -206,6 +270,45 @@ function ArticulationExercise({ onLogout }) {
     }
   };
 
+  const applyTrialResult = (data) => {
+    const score = data.scores?.computed_score || 0;
+    
+    const details = {
+      trial: currentTrial,
+      computed_score: score,
+      pronunciation_score: data.scores?.pronunciation_score || 0,
+      accuracy_score: data.scores?.accuracy_score || 0,
+      completeness_score: data.scores?.completeness_score || 0,
+      fluency_score: data.scores?.fluency_score || 0,
+      transcription: data.transcription || '',
+      feedback: data.feedback || ''
+    };
+    
+    const newTrialScores = [...trialScores, score];
+    const newTrialDetails = [...trialDetails, details];
+    
+    setTrialScores(newTrialScores);
+    setTrialDetails(newTrialDetails);
+
+    if (newTrialScores.length >= maxTrials) {
+      const avg = newTrialScores.reduce((a, b) => a + b, 0) / newTrialScores.length;
+      setAverageScore(avg);
+    }
+  };
+
+  const applyFallbackScore = () => {
+    alert('Failed to process recording. Using mock score for now.');
+    
+    const mockScore = 0.85 + Math.random() * 0.15;
+    const newTrialScores = [...trialScores, mockScore];
+    setTrialScores(newTrialScores);
+
+    if (newTrialScores.length >= maxTrials) {
+      const avg = newTrialScores.reduce((a, b) => a + b, 0) / newTrialScores.length;
+      setAverageScore(avg);
+    }
+  };
+
   const processRecording = async (audioBlob) => {
     setIsProcessing(true);
 
@@ -241,43 +344,11 @@ function ArticulationExercise({ onLogout }) {
       }
 
       const data = await response.json();
-      
-      const score = data.scores?.computed_score || 0;
-      
-      const details = {
-        trial: currentTrial,
-        computed_score: score,
-        pronunciation_score: data.scores?.pronunciation_score || 0,
-        accuracy_score: data.scores?.accuracy_score || 0,
-        completeness_score: data.scores?.completeness_score || 0,
-        fluency_score: data.scores?.fluency_score || 0,
-        transcription: data.transcription || '',
-        feedback: data.feedback || ''
-      };
-      
-      const newTrialScores = [...trialScores, score];
-      const newTrialDetails = [...trialDetails, details];
-      
-      setTrialScores(newTrialScores);
-      setTrialDetails(newTrialDetails);
-
-      if (newTrialScores.length >= maxTrials) {
-        const avg = newTrialScores.reduce((a, b) => a + b, 0) / newTrialScores.length;
-        setAverageScore(avg);
-      }
+      applyTrialResult(data);
 
     } catch (error) {
       console.error('Error processing recording:', error);
-      alert('Failed to process recording. Using mock score for now.');
-      
-      const mockScore = 0.85 + Math.random() * 0.15;
-      const newTrialScores = [...trialScores, mockScore];
-      setTrialScores(newTrialScores);
-
-      if (newTrialScores.length >= maxTrials) {
-        const avg = newTrialScores.reduce((a, b) => a + b, 0) / newTrialScores.length;
-        setAverageScore(avg);
-      }
+      applyFallbackScore();
     }
 
     setIsProcessing(false);
@@ -389,9 +389,8 @@ function FluencyTherapy({ onLogout }) {
       // Prepare form data
       const formData = new FormData();
       formData.append('audio', wavBlob, 'recording.wav');
-      formData.append('target_text', currentExercise.target);
-      formData.append('expected_duration', currentExercise.expectedDuration);
-      formData.append('exercise_type', currentExercise.type);
+      // The server looks up the target text and duration from the exercise
+      formData.append('exercise_id', currentExercise.id);
       
       // Send to backend
       const token = localStorage.getItem('token');
@@ -413,7 +412,8 @@ function FluencyTherapy({ onLogout }) {
           fluencyScore: response.data.fluency_score,
           pauseCount: response.data.pause_count,
           disfluencies: response.data.disfluencies,
-          passed: response.data.fluency_score >= 70
+          passed: response.data.fluency_score >= 70,
+          recordingHash: response.data.recording_hash
         };
 
         setResults(result);
@@ -444,7 +444,8 @@ function FluencyTherapy({ onLogout }) {
           fluency_score: results.fluencyScore,
           pause_count: results.pauseCount,
           disfluencies: results.disfluencies,
-          passed: results.passed
+          passed: results.passed,
+          recording_hash: results.recordingHash
         }, {
           headers: {
             'Authorization': `Bearer ${token}`
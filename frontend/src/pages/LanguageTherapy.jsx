@@ -481,10 +481,8 @@ function LanguageTherapy({ onLogout }) {
     try {
       const formData = new FormData();
       formData.append('audio', audioBlob, 'response.wav');
+      // The server looks up the expected keywords and word count from the exercise
       formData.append('exercise_id', currentExercise.id);
-      formData.append('exercise_type', currentExercise.type);
-      formData.append('expected_keywords', JSON.stringify(currentExercise.expectedKeywords));
-      formData.append('min_words', currentExercise.minWords);
 
       const response = await fetch('http://localhost:5000/api/language/assess-expressive', {
         method: 'POST',
@@ -528,7 +526,8 @@ function LanguageTherapy({ onLogout }) {
             exercise_id: currentExercise.id,
             is_correct: isCorrect,
             score: result.score,
-            transcription: result.transcription
+            transcription: result.transcription,
+            recording_hash: result.recording_hash
           });
           console.log('Expressive progress saved successfully');
         } catch (error) {
@@ -55,6 +55,9 @@ export const authService = {
   // Complete profile after OAuth login
   completeProfile: async (profileData) => {
     const response = await api.post('/auth/complete-profile', profileData);
+    if (response.data.token) {
+      localStorage.setItem('token', response.data.token);
+    }
     if (response.data.user) {
       localStorage.setItem('user', JSON.stringify(response.data.user));
     }
@@ -0,0 +1,141 @@
+// Streams microphone audio to /ws/articulation while the child is speaking,
+// so the pronunciation score arrives shortly after they stop.
+
+const WS_URL = 'ws://localhost:5000/ws/articulation';
+const TARGET_SAMPLE_RATE = 16000;
+const SPEECH_RMS = 0.02;          // frame loudness that counts as speech
+const END_OF_SPEECH_MS = 700;     // silence after speech that ends the utterance
+
+// Average-downsample Float32 samples to 16 kHz 16-bit PCM
+const toPcm16 = (input, inputRate) => {
+  const ratio = inputRate / TARGET_SAMPLE_RATE;
+  const length = Math.floor(input.length / ratio);
+  const output = new Int16Array(length);
+  for (let i = 0; i < length; i++) {
+    const start = Math.floor(i * ratio);
+    const end = Math.min(Math.floor((i + 1) * ratio), input.length);
+    let sum = 0;
+    for (let j = start; j < end; j++) sum += input[j];
+    const sample = Math.max(-1, Math.min(1, sum / Math.max(end - start, 1)));
+    output[i] = sample < 0 ? sample * 0x8000 : sample * 0x7fff;
+  }
+  return output;
+};
+
+// WAV blob of the streamed PCM, for the waveform preview
+const pcmToWavBlob = (chunks) => {
+  const samples = chunks.reduce((n, c) => n + c.length, 0);
+  const buffer = new ArrayBuffer(44 + samples * 2);
+  const view = new DataView(buffer);
+  const writeString = (offset, text) => [...text].forEach((ch, i) => view.setUint8(offset + i, ch.charCodeAt(0)));
+
+  writeString(0, 'RIFF');
+  view.setUint32(4, 36 + samples * 2, true);
+  writeString(8, 'WAVE');
+  writeString(12, 'fmt ');
+  view.setUint32(16, 16, true);
+  view.setUint16(20, 1, true);
+  view.setUint16(22, 1, true);
+  view.setUint32(24, TARGET_SAMPLE_RATE, true);
+  view.setUint32(28, TARGET_SAMPLE_RATE * 2, true);
+  view.setUint16(32, 2, true);
+  view.setUint16(34, 16, true);
+  writeString(36, 'data');
+  view.setUint32(40, samples * 2, true);
+
+  let offset = 44;
+  chunks.forEach((chunk) => {
+    new Int16Array(buffer, offset, chunk.length).set(chunk);
+    offset += chunk.length * 2;
+  });
+  return new Blob([buffer], { type: 'audio/wav' });
+};
+
+// Opens the socket and microphone; resolves once audio is flowing.
+// Returns { stop, result, wavBlob }: stop() ends the utterance, result resolves
+// with the same body as POST /api/articulation/record.
+export const startArticulationStream = async ({ token, params, onPartial, onSpeechEnd }) => {
+  const socket = new WebSocket(WS_URL);
+  socket.binaryType = 'arraybuffer';
+
+  await new Promise((resolve, reject) => {
+    socket.onopen = resolve;
+    socket.onerror = () => reject(new Error('Could not connect to the streaming endpoint'));
+  });
+  socket.send(JSON.stringify({ token, ...params }));
+
+  let resolveResult;
+  let rejectResult;
+  const result = new Promise((resolve, reject) => {
+    resolveResult = resolve;
+    rejectResult = reject;
+  });
+  result.catch(() => {}); // the caller awaits it after stop(); avoid unhandled-rejection noise before then
+  socket.onmessage = (event) => {
+    const message = JSON.parse(event.data);
+    if (message.type === 'partial') {
+      onPartial?.(message.text);
+    } else if (message.type === 'result' && message.success === false) {
+      rejectResult(new Error(message.message));
+      socket.close();
+    } else if (message.type === 'result') {
+      resolveResult(message);
+      socket.close();
+    }
+  };
+  socket.onclose = () => rejectResult(new Error('Streaming connection closed'));
+
+  let stream;
+  try {
+    stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+  } catch (error) {
+    socket.close();
+    throw error;
+  }
+  const audioContext = new AudioContext();
+  const source = audioContext.createMediaStreamSource(stream);
+  const processor = audioContext.createScriptProcessor(4096, 1, 1);
+  const chunks = [];
+  let heardSpeech = false;
+  let silenceMs = 0;
+  let stopped = false;
+
+  const stop = () => {
+    if (stopped) return;
+    stopped = true;
+    processor.disconnect();
+    source.disconnect();
+    stream.getTracks().forEach(track => track.stop());
+    audioContext.close();
+    if (socket.readyState === WebSocket.OPEN) {
+      socket.send(JSON.stringify({ type: 'end' }));
+    }
+  };
+
+  processor.onaudioprocess = (event) => {
+    if (stopped) return;
+    const input = event.inputBuffer.getChannelData(0);
+    const pcm = toPcm16(input, audioContext.sampleRate);
+    chunks.push(pcm);
+    if (socket.readyState === WebSocket.OPEN) {
+      socket.send(pcm.buffer);
+    }
+
+    // End the utterance on trailing silence instead of waiting for the stop button
+    const rms = Math.sqrt(input.reduce((sum, x) => sum + x * x, 0) / input.length);
+    if (rms > SPEECH_RMS) {
+      heardSpeech = true;
+      silenceMs = 0;
+    } else if (heardSpeech) {
+      silenceMs += (input.length / audioContext.sampleRate) * 1000;
+      if (silenceMs >= END_OF_SPEECH_MS) {
+        onSpeechEnd?.();
+      }
+    }
+  };
+
+  source.connect(processor);
+  processor.connect(audioContext.destination);
+
+  return { stop, result, wavBlob: () => pcmToWavBlob(chunks) };
+};